@@ -0,0 +1,76 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Runs the worst case game loop scenarios headless and reports ms per tick, phase by phase.
+    Usage: python benchmark.py --save-baseline          (run on the commit you trust)
+           python benchmark.py                          (compare a change against it, exits with 1 on a regression)
+           python benchmark.py --scenario bulletHell --ticks 1200
+"""
+
+# I - Import & Initialize
+import argparse
+import os
+import sys
+
+# headless has to be imported before anything else touches pygame's display or mixer
+from src.modules import headless, benchmarkManager
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+def main():
+    """
+        Description:
+        Parses the command line, runs the scenarios, prints a table and saves or compares the results
+
+        Args:
+        None
+
+        Returns:
+        None
+    """
+    scenarioNames = [scenario.name for scenario in benchmarkManager.SCENARIOS]
+    parser = argparse.ArgumentParser(description="Benchmark the Gundown game loop")
+    parser.add_argument("--ticks", type=int, default=600, help="ticks to time per scenario")
+    parser.add_argument("--scenario", action="append", choices=scenarioNames, help="only run this scenario, can be repeated")
+    parser.add_argument("--output", help="also save the results as json here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline json to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a scenario counts as a regression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    results = benchmarkManager.runAll(args.ticks, args.scenario)
+
+    for name, result in results["scenarios"].items():
+        print(name + ": " + format(result["msPerTick"], ".3f") + " ms/tick, peak bullets " + str(result["peakBullets"]))
+        for phase, ms in sorted(result["phases"].items(), key=lambda item: -item[1]):
+            print("    " + phase.ljust(18) + format(ms, ".3f") + " ms")
+
+    if args.output:
+        benchmarkManager.saveResults(results, args.output)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        benchmarkManager.saveResults(results, args.baseline)
+        print("baseline saved to " + args.baseline)
+        return
+
+    if not os.path.exists(args.baseline):
+        print("no baseline at " + args.baseline + ", run with --save-baseline first")
+        return
+
+    baseline = benchmarkManager.loadResults(args.baseline)
+    if baseline.get("version") != benchmarkManager.RESULTS_VERSION:
+        print("the baseline at " + args.baseline + " is from older scenarios, run with --save-baseline again")
+        return
+
+    regressions = 0
+    print()
+    for name, baselineMs, newMs, ratio, regressed in benchmarkManager.compareResults(results, baseline, args.threshold):
+        print(name.ljust(16) + format(baselineMs, ".3f") + " -> " + format(newMs, ".3f") + " ms/tick (" + format((ratio - 1) * 100, "+.1f") + "%)" + ("  REGRESSION" if regressed else ""))
+        if regressed:
+            regressions += 1
+
+    if regressions:
+        sys.exit(1)
+
+main()
@@ -0,0 +1,65 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Runs a Gundown match with no window or audio and prints how it went.
+    Usage: python headless.py --ticks 36000 --controllers 2 --seed 1
+           python headless.py --seed 1 --record match.gdr
+           python headless.py --replay match.gdr
+"""
+
+# I - Import & Initialize
+import argparse
+import json
+import time
+
+# headless has to be imported before anything else touches pygame's display or mixer
+from src.modules import headless, replayManager
+
+def main():
+    """
+        Description:
+        Parses the command line, runs the match as fast as possible and prints a json summary
+
+        Args:
+        None
+
+        Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description="Run a headless Gundown match")
+    parser.add_argument("--ticks", type=int, default=36000, help="maximum simulation ticks to run (60 per game second)")
+    parser.add_argument("--controllers", type=int, default=1, help="controller players on top of the mouse player")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the bot input and card picks")
+    parser.add_argument("--record", help="write a replay of the match to this file")
+    parser.add_argument("--replay", help="play back a replay file instead of bot input")
+    args = parser.parse_args()
+
+    if args.replay:
+        # feed the recorded input and card picks back through the real game code
+        replay = replayManager.Replay(args.replay)
+        replayScript = replayManager.ReplayInputScript(replay)
+        headlessMatch = headless.HeadlessMatch(replay.numControllers, replay.playerColors, replayScript,
+                                               replayManager.ReplayCardScreen(replay), afterTick=replayScript.afterTick)
+        maxTicks = len(replay.frames)
+    else:
+        recorder = None
+        if args.record:
+            colors = headless.getDefaultColors(args.controllers)
+            recorder = replayManager.ReplayRecorder(colors, args.controllers, args.seed)
+        headlessMatch = headless.HeadlessMatch(args.controllers, seed=args.seed, recorder=recorder)
+        maxTicks = args.ticks
+
+    startTime = time.perf_counter()
+    summary = headlessMatch.run(maxTicks)
+    elapsed = time.perf_counter() - startTime
+
+    if args.replay:
+        summary["desyncTick"] = replayScript.desyncTick
+    elif args.record:
+        recorder.save(args.record)
+
+    summary["wallSeconds"] = round(elapsed, 3)
+    summary["ticksPerSecond"] = round(summary["ticks"] / elapsed) if elapsed > 0 else None
+    print(json.dumps(summary, indent=2))
+
+main()
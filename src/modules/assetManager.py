@@ -0,0 +1,203 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Loads every image, sound and font once and hands out the cached copy after that.
+    Images are converted to the display's pixel format, and scaled or tinted versions are cached too. Rendered text is kept in a size limited cache.
+    Loads can also be queued up and done a few at a time, so a scene can load the next scene's assets without a hitch
+"""
+
+# I - Import & Initialize
+import time
+from collections import OrderedDict
+import pygame
+
+# how many rendered strings are kept, the least recently used one is dropped past this
+MAX_TEXTS = 256
+
+class AssetManager():
+    """
+        Description:
+        Cache of loaded images, sounds and fonts, keyed by file and by how they were scaled, tinted or what volume they play at, plus rendered text.
+        Everything handed out is shared, so copy() an image before changing it (set_alpha, fill, etc)
+
+        Attributes:
+        images: (path, size, tint, alpha, opacity) -> Surface
+        sounds: (path, volume) -> Sound
+        fonts: (font, size) -> Font
+        texts: (font, size, text, color, antialias) -> Surface, least recently used first
+        maxTexts: how many rendered strings texts holds
+        hits: lookups that were already cached
+        misses: lookups that had to load, scale or tint
+        pending: queued (function, args) loads, see preload
+    """
+    def __init__(self, maxTexts=MAX_TEXTS):
+        self.images = {}
+        self.sounds = {}
+        self.fonts = {}
+        self.texts = OrderedDict()
+        self.maxTexts = maxTexts
+        self.hits = 0
+        self.misses = 0
+        self.pending = []
+
+    def getImage(self, path, size=None, tint=None, alpha=True, opacity=None):
+        """
+            Description:
+            Returns an image, loading it, scaling it, tinting it and fading it only the first time it's asked for
+
+            Args:
+            path: image file
+            size: (width, height) to scale to, None keeps the file's size
+            tint: color multiplied into the image (BLEND_RGB_MULT), None for no tint
+            alpha: True keeps per pixel transparency (convert_alpha), False for opaque images like backgrounds (convert)
+            opacity: see through version of the image, 0 (invisible) to 255. None for as is
+
+            Returns:
+            the shared Surface, don't modify it
+        """
+        key = (path, size, tint, alpha, opacity)
+        if key in self.images:
+            self.hits += 1
+            return self.images[key]
+        self.misses += 1
+
+        if opacity is not None:
+            # fade the cached tinted image, so swapping between the two is free
+            image = self.getImage(path, size, tint, alpha).copy()
+            image.set_alpha(opacity)
+        elif tint is not None:
+            # tint the cached scaled image
+            image = self.getImage(path, size, None, alpha).copy()
+            image.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+        elif size is not None:
+            # scale the cached full size image
+            image = pygame.transform.scale(self.getImage(path, None, None, alpha), size)
+        else:
+            # converting to the display format means blitting it later doesn't convert every pixel every time
+            image = pygame.image.load(path)
+            if alpha:
+                image = image.convert_alpha()
+            else:
+                image = image.convert()
+
+        self.images[key] = image
+        return image
+
+    def getSound(self, path, volume=None):
+        """
+            Description:
+            Returns a sound, loading it only the first time it's asked for
+
+            Args:
+            path: sound file
+            volume: volume for this sound, each volume gets its own Sound
+
+            Returns:
+            the shared Sound
+        """
+        key = (path, volume)
+        if key in self.sounds:
+            self.hits += 1
+            return self.sounds[key]
+        self.misses += 1
+
+        sound = pygame.mixer.Sound(path)
+        if volume is not None:
+            sound.set_volume(volume)
+        self.sounds[key] = sound
+        return sound
+
+    def getFont(self, font, size):
+        """
+            Description:
+            Returns a font, opening it only the first time it's asked for at this size
+
+            Args:
+            font: a font file (.ttf) or the name of a system font like "Arial"
+            size: point size
+
+            Returns:
+            the shared Font
+        """
+        key = (font, size)
+        if key in self.fonts:
+            return self.fonts[key]
+
+        if font.endswith(".ttf"):
+            loadedFont = pygame.font.Font(font, size)
+        else:
+            loadedFont = pygame.font.SysFont(font, size)
+        self.fonts[key] = loadedFont
+        return loadedFont
+
+    def getText(self, text, font, size, color, antialias=True):
+        """
+            Description:
+            Returns a string rendered in a font, rendering it only the first time it's asked for.
+            Labels that are drawn every frame cost a lookup instead of a render
+
+            Args:
+            text: the string
+            font: a font file or system font name, see getFont
+            size: point size
+            color: the text color
+            antialias: smooth edges
+
+            Returns:
+            the shared Surface, don't modify it
+        """
+        key = (font, size, text, tuple(color), antialias)
+        if key in self.texts:
+            self.hits += 1
+            self.texts.move_to_end(key)
+            return self.texts[key]
+        self.misses += 1
+
+        rendered = self.getFont(font, size).render(text, antialias, color)
+        self.texts[key] = rendered
+
+        # strings that change all the time (timers, counters) would fill it up otherwise
+        if len(self.texts) > self.maxTexts:
+            self.texts.popitem(last=False)
+        return rendered
+
+    def preload(self, load, *args):
+        """
+            Description:
+            Queues a load to be done later by loadQueued. Anything that caches what it loads works, like getImage or getSound
+
+            Args:
+            load: the function to call
+            args: what to call it with
+        """
+        self.pending.append((load, args))
+
+    def loadQueued(self, budget=4):
+        """
+            Description:
+            Does queued loads until budget milliseconds are used up, call once a frame. At least one load is done per call
+
+            Args:
+            budget: milliseconds to spend
+
+            Returns:
+            True when nothing is left in the queue
+        """
+        startTime = time.perf_counter()
+        while self.pending:
+            load, args = self.pending.pop(0)
+            load(*args)
+            if (time.perf_counter() - startTime) * 1000 >= budget:
+                break
+        return not self.pending
+
+    def getStats(self):
+        """
+            Description:
+            Returns the cache hits and misses and how much is cached
+        """
+        return {"hits": self.hits, "misses": self.misses, "images": len(self.images), "sounds": len(self.sounds),
+                "fonts": len(self.fonts), "texts": len(self.texts)}
+
+# shared by the whole game
+assets = AssetManager()
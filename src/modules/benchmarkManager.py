@@ -0,0 +1,367 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Worst case scenarios for the game loop, run headless and timed phase by phase.
+    Results are saved as json and compared against a saved baseline so slowdowns show up before shipping
+"""
+
+# I - Import & Initialize
+import json
+import math
+import platform
+import time
+import pygame
+from . import headless, abilityCards, mapManager, profileManager, sceneManager, simulationManager, utils
+
+# bumped whenever the result layout changes, or a scenario changes so much its old timings mean nothing
+RESULTS_VERSION = 2
+
+def getCard(cardName):
+    """
+        Description:
+        Finds an ability card by its name
+
+        Args:
+        cardName: the card's cardName
+
+        Returns:
+        the AbilityCardBase
+    """
+    for card in abilityCards.AVAILABLECARDS:
+        if card.cardName == cardName:
+            return card
+    raise KeyError("no ability card named " + cardName)
+
+def giveCards(headlessMatch, cardNames):
+    """
+        Description:
+        Gives every player the same cards, in order, the same way the card screen would
+
+        Args:
+        headlessMatch: the HeadlessMatch
+        cardNames: card names to apply
+    """
+    match = headlessMatch.match
+    for cardName in cardNames:
+        changedWeapons = sceneManager.applyCardSelections(match.players, [getCard(cardName)] * len(match.players))
+        for player in changedWeapons:
+            match.allSprites.add(player.weapon)
+
+class Scenario():
+    """
+        Description:
+        Base scenario: bots fighting on map A with nobody able to die, so the scenario never stops for a card screen
+
+        Attributes:
+        name: name used in the results
+        controllers: controller players on top of the mouse player
+        seed: seed for the bot input
+    """
+    name = "base"
+    controllers = 2
+    seed = 1
+
+    def getInputScript(self):
+        """
+            Description:
+            Returns the input script for the HeadlessMatch, None uses the default bots
+        """
+        return None
+
+    def setup(self, headlessMatch):
+        """
+            Description:
+            Builds the scenario on top of a fresh match
+        """
+        pass
+
+    def afterTick(self, match):
+        """
+            Description:
+            Keeps every player at full health, called after every tick
+        """
+        for player in match.players:
+            player.Health = player.MaxHealth
+
+class FireInputScript():
+    """
+        Description:
+        Every player stands still holding fire the whole time, aimed at the next player along
+    """
+    def __call__(self, headlessMatch, tickNumber):
+        """
+            Description:
+            Sets the scripted mouse, keyboard and joysticks for this tick
+        """
+        players = headlessMatch.match.players.sprites()
+        for i in range(len(players)):
+            player = players[i]
+            target = players[(i + 1) % len(players)].rect.center
+
+            if player.controlScheme == "mouse":
+                headlessMatch.mouseKeyboard.setState(target, (True, False, False), [])
+            else:
+                aimX = target[0] - player.rect.centerx
+                aimY = target[1] - player.rect.centery
+                length = max(math.hypot(aimX, aimY), 1)
+                player.joyStick.setState([0.0, 0.0, aimX / length, aimY / length, -1.0, 1.0], [False] * 16)
+
+class BulletHellScenario(Scenario):
+    """
+        Description:
+        Three players with SMGs and 5x magazines holding fire at each other every tick without ever reloading,
+        each also spraying a fixed fan of bullets into the air, so every player's bullets sit at the pool's per player cap
+    """
+    name = "bulletHell"
+
+    # the fan sprayed by every player each tick, degrees (up is -90) and speed
+    fanDirections = [-170 + 5 * i for i in range(33)]
+    fanSpeed = 10
+
+    def getInputScript(self):
+        return FireInputScript()
+
+    def setup(self, headlessMatch):
+        giveCards(headlessMatch, ["SMG", "Bullet Hell"])
+
+        # a shot every tick
+        for player in headlessMatch.match.players:
+            player.weapon.fireRate = 0
+
+    def afterTick(self, match):
+        Scenario.afterTick(self, match)
+        now = simulationManager.getTicks()
+        for player in match.players:
+            weapon = player.weapon
+            weapon.ammo = weapon.magazineSize
+            match.bulletPool.spawnMany(weapon.weaponX, weapon.weaponY, self.fanDirections, self.fanSpeed, now, weapon.damage, player)
+
+class ExplosionChainScenario(Scenario):
+    """
+        Description:
+        A wall of damage blocks floating over the arena. Every block a bullet touches blows up into a ring of
+        bullets (utils.shootBulletsAllDirections), which sets off the blocks next to it. The wall is rebuilt and set off again every second
+    """
+    name = "explosionChain"
+    rebuildInterval = 60
+
+    def setup(self, headlessMatch):
+        self.headlessMatch = headlessMatch
+        self.ticks = 0
+        self.blocks = []
+        self.rebuild()
+
+    def rebuild(self):
+        """
+            Description:
+            Puts back any blown up blocks, then sets one off in the middle of the wall
+        """
+        match = self.headlessMatch.match
+        for block in self.blocks:
+            block.kill()
+
+        self.blocks = []
+        for column in range(9):
+            for row in range(3):
+                block = mapManager.StaticMapObject(match.screen, 300 + column * 80, 120 + row * 80, 40, 40, (255, 60, 60), 225, "damage")
+                self.blocks.append(block)
+                match.mapSprites.add(block)
+
+        utils.shootBulletsAllDirections(match.bulletPool, 640, 200, None, 25, 60)
+
+    def afterTick(self, match):
+        Scenario.afterTick(self, match)
+        self.ticks += 1
+        if self.ticks % self.rebuildInterval == 0:
+            self.rebuild()
+
+class PushInputScript():
+    """
+        Description:
+        Walks every player into the closest block stack and back again, no shooting
+    """
+    def __init__(self, stackCenters, turnInterval=150):
+        self.stackCenters = stackCenters
+        self.turnInterval = turnInterval
+
+    def __call__(self, headlessMatch, tickNumber):
+        """
+            Description:
+            Sets the scripted mouse, keyboard and joysticks for this tick
+        """
+        for player in headlessMatch.match.players:
+            stackX = min(self.stackCenters, key=lambda x: abs(x - player.rect.centerx))
+            walk = 1 if stackX > player.rect.centerx else -1
+
+            # turn around now and then so the stacks get pushed both ways
+            if (tickNumber // self.turnInterval) % 2 == 1:
+                walk = -walk
+
+            if player.controlScheme == "mouse":
+                keys = [pygame.K_d if walk > 0 else pygame.K_a]
+                headlessMatch.mouseKeyboard.setState(player.rect.center, (False, False, False), keys)
+            else:
+                player.joyStick.setState([walk, 0.0, 0.0, 0.0, -1.0, -1.0], [False] * 16)
+
+class PhysicsStackScenario(Scenario):
+    """
+        Description:
+        Two stacks of six physics blocks on the floor that the players keep pushing into each other and the walls
+    """
+    name = "physicsStack"
+    stackLefts = (260, 940)
+    stackHeight = 6
+
+    def getInputScript(self):
+        return PushInputScript([left + 20 for left in self.stackLefts])
+
+    def setup(self, headlessMatch):
+        match = headlessMatch.match
+        floorTop = 655
+        for left in self.stackLefts:
+            for level in range(self.stackHeight):
+                block = mapManager.StaticMapObject(match.screen, left, floorTop - 40 * (level + 1), 40, 40, (60, 60, 255), 225, "solid", False, True, 1)
+                match.physicsObjects.add(block)
+                match.mapSprites.add(block)
+                match.allSprites.add(block)
+
+class CrateRowScenario(Scenario):
+    """
+        Description:
+        One long row of physics blocks along the floor, pushed end to end into the walls
+    """
+    name = "crateRow"
+    rowLeft = 60
+    crates = 28
+
+    def getInputScript(self):
+        # walk toward both ends of the row, so every push moves the whole row
+        return PushInputScript([self.rowLeft, self.rowLeft + 40 * self.crates])
+
+    def setup(self, headlessMatch):
+        match = headlessMatch.match
+        floorTop = 655
+        for crate in range(self.crates):
+            block = mapManager.StaticMapObject(match.screen, self.rowLeft + 40 * crate, floorTop - 40, 40, 40, (60, 60, 255), 225, "solid", False, True, 1)
+            match.physicsObjects.add(block)
+            match.mapSprites.add(block)
+            match.allSprites.add(block)
+
+class BulletShieldScenario(Scenario):
+    """
+        Description:
+        Every player has Bullet Shield, so every hit bursts into more bullets
+    """
+    name = "bulletShield"
+
+    def setup(self, headlessMatch):
+        giveCards(headlessMatch, ["Bullet Shield", "Fire Rate Boost"])
+
+SCENARIOS = [BulletHellScenario(), ExplosionChainScenario(), PhysicsStackScenario(), CrateRowScenario(), BulletShieldScenario()]
+
+def runScenario(scenario, ticks, warmupTicks=60):
+    """
+        Description:
+        Runs one scenario headless and times it
+
+        Args:
+        scenario: the Scenario
+        ticks: how many ticks to time
+        warmupTicks: ticks to run before timing starts
+
+        Returns:
+        dictionary with msPerTick, the average ms per tick of each phase and the peak bullet count
+    """
+    headlessMatch = headless.HeadlessMatch(scenario.controllers, inputScript=scenario.getInputScript(), seed=scenario.seed, afterTick=scenario.afterTick)
+    scenario.setup(headlessMatch)
+    bulletPool = headlessMatch.match.bulletPool
+
+    for i in range(warmupTicks):
+        headlessMatch.step()
+
+    profiler = profileManager.profiler
+    profiler.enabled = True
+    profiler.reset()
+    peakBullets = 0
+
+    startTime = time.perf_counter()
+    for i in range(ticks):
+        profiler.start()
+        headlessMatch.step()
+        profiler.endFrame()
+        peakBullets = max(peakBullets, bulletPool.count)
+    elapsed = time.perf_counter() - startTime
+
+    phases = profiler.getAverages()
+    profiler.enabled = False
+    headlessMatch.close()
+
+    return {
+        "ticks": ticks,
+        "msPerTick": round(elapsed * 1000 / ticks, 4),
+        "phases": dict((phase, round(ms, 4)) for phase, ms in sorted(phases.items())),
+        "peakBullets": peakBullets,
+        "rounds": headlessMatch.rounds,
+    }
+
+def runAll(ticks, names=None):
+    """
+        Description:
+        Runs every scenario (or just the named ones)
+
+        Args:
+        ticks: ticks to time per scenario
+        names: scenario names to run, None runs them all
+
+        Returns:
+        the results dictionary, ready to be saved as json
+    """
+    results = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "scenarios": {},
+    }
+    for scenario in SCENARIOS:
+        if names is None or scenario.name in names:
+            results["scenarios"][scenario.name] = runScenario(scenario, ticks)
+    return results
+
+def saveResults(results, path):
+    """
+        Description:
+        Writes results to a json file
+    """
+    with open(path, "w") as resultsFile:
+        json.dump(results, resultsFile, indent=2)
+
+def loadResults(path):
+    """
+        Description:
+        Reads results saved by saveResults
+    """
+    with open(path) as resultsFile:
+        return json.load(resultsFile)
+
+def compareResults(results, baseline, threshold=0.15):
+    """
+        Description:
+        Compares ms per tick of every scenario against the baseline
+
+        Args:
+        results: results from runAll
+        baseline: results saved earlier
+        threshold: how much slower (0.15 = 15%) a scenario can get before it counts as a regression
+
+        Returns:
+        list of (scenario name, baseline ms, new ms, ratio, regressed) for every scenario in both
+    """
+    comparison = []
+    for name, result in results["scenarios"].items():
+        if name not in baseline["scenarios"]:
+            continue
+        baselineMs = baseline["scenarios"][name]["msPerTick"]
+        ratio = result["msPerTick"] / baselineMs if baselineMs > 0 else 1
+        comparison.append((name, baselineMs, result["msPerTick"], ratio, ratio > 1 + threshold))
+    return comparison
@@ -9,6 +9,15 @@ import pygame
 import math
 from . import utils
 from . import gui
+from . import simulationManager
+from . import assetManager
+
+# the player's boxie image and the size it's drawn at, tinted to each player's color
+PLAYER_IMAGE = "src/art/character/boxie-white/default-51.png"
+PLAYER_SIZE = (39, 39)
+
+# how see through dead players are, 0 to 255
+DEAD_PLAYER_OPACITY = 35
 
 class Entity(pygame.sprite.Sprite):
     """
@@ -38,7 +47,7 @@ class Player(Entity):
         Description:
         Player class, the main character of the game (boxie)
     """
-    def __init__(self, screen, x, y, controlScheme, color=utils.Colors.RED, joystick=None):
+    def __init__(self, screen, x, y, controlScheme, color=utils.Colors.RED, joystick=None, controllerSlot=None):
         Entity.__init__(self, screen)
         # the color from the startscreen
         self.colorScheme = color
@@ -47,12 +56,17 @@ class Player(Entity):
         self.score = 0
         self.joyStick = joystick
 
-        # show boxie image
-        self.image = pygame.image.load("src/art/character/boxie-white/default-51.png").convert_alpha()
-        self.image = pygame.transform.scale(self.image, (39, 39))
+        # which of the InputState's controllers is this player's, None for the mouse player
+        self.controllerSlot = controllerSlot
+
+        # the last tick's InputState, the weapon aims with it between ticks too
+        self.inputState = None
 
-        # lt the player choose their color, and use pygame's color blending to change the color of the player
-        self.image.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+        # show boxie image. lt the player choose their color, the asset manager uses pygame's color blending to change the color of the player.
+        # both versions are shared with every player of the same color, update swaps between them
+        self.aliveImage = assetManager.assets.getImage(PLAYER_IMAGE, PLAYER_SIZE, color)
+        self.deadImage = assetManager.assets.getImage(PLAYER_IMAGE, PLAYER_SIZE, color, opacity=DEAD_PLAYER_OPACITY)
+        self.image = self.aliveImage
 
         # set the rect of the player to the image
         self.rect = self.image.get_rect()
@@ -77,15 +91,22 @@ class Player(Entity):
         self.canLatch = False
         self.latching = False
 
-        # your bumper q shield
+        # your bumper q shield, the last time starts a full cooldown back so the shield is ready when the match starts
         self.shieldBubble = None
-        self.lastTimeShieldBubble = 0
+        self.lastTimeShieldBubble = -8000
 
         # define variable where the type is the pistol class
         self.weapon = None
         self.isDead = False
         self.exploadingBullets = False
-        self.exploadingBulletTime = 0
+        self.exploadingBulletTime = -6000
+
+        # print shields and reloads, set by the match
+        self.debug = False
+
+        # the health bar and ammo count, see displayGUI
+        self.healthBar = None
+        self.bulletBar = None
 
     def displayGUI(self, screen):
         """
@@ -94,9 +115,11 @@ class Player(Entity):
         return: playerHealthBar, playerAmmoCount - the health bar and ammo count objects
         """
 
-        playerHealthBar = gui.HealthBar(screen, self)
-        playerAmmoCount = gui.BulletBar(screen, self)
-        return playerHealthBar, playerAmmoCount
+        # made once, they redraw themselves only when the health or ammo changes
+        if self.healthBar is None:
+            self.healthBar = gui.HealthBar(screen, self)
+            self.bulletBar = gui.BulletBar(screen, self)
+        return self.healthBar, self.bulletBar
     
     def attachWeapon(self, weapon):
         """
@@ -113,7 +136,7 @@ class Player(Entity):
         """
 
         # Ensure the cooldown for shield creation is respected
-        current_time = pygame.time.get_ticks()
+        current_time = simulationManager.getTicks()
 
         # don't create a shield if one already exists or if the cooldown is not respected
         if self.shieldBubble:
@@ -123,7 +146,8 @@ class Player(Entity):
             return
 
         # Create the shield bubble
-        print("creating shield")
+        if self.debug:
+            print("creating shield")
         shieldFx.play()
 
         # create a shield bubble object and set it to the player's shieldBubble attribute
@@ -199,27 +223,31 @@ class Player(Entity):
         self.rect.left += x
 
         # Check collisions with map sprites
-        for sprite in mapSprites:
+        for sprite in mapSprites.spritesNear(self.rect):
             if pygame.sprite.collide_rect(self, sprite):
                 # moving left
                 if x < 0:
                     if sprite.latchable:
                         self.canLatch = True
                     if sprite.affectedByGravity:
-                        sprite.moveHorizontal(x, mapSprites)
-                    elif not sprite.decorative:  
-                        # block movement if not decorative by setting the player's right side to the sprite's left side
-                        self.rect.left = sprite.rect.right
+                        # push it by how far we went into it, no further
+                        overlap = min(sprite.rect.right - self.rect.left, -x)
+                        sprite.moveHorizontal(-overlap, mapSprites)
+
+                    # block movement by setting the player's left side to the sprite's right side, a pushed sprite may have stopped short
+                    self.rect.left = sprite.rect.right
 
                 # moving right
                 elif x > 0: 
                     if sprite.latchable:
                         self.canLatch = True
                     if sprite.affectedByGravity:
-                        sprite.moveHorizontal(x, mapSprites)
-                    elif not sprite.decorative:  
-                        # block movement if not decorative by setting the player's left side to the sprite's right side
-                        self.rect.right = sprite.rect.left
+                        # push it by how far we went into it, no further
+                        overlap = min(self.rect.right - sprite.rect.left, x)
+                        sprite.moveHorizontal(overlap, mapSprites)
+
+                    # block movement by setting the player's right side to the sprite's left side, a pushed sprite may have stopped short
+                    self.rect.right = sprite.rect.left
 
         # center the player's xcoord
         self.x = self.rect.center[0]
@@ -238,27 +266,18 @@ class Player(Entity):
         # move the player vertically
         if not self.latching:
             self.rect.top += y
-            for sprite in mapSprites:
+            for sprite in mapSprites.spritesNear(self.rect):
                 if pygame.sprite.collide_rect(self, sprite):
                     # if the player is moving down
                     if y < 0:
                         if sprite.affectedByGravity:
                             sprite.moveVertical(y, mapSprites)
-                        elif sprite.decorative:
-                            # if the sprite is decorative, then ignore it
-                            pass
                         else:
                             self.rect.top = sprite.rect.bottom
 
                     # if the player is moving up
                     elif y > 0:
-                        if sprite.affectedByGravity:
-                            self.rect.bottom = sprite.rect.top
-                        elif sprite.decorative:
-                            # if the sprite is decorative, then ignore it
-                            pass
-                        else:
-                            self.rect.bottom = sprite.rect.top
+                        self.rect.bottom = sprite.rect.top
             # center the player's y to the rect
             self.y = self.rect.center[1]
 
@@ -277,13 +296,9 @@ class Player(Entity):
         # we put the players head by 1 pixel into the block above
         self.rect.top += 1
         onGround = False
-        for sprite in mapSprites:
+        for sprite in mapSprites.spritesNear(self.rect):
             # and if the player doesnt collide with a block, then they are on the ground
             if pygame.sprite.collide_rect(self, sprite): 
-                # if its in a decorative block it doesnt mean it can jump
-                if sprite.decorative:
-                    continue
-                
                 onGround = True
                 break
 
@@ -308,66 +323,58 @@ class Player(Entity):
         shotFx.play()
         self.weapon.fire()
 
-    def runTimeJoyMovement(self, joystick, mapSprites, shotFx, reloadFx, shieldFx):
+    def runTimeJoyMovement(self, inputState, mapSprites, shotFx, reloadFx, shieldFx):
         """
         Description: Manage the player's movement during runtime using a joystick
-        args: joystick - the joystick to get input from
+        args: inputState - this tick's InputState, the player's controller is the one at controllerSlot
               mapSprites - the map sprites to check for collisions
               shotFx - the sound effect to play when the weapon is fired
               reloadFx - the sound effect to play when the weapon is reloaded
               shieldFx - the sound effect to play when the shield is created
         """
         
+        self.inputState = inputState
+
         # if player is dead, then dont allow movement
         if self.isDead:
             return
-        
-        # shield if any trigger is pressed
-        if joystick.get_button(9) or joystick.get_button(10):
-            self.createShieldBubble(shieldFx)
 
-        # implement deadzones because lets be real all controllers have stickdrift
-        axis0 = joystick.get_axis(0)
-        axis1 = joystick.get_axis(1)
+        # the deadzones are already applied, see inputManager.ControllerState
+        controller = inputState.controllers[self.controllerSlot]
 
-        if axis0 < 0.1 and axis0 > -0.1:
-            axis0 = 0
-
-        if axis1 < 0.1 and axis1 > -0.1:
-            axis1 = 0
+        # shield if any trigger is pressed
+        if controller.isPressed(9) or controller.isPressed(10):
+            self.createShieldBubble(shieldFx)
 
         # if player is using controller, then set the direction to the controller
-        self.direction = self.getDirectionJoy((joystick.get_axis(2), joystick.get_axis(3)))
-        self.moveHorizontal(axis0 * self.walkSpeed, mapSprites)
+        self.direction = self.getDirectionJoy((controller.aimX, controller.aimY))
+        self.moveHorizontal(controller.moveX * self.walkSpeed, mapSprites)
 
         # if player joystick is up or a is pressed, then jump
-        if joystick.get_axis(1) < -0.8:
+        if controller.moveY < -0.8:
             # check if player has jumped recently, then if not jump
-            if pygame.time.get_ticks() - self.lastJumpTime > 100:
+            if simulationManager.getTicks() - self.lastJumpTime > 100:
                 self.jump(mapSprites)
 
-        if joystick.get_button(0):
-            if pygame.time.get_ticks() - self.lastJumpTime > 100:
+        if controller.isPressed(0):
+            if simulationManager.getTicks() - self.lastJumpTime > 100:
                 self.jump(mapSprites)
 
         # reload if x is pressed
-        if joystick.get_button(2):
+        if controller.isPressed(2):
             # reload the weapon if the magazine is not the same size as the ammo 
             if self.weapon.ammo < self.weapon.magazineSize:
                 self.weapon.startReload(reloadFx)
         
         # if the right trigger is pressed, fire the weapon
-        rightTrigger = joystick.get_axis(5) 
-
-        if rightTrigger > 0.5:
+        if controller.rightTrigger > 0.5:
             if self.weapon.ammo > 0:
-                self.weapon.fire(shotFx)
+                self.weapon.fire(shotFx, inputState)
             elif not self.weapon.isReloading:
                 self.weapon.startReload(reloadFx)
         
         # latching with left trigger
-        leftTrigger = joystick.get_axis(4)
-        if leftTrigger > 0.5:
+        if controller.leftTrigger > 0.5:
             # only triggers when touching a wall with the latchable property
             if self.canLatch:
                 self.latching = True
@@ -376,26 +383,25 @@ class Player(Entity):
         else:
             self.latching = False
 
-    def runTimeMnkMovement(self, mapSprites, shotFx, reloadFx, shieldFx):
+    def runTimeMnkMovement(self, inputState, mapSprites, shotFx, reloadFx, shieldFx):
         """
         Description: Manage the player's movement during runtime using the mouse and keyboard
-        args: mapSprites - the map sprites to check for collisions
+        args: inputState - this tick's InputState
+              mapSprites - the map sprites to check for collisions
               shotFx - the sound effect to play when the weapon is fired
               reloadFx - the sound effect to play when the weapon is reloaded
               shieldFx - the sound effect to play when the shield is created
         """
-        
+        self.inputState = inputState
+
         if self.isDead:
             return
         
         # if player is using mouse, then set the direction to the mouse
-        self.direction = self.getDirectionMouse(pygame.mouse.get_pos())
-
-        # K - Keys
-        keys = pygame.key.get_pressed()
+        self.direction = self.getDirectionMouse(inputState.mousePos)
 
         # latch with q
-        if keys[pygame.K_q]:
+        if inputState.isHeld(pygame.K_q):
             if self.canLatch:
                 self.latching = True
             else:
@@ -404,22 +410,22 @@ class Player(Entity):
             self.latching = False
 
         # general movement and reload
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if inputState.isHeld(pygame.K_LEFT, pygame.K_a):
             self.moveHorizontal(-self.walkSpeed, mapSprites)
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if inputState.isHeld(pygame.K_RIGHT, pygame.K_d):
             self.moveHorizontal(self.walkSpeed, mapSprites)
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
+        if inputState.isHeld(pygame.K_UP, pygame.K_w):
             self.jump(mapSprites)
-        if keys[pygame.K_e]:
+        if inputState.isHeld(pygame.K_e):
             self.createShieldBubble(shieldFx)
-        if keys[pygame.K_r]:
+        if inputState.isHeld(pygame.K_r):
             if self.weapon.ammo < self.weapon.magazineSize:
                 self.weapon.startReload(reloadFx)
             
         # add ability to shoot with left mouse button, also without scanning in the event loop
-        if pygame.mouse.get_pressed()[0]:
+        if inputState.mouseButtons[0]:
             if self.weapon.ammo > 0:
-                self.weapon.fire(shotFx)
+                self.weapon.fire(shotFx, inputState)
             elif not self.weapon.isReloading:  # if no ammo and not already reloading
                 self.weapon.startReload(reloadFx)
 
@@ -433,17 +439,15 @@ class Player(Entity):
         self.isDead = False
         self.x = x
         self.y = y
-        self.rect.left = x
-        self.rect.top = y
+
+        # x and y are the player's center (see update), so place the rect the same way or the first frame drawn would move them
+        self.rect.center = (x, y)
         self.Health = self.MaxHealth
         self.weapon.ammo = self.weapon.magazineSize
 
-        # fix transparancy on weapon
-        self.weapon.image.set_alpha(255)
-
     def update(self):
         """
-        Description: Update the player's position and state
+        Description: Update the player's position and state, called once a tick by the match's input phase
         args: None
         """
         # update player's position
@@ -454,31 +458,30 @@ class Player(Entity):
             # check if shield bubble is destroyed, if so, remove it
             if self.shieldBubble.Health <= 0:
                 self.shieldBubble.kill()
-                self.lastTimeShieldBubble = pygame.time.get_ticks()
+                self.lastTimeShieldBubble = simulationManager.getTicks()
                 self.shieldBubble = None
             else:
                 self.shieldBubble.rect.center = self.rect.center
-
-                # draw the shield bubble from here
-                self.screen.blit(self.shieldBubble.image, self.shieldBubble.rect)
-
-        # draw and update gui to player image using function
-        playerHealthBar, playerAmmoCount = self.displayGUI(self.screen)
-        playerHealthBar.update()
-        playerAmmoCount.update()
     
         # if player is dead, make them invisible-ish
         if self.isDead:
-            self.image.set_alpha(35)
+            self.image = self.deadImage
         else:
-            self.image.set_alpha(255)
-
-        # draw the player's health bar and ammo count
-        self.screen.blit(playerHealthBar.image, playerHealthBar.rect)
-        self.screen.blit(playerAmmoCount.image, playerAmmoCount.rect)
+            self.image = self.aliveImage
 
-        # update the weapon's position and state
+        # update the weapon's position and state. the weapon isn't updated anywhere else, it always goes along with its player
         self.weapon.update()
+
+    def drawHUD(self, surface):
+        """
+        Description: Draw the player's health bar and ammo count above the player, called while rendering so it follows where the player is drawn
+        args: surface - the surface to draw on
+        return: the rects that were drawn to
+        """
+        playerHealthBar, playerAmmoCount = self.displayGUI(self.screen)
+        playerHealthBar.update()
+        playerAmmoCount.update()
+        return [surface.blit(playerHealthBar.image, playerHealthBar.rect), surface.blit(playerAmmoCount.image, playerAmmoCount.rect)]
     
 class ShieldBubble(Entity):
     """
@@ -492,8 +495,8 @@ class ShieldBubble(Entity):
         self.image = pygame.Surface((100, 100)).convert_alpha()
         self.image.fill((0, 0, 0, 0))
 
-        # circle that is light blue and near transparent
-        pygame.draw.ellipse(self.image, (144, 213, 255, 40), (0, 0, 100, 100))
+        # circle that is light blue and near transparent. it used to be drawn twice a frame at alpha 40, 74 looks the same drawn once
+        pygame.draw.ellipse(self.image, (144, 213, 255, 74), (0, 0, 100, 100))
         
         self.rect = self.image.get_rect()
         self.rect.center = player.rect.center
@@ -1,16 +1,21 @@
 """
     Author: Nick S
     Date: January 15th, 2025
-    Description: Ammo bar and Health bar for the player, GUI house. Also stores multi-player's score
+    Description: Ammo bar and Health bar for the player, GUI house. Also stores multi-player's score and the ability card faces
 """
 
 # I - Import & Initialize
 import pygame
+from . import assetManager
+
+# the profiler overlay's font
+OVERLAY_FONT = "src/fonts/ThaleahFat.ttf"
+OVERLAY_FONT_SIZE = 20
 
 class HealthBar(pygame.sprite.Sprite):
     """
         Description:
-        Health bar for the player
+        Health bar for the player. Made once per player, only redrawn when the health changes
     """
     def __init__(self, screen, player):
         pygame.sprite.Sprite.__init__(self)
@@ -21,27 +26,38 @@ class HealthBar(pygame.sprite.Sprite):
         self.rect.center = (self.player.rect.centerx, self.player.rect.top - 10)
         self.maxHealth = self.player.MaxHealth
 
+        # what the bar was last drawn with, None forces the first draw
+        self.drawnState = None
+
     def update(self):
         """
             Description:
             Updates the health bar based on the player's health
         """
-        # green for full health
-        self.image.fill((0, 255, 0))  
+        # health cards change the max health between rounds
+        self.maxHealth = self.player.MaxHealth
+
+        # only redraw when something shown on the bar changed
+        state = (self.player.Health, self.maxHealth, self.player.isDead)
+        if state != self.drawnState:
+            self.drawnState = state
 
-        # red overlay width based on lost health
-        lostHealthPercentage = 1 - (self.player.Health / self.maxHealth)
-        redWidth = int(self.player.rect.width * lostHealthPercentage)
+            # green for full health
+            self.image.fill((0, 255, 0))  
 
-        # drawing it the on the right side
-        redRectBar = pygame.Rect(self.player.rect.width - redWidth, 0, redWidth, 6)
+            # red overlay width based on lost health
+            lostHealthPercentage = 1 - (self.player.Health / self.maxHealth)
+            redWidth = int(self.player.rect.width * lostHealthPercentage)
 
-        # if is dead, make it grey
-        if self.player.isDead:
-            self.image.set_alpha(0)
-        else:
-            self.image.set_alpha(255)
-            pygame.draw.rect(self.image, (255, 0, 0), redRectBar)
+            # drawing it the on the right side
+            redRectBar = pygame.Rect(self.player.rect.width - redWidth, 0, redWidth, 6)
+
+            # if is dead, make it grey
+            if self.player.isDead:
+                self.image.set_alpha(0)
+            else:
+                self.image.set_alpha(255)
+                pygame.draw.rect(self.image, (255, 0, 0), redRectBar)
 
         # and updating the position to follow the player
         self.rect.center = (self.player.rect.centerx, self.player.rect.top - 10)
@@ -49,7 +65,7 @@ class HealthBar(pygame.sprite.Sprite):
 class BulletBar(pygame.sprite.Sprite):
     """
         Description:
-        floating bullet ammo bar for the player
+        floating bullet ammo bar for the player. Made once per player, only redrawn when the ammo, reload or magazine changes
     """
     def __init__(self, screen, player):
         pygame.sprite.Sprite.__init__(self)
@@ -63,8 +79,24 @@ class BulletBar(pygame.sprite.Sprite):
         # and spacing between bullets
         self.spacing = 2
 
+        self.magazineSize = None
+        self.resize(player.weapon.magazineSize)
+
+        # what the bar was last drawn with, None forces the first draw
+        self.drawnState = None
+
+    def resize(self, magazineSize):
+        """
+            Description:
+            Makes a new surface that fits magazineSize bullets
+
+            Args:
+            magazineSize: the weapon's magazine size
+        """
+        self.magazineSize = magazineSize
+
         # calc dimensions of the bullet bar. no remainders allowed because you cant have half a bullet
-        self.maxRows = (player.weapon.magazineSize + self.bulletsPerRow - 1) // self.bulletsPerRow
+        self.maxRows = (magazineSize + self.bulletsPerRow - 1) // self.bulletsPerRow
 
         # based on the dimensions, calculate the width and height of the bullet bar
         self.imageW = self.bulletsPerRow * (self.bulletSize + self.spacing) - self.spacing
@@ -82,36 +114,41 @@ class BulletBar(pygame.sprite.Sprite):
             Description:
             Updates the bullet bar based on the player's ammo
         """
-        # clear the image, fill it with black which is transparent due to colorkey
-        self.image.fill((0, 0, 0))  
-
-        # add bullets to a grid
-        remainingAmmo = self.player.weapon.ammo
+        weapon = self.player.weapon
 
-        # draw bullets based on the remaining ammo
-        for i in range(remainingAmmo):
-            # calculate the row and column of the bullet
+        # weapon cards and ammo cards change the magazine size between rounds
+        if weapon.magazineSize != self.magazineSize:
+            self.resize(weapon.magazineSize)
+            self.drawnState = None
 
-            # first, we divide the index by the number of bullets per row
-            row = i // self.bulletsPerRow
+        # only redraw when something shown on the bar changed
+        state = (weapon.ammo, weapon.isReloading, self.player.isDead)
+        if state != self.drawnState:
+            self.drawnState = state
 
-            # then we get the remainder of the division for the column index
-            col = i % self.bulletsPerRow
+            # clear the image, fill it with black which is transparent due to colorkey
+            self.image.fill((0, 0, 0))  
 
-            # calculate the x and y position of the bullet
-            x = col * (self.bulletSize + self.spacing)
-            y = row * (self.bulletSize + self.spacing)
-
-            # if the player is reloading, draw the bullets in grey
-            # but first check if player is dead
+            # if the player is reloading, draw the bullets in grey. but first check if player is dead
             if self.player.isDead:
                 self.image.set_alpha(0)
             else:
                 self.image.set_alpha(255)
-                if self.player.weapon.isReloading:
-                    pygame.draw.rect(self.image, (100, 100, 100), (x, y, self.bulletSize, self.bulletSize))
+                if weapon.isReloading:
+                    color = (100, 100, 100)
                 else:
-                    pygame.draw.rect(self.image, (255, 166, 43), (x, y, self.bulletSize, self.bulletSize)) # orange-ish bullet
+                    color = (255, 166, 43) # orange-ish bullet
+
+                # draw bullets based on the remaining ammo, in a grid
+                for i in range(weapon.ammo):
+                    # first, we divide the index by the number of bullets per row for the row, then the remainder is the column
+                    row = i // self.bulletsPerRow
+                    col = i % self.bulletsPerRow
+
+                    # calculate the x and y position of the bullet
+                    x = col * (self.bulletSize + self.spacing)
+                    y = row * (self.bulletSize + self.spacing)
+                    pygame.draw.rect(self.image, color, (x, y, self.bulletSize, self.bulletSize))
 
         # bullet bar above the health bar
         self.rect.center = (self.player.rect.centerx, self.player.rect.top - 20 - self.imageH // 2)
@@ -120,7 +157,7 @@ class ScoreKeeper(pygame.sprite.Sprite):
     """
         Description:
         Scorekeeper stores player score, and displays 
-        in the top left corner as squares
+        in the top left corner as squares. Only redrawn when the score changes
     """
     def __init__(self, screen, player, location):
         pygame.sprite.Sprite.__init__(self)
@@ -134,18 +171,25 @@ class ScoreKeeper(pygame.sprite.Sprite):
         self.imageWidth = self.numSquares * self.largeSize + (self.numSquares - 1) * self.spacing
         self.imageHeight = self.largeSize
         self.image = pygame.Surface((self.imageWidth, self.imageHeight))
+        self.image.set_alpha(200)
         self.rect = self.image.get_rect()
         self.rect.topleft = location
 
+        # None forces the first draw
+        self.score = None
+
     def update(self):
         """
             Description:
             Updates the scorekeeper based on the player's score
         """
+        # nothing to redraw unless the score changed
+        if self.player.score == self.score:
+            return
+
         # get the player's score
         self.score = self.player.score
         self.image.fill((0, 0, 0))
-        self.image.set_alpha(200)
 
         # draw the squares based on the score
         for i in range(self.numSquares):
@@ -160,4 +204,114 @@ class ScoreKeeper(pygame.sprite.Sprite):
             y = (self.imageHeight - size) // 2
 
             # draw the square
-            pygame.draw.rect(self.image, self.color, (x, y, size, size))
\ No newline at end of file
+            pygame.draw.rect(self.image, self.color, (x, y, size, size))
+
+class ProfilerOverlay(pygame.sprite.Sprite):
+    """
+        Description:
+        Debug overlay with the rolling per phase frame timings from the profiler, plus the fps and live bullet and sprite counts.
+        The text is only re-rendered a few times a second
+    """
+    def __init__(self, screen, profiler, refreshInterval=250):
+        pygame.sprite.Sprite.__init__(self)
+        self.window = screen
+        self.profiler = profiler
+        self.refreshInterval = refreshInterval
+        self.lastRefresh = -refreshInterval
+        self.image = pygame.Surface((1, 1))
+        self.rect = self.image.get_rect()
+
+    def update(self, fps, bulletCount, spriteCount):
+        """
+            Description:
+            Re-renders the overlay if it's been refreshInterval ms since the last time
+
+            Args:
+            fps: frames per second from the pygame clock
+            bulletCount: live bullets
+            spriteCount: sprites in allSprites
+        """
+        # real time on purpose, this is about how the frames feel not the game clock
+        now = pygame.time.get_ticks()
+        if now - self.lastRefresh < self.refreshInterval:
+            return
+        self.lastRefresh = now
+
+        averages = self.profiler.getRollingAverages()
+        lines = ["fps " + str(round(fps)) + "   bullets " + str(bulletCount) + "   sprites " + str(spriteCount)]
+        lines.append("ms per frame " + format(sum(averages.values()), ".2f"))
+        for phase, ms in sorted(averages.items(), key=lambda item: -item[1]):
+            lines.append(phase + "  " + format(ms, ".3f"))
+
+        # the numbers change every refresh, so these are rendered straight from the shared font instead of filling the text cache
+        font = assetManager.assets.getFont(OVERLAY_FONT, OVERLAY_FONT_SIZE)
+        renderedLines = [font.render(line, True, (255, 255, 255)) for line in lines]
+        lineHeight = font.get_linesize()
+        width = max(line.get_width() for line in renderedLines) + 20
+        height = lineHeight * len(renderedLines) + 20
+
+        # dark see through panel behind the text
+        self.image = pygame.Surface((width, height))
+        self.image.fill((5, 1, 23))
+        self.image.set_alpha(200)
+        for i in range(len(renderedLines)):
+            self.image.blit(renderedLines[i], (10, 10 + i * lineHeight))
+
+        # top right corner, out of the way of the scorekeepers
+        self.rect = self.image.get_rect()
+        self.rect.topright = (self.window.get_width() - 10, 10)
+
+class CardFaceCache():
+    """
+        Description:
+        Every ability card drawn once per player color: the border in the player's color with the name and description on it.
+        The card draft (or anything else that shows cards) only has to blit the face
+    """
+    def __init__(self, font, fontSize, size=(400, 130)):
+        """
+            Args:
+            font: font file or system font name the name and description are written in, see AssetManager.getFont
+            fontSize: point size of the font
+            size: (width, height) of the card's border
+        """
+        self.font = font
+        self.fontSize = fontSize
+        self.size = size
+
+        # (card name, color) -> Surface
+        self.faces = {}
+
+    def getFace(self, card, color):
+        """
+            Description:
+            Returns a card's face, drawing it the first time it's asked for in this color
+
+            Args:
+            card: an AbilityCardBase
+            color: the player's color, used for the border
+
+            Returns:
+            the shared Surface, its top left is the card's top left. don't modify it
+        """
+        key = (card.cardName, tuple(color))
+        if key in self.faces:
+            return self.faces[key]
+
+        assets = assetManager.assets
+        cardTitle = assets.getText(card.cardName, self.font, self.fontSize, (255, 255, 255))
+        cardDescription = assets.getText(card.cardDescription, self.font, self.fontSize, (200, 200, 200))
+
+        # long descriptions run past the border, same as when they were written straight onto the screen
+        width = max(self.size[0], 10 + cardTitle.get_width(), 10 + cardDescription.get_width())
+        height = max(self.size[1], 50 + cardDescription.get_height())
+        face = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        pygame.draw.rect(face, color, (0, 0, self.size[0], self.size[1]), 2)
+        face.blit(cardTitle, (10, 10))
+        face.blit(cardDescription, (10, 50))
+
+        # the face is mostly see through, run length encoding skips those pixels so the blit is cheaper than drawing the text was
+        face.set_alpha(255, pygame.RLEACCEL)
+
+        self.faces[key] = face
+        return face
@@ -0,0 +1,256 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Runs matches with no window and no audio, as fast as the CPU allows.
+    Players are driven by scripted input and ability cards are picked at random. Used for CI, benchmarks and card balance
+"""
+
+# I - Import & Initialize
+import os
+
+# headless means headless, this has to be set before pygame opens the display or the mixer
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import math
+import random
+import pygame
+from . import inputManager, matchManager, abilityCards, sceneManager, utils, profileManager
+
+class NullSound():
+    """
+        Description:
+        Silent stand in for pygame.mixer.Sound
+    """
+    def play(self, *args):
+        """
+            Description:
+            Does nothing
+        """
+        pass
+
+    def set_volume(self, volume):
+        """
+            Description:
+            Does nothing
+        """
+        pass
+
+class RandomCardScreen():
+    """
+        Description:
+        Stands in for the card draft when a round ends: every player is dealt 2 random cards and picks one of them at random
+    """
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def draftCards(self, players, availableCards):
+        """
+            Description:
+            Picks and applies a card for every player, nothing is shown
+
+            Args:
+            players: the player sprites
+            availableCards: every ability card
+
+            Returns:
+            changedWeapons: a list of the players whose weapons were changed
+        """
+        playerSelections = []
+        for player in players:
+            dealt = [self.random.choice(availableCards), self.random.choice(availableCards)]
+            playerSelections.append(self.random.choice(dealt))
+
+        return sceneManager.applyCardSelections(players, playerSelections)
+
+class RandomInputScript():
+    """
+        Description:
+        Simple bot input: every player aims at the closest other player and holds the trigger,
+        wanders left and right and jumps and shields now and then
+    """
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+        # player -> walking direction, -1 or 1
+        self.walkDirection = {}
+
+    def __call__(self, headlessMatch, tickNumber):
+        """
+            Description:
+            Sets the scripted mouse, keyboard and joysticks for this tick
+
+            Args:
+            headlessMatch: the HeadlessMatch being run
+            tickNumber: how many ticks have run so far
+        """
+        players = headlessMatch.match.players.sprites()
+        for player in players:
+            if player not in self.walkDirection or self.random.random() < 0.02:
+                self.walkDirection[player] = self.random.choice((-1, 1))
+            walk = self.walkDirection[player]
+            jump = self.random.random() < 0.03
+            shield = self.random.random() < 0.005
+            reload = player.weapon.ammo == 0 and not player.weapon.isReloading
+
+            # aim at the closest other player
+            others = [other for other in players if other is not player]
+            target = min(others, key=lambda other: math.dist(other.rect.center, player.rect.center)) if others else player
+            aimX = target.rect.centerx - player.rect.centerx
+            aimY = target.rect.centery - player.rect.centery
+
+            if player.controlScheme == "mouse":
+                keys = [pygame.K_d if walk > 0 else pygame.K_a]
+                if jump:
+                    keys.append(pygame.K_w)
+                if shield:
+                    keys.append(pygame.K_e)
+                if reload:
+                    keys.append(pygame.K_r)
+                headlessMatch.mouseKeyboard.setState(target.rect.center, (True, False, False), keys)
+            else:
+                length = math.hypot(aimX, aimY) or 1
+                axes = [walk, -1.0 if jump else 0.0, aimX / length, aimY / length, -1.0, 1.0]
+                buttons = [False] * 16
+                buttons[2] = reload
+                buttons[9] = shield
+                player.joyStick.setState(axes, buttons)
+
+def setupDisplay(size=(1280, 720)):
+    """
+        Description:
+        Opens the dummy display so images can still be converted, nothing is shown
+
+        Args:
+        size: arena size
+
+        Returns:
+        the display surface
+    """
+    pygame.display.init()
+    pygame.font.init()
+    return pygame.display.set_mode(size)
+
+def getDefaultColors(numControllers):
+    """
+        Description:
+        Returns a color for the mouse player and each controller player
+
+        Args:
+        numControllers: controller players on top of the mouse player
+    """
+    return [utils.Colors.RED, utils.Colors.BLUE, utils.Colors.ORANGE, utils.Colors.PURPLE][:numControllers + 1]
+
+class HeadlessMatch():
+    """
+        Description:
+        A Match with scripted input, silent sounds and random card picks, stepped without any drawing
+    """
+    def __init__(self, numControllers=1, playerColors=None, inputScript=None, cardScreen=None, seed=0, recorder=None, afterTick=None):
+        """
+            Args:
+            numControllers: controller players on top of the mouse player
+            playerColors: a color per player, defaults to red, blue, orange...
+            inputScript: called with (headlessMatch, tickNumber) before every tick, returns the tick's InputState or None after setting the scripted devices.
+            Defaults to RandomInputScript
+            cardScreen: object with draftCards(players, availableCards) that applies the picks and returns the changed weapons, defaults to RandomCardScreen
+            seed: seeds the default input script and card picks
+            recorder: optional ReplayRecorder that records the run
+            afterTick: optional function called with the match after every tick
+        """
+        self.screen = setupDisplay()
+
+        if playerColors is None:
+            playerColors = getDefaultColors(numControllers)
+        if inputScript is None:
+            inputScript = RandomInputScript(seed)
+        if cardScreen is None:
+            cardScreen = RandomCardScreen(seed)
+        self.inputScript = inputScript
+        self.cardScreen = cardScreen
+        self.recorder = recorder
+        self.afterTick = afterTick
+
+        # the mouse player and every controller player read scripted devices
+        self.mouseKeyboard = inputManager.ScriptedMouseKeyboard()
+        inputManager.setMouseKeyboard(self.mouseKeyboard)
+        self.joysticks = [inputManager.VirtualJoystick(i) for i in range(numControllers)]
+
+        self.sounds = {"shot": NullSound(), "reload": NullSound(), "shield": NullSound(), "select": NullSound()}
+        self.match = matchManager.Match(self.screen, playerColors, self.joysticks, self.sounds)
+        self.tickCount = 0
+        self.rounds = 0
+
+    def roundEnd(self):
+        """
+            Description:
+            Runs the card draft once a round is won, same as the real game's card draft scene but with the card screen swapped out
+        """
+        self.rounds += 1
+        changedWeapons = self.cardScreen.draftCards(self.match.players, abilityCards.AVAILABLECARDS)
+        self.match.finishRound(changedWeapons)
+        if self.recorder is not None:
+            self.recorder.recordDraft()
+
+    def step(self):
+        """
+            Description:
+            Feeds this tick's input then runs one simulation tick
+        """
+        # scripts either return the InputState themselves or set the scripted devices, which are then sampled
+        inputState = self.inputScript(self, self.tickCount)
+        if inputState is None:
+            inputState = inputManager.sampleInput(self.joysticks)
+        if self.recorder is not None:
+            self.recorder.recordInput(inputState)
+        profileManager.profiler.lap("input script")
+
+        self.match.tick(inputState)
+        self.tickCount += 1
+
+        if self.recorder is not None:
+            self.recorder.recordState(self.match)
+        if self.afterTick is not None:
+            self.afterTick(self.match)
+
+        # the draft happens between ticks, just like the card draft scene in the real game
+        if self.match.roundOver and self.match.gameEnd is None:
+            self.roundEnd()
+
+    def run(self, maxTicks):
+        """
+            Description:
+            Steps until the game ends or maxTicks ticks have run
+
+            Args:
+            maxTicks: tick limit
+
+            Returns:
+            dictionary summary of the run
+        """
+        while self.tickCount < maxTicks and self.match.gameEnd is None:
+            self.step()
+
+        return self.getSummary()
+
+    def getSummary(self):
+        """
+            Description:
+            Returns the state of the match as a dictionary
+        """
+        return {
+            "ticks": self.tickCount,
+            "rounds": self.rounds,
+            "gameOver": self.match.gameEnd is not None,
+            "scores": [player.score for player in self.match.players],
+            "weapons": [player.weapon.weaponName for player in self.match.players],
+            "liveBullets": self.match.bulletPool.count,
+            "lastRoundBullets": self.match.lastBulletReport,
+        }
+
+    def close(self):
+        """
+            Description:
+            Gives the mouse player the real mouse and keyboard back
+        """
+        inputManager.setMouseKeyboard(inputManager.PygameMouseKeyboard())
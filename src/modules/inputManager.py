@@ -0,0 +1,463 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Where the players read their mouse, keyboard and controller input from.
+    The devices (real ones by default, or scripted ones when running headless) are sampled once per tick into an InputState,
+    which is the only input the game logic sees. Replays, bots and network play all feed the game through InputStates
+"""
+
+# I - Import & Initialize
+from collections import namedtuple
+import pygame
+
+# the keys the mouse and keyboard player uses, anything else held down is left out of the InputState
+GAME_KEYS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_q, pygame.K_e, pygame.K_r, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP)
+
+# axes and buttons read from every controller
+CONTROLLER_AXES = 6
+CONTROLLER_BUTTONS = 16
+
+# controller players on top of the mouse player, extra controllers are left unused
+MAX_CONTROLLERS = 2
+
+# sticks inside these are treated as centered, because lets be real all controllers have stickdrift
+MOVE_DEADZONE = 0.1
+AIM_DEADZONE = 0.2
+
+class PygameMouseKeyboard():
+    """
+        Description:
+        Reads the real mouse and keyboard through pygame
+    """
+    def getMousePos(self):
+        """
+            Description:
+            Returns the (x, y) of the cursor
+        """
+        return pygame.mouse.get_pos()
+
+    def getMouseButtons(self):
+        """
+            Description:
+            Returns the (left, middle, right) mouse button flags
+        """
+        return pygame.mouse.get_pressed()
+
+    def getPressedKeys(self):
+        """
+            Description:
+            Returns the held keys, index it with a pygame key constant
+        """
+        return pygame.key.get_pressed()
+
+class PressedKeys():
+    """
+        Description:
+        Stands in for pygame.key.get_pressed(), indexing it with a key constant says if that key is held
+    """
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+
+    def __getitem__(self, key):
+        """
+            Description:
+            Returns True if the key is held
+        """
+        return key in self.keys
+
+class ScriptedMouseKeyboard():
+    """
+        Description:
+        Mouse and keyboard whose state is set by a script instead of a person
+    """
+    def __init__(self):
+        self.mousePos = (0, 0)
+        self.mouseButtons = (False, False, False)
+        self.pressedKeys = PressedKeys()
+
+    def setState(self, mousePos, mouseButtons, keys):
+        """
+            Description:
+            Sets everything the mouse and keyboard report until the next call
+
+            Args:
+            mousePos: (x, y) of the cursor
+            mouseButtons: (left, middle, right) pressed flags
+            keys: iterable of pygame key constants that are held down
+        """
+        self.mousePos = tuple(mousePos)
+        self.mouseButtons = tuple(mouseButtons)
+        self.pressedKeys = PressedKeys(keys)
+
+    def getMousePos(self):
+        """
+            Description:
+            Returns the (x, y) of the cursor
+        """
+        return self.mousePos
+
+    def getMouseButtons(self):
+        """
+            Description:
+            Returns the (left, middle, right) mouse button flags
+        """
+        return self.mouseButtons
+
+    def getPressedKeys(self):
+        """
+            Description:
+            Returns the held keys, index it with a pygame key constant
+        """
+        return self.pressedKeys
+
+class VirtualJoystick():
+    """
+        Description:
+        Scripted controller with the same methods the game calls on a pygame Joystick
+    """
+    def __init__(self, joystickId, numAxes=6, numButtons=16):
+        self.joystickId = joystickId
+        self.axes = [0.0] * numAxes
+        self.buttons = [False] * numButtons
+
+    def init(self):
+        """
+            Description:
+            Nothing to initialize, here so it matches pygame Joystick
+        """
+        pass
+
+    def get_id(self):
+        """
+            Description:
+            Returns the joystick id
+        """
+        return self.joystickId
+
+    def get_instance_id(self):
+        """
+            Description:
+            Returns the joystick instance id, the same as its id
+        """
+        return self.joystickId
+
+    def get_guid(self):
+        """
+            Description:
+            Returns a guid string, made up from the id
+        """
+        return "virtual-" + str(self.joystickId)
+
+    def get_numaxes(self):
+        """
+            Description:
+            Returns the number of axes
+        """
+        return len(self.axes)
+
+    def get_numbuttons(self):
+        """
+            Description:
+            Returns the number of buttons
+        """
+        return len(self.buttons)
+
+    def get_axis(self, axis):
+        """
+            Description:
+            Returns an axis value from -1 to 1
+        """
+        return self.axes[axis]
+
+    def get_button(self, button):
+        """
+            Description:
+            Returns True if the button is pressed
+        """
+        return self.buttons[button]
+
+    def setState(self, axes, buttons):
+        """
+            Description:
+            Sets every axis and button until the next call
+
+            Args:
+            axes: list of axis values from -1 to 1
+            buttons: list of pressed flags
+        """
+        self.axes[:len(axes)] = axes
+        self.buttons[:len(buttons)] = buttons
+
+class ControllerState(namedtuple("ControllerState", ("moveX", "moveY", "aimX", "aimY", "leftTrigger", "rightTrigger", "buttons"))):
+    """
+        Description:
+        One controller for one tick, with the deadzones already applied. Immutable
+
+        Attributes:
+        moveX, moveY: left stick, 0 inside MOVE_DEADZONE
+        aimX, aimY: right stick, both 0 while the stick is inside AIM_DEADZONE
+        leftTrigger, rightTrigger: trigger axes from -1 to 1
+        buttons: tuple of pressed flags, CONTROLLER_BUTTONS long
+    """
+    __slots__ = ()
+
+    @classmethod
+    def fromAxes(cls, axes, buttons):
+        """
+            Description:
+            Builds a ControllerState from raw axis values, this is the one place deadzones get applied
+
+            Args:
+            axes: axis values from -1 to 1 in joystick order, missing axes count as 0
+            buttons: pressed flags in joystick order, missing buttons count as not pressed
+
+            Returns:
+            ControllerState
+        """
+        axes = list(axes[:CONTROLLER_AXES]) + [0.0] * (CONTROLLER_AXES - len(axes[:CONTROLLER_AXES]))
+        buttons = tuple(bool(pressed) for pressed in buttons[:CONTROLLER_BUTTONS])
+        buttons += (False,) * (CONTROLLER_BUTTONS - len(buttons))
+
+        moveX, moveY, aimX, aimY, leftTrigger, rightTrigger = axes
+        if -MOVE_DEADZONE < moveX < MOVE_DEADZONE:
+            moveX = 0
+        if -MOVE_DEADZONE < moveY < MOVE_DEADZONE:
+            moveY = 0
+
+        # the aim stick counts as a whole, the angle needs both axes
+        if -AIM_DEADZONE <= aimX <= AIM_DEADZONE and -AIM_DEADZONE <= aimY <= AIM_DEADZONE:
+            aimX = 0
+            aimY = 0
+
+        return cls(moveX, moveY, aimX, aimY, leftTrigger, rightTrigger, buttons)
+
+    @classmethod
+    def fromJoystick(cls, joystick):
+        """
+            Description:
+            Samples a pygame Joystick or VirtualJoystick
+
+            Returns:
+            ControllerState
+        """
+        axes = [joystick.get_axis(axis) for axis in range(min(CONTROLLER_AXES, joystick.get_numaxes()))]
+        buttons = [joystick.get_button(button) for button in range(min(CONTROLLER_BUTTONS, joystick.get_numbuttons()))]
+        return cls.fromAxes(axes, buttons)
+
+    def isPressed(self, button):
+        """
+            Description:
+            Returns True if the button is pressed
+        """
+        return self.buttons[button]
+
+    def isAiming(self):
+        """
+            Description:
+            Returns True if the aim stick is outside its deadzone
+        """
+        return self.aimX != 0 or self.aimY != 0
+
+    def getAxes(self):
+        """
+            Description:
+            Returns the axis values in joystick order, fromAxes turns them back into the same ControllerState
+        """
+        return (self.moveX, self.moveY, self.aimX, self.aimY, self.leftTrigger, self.rightTrigger)
+
+# what an unplugged controller reads as
+NO_CONTROLLER = ControllerState.fromAxes((), ())
+
+class InputState(namedtuple("InputState", ("mousePos", "mouseButtons", "keys", "controllers"))):
+    """
+        Description:
+        Everyone's input for one tick. Immutable, so it can be recorded, shared and compared safely
+
+        Attributes:
+        mousePos: (x, y) of the cursor
+        mouseButtons: (left, middle, right) pressed flags
+        keys: frozenset of the GAME_KEYS held down
+        controllers: tuple of ControllerStates, in joystick order
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, mousePos, mouseButtons, keys, controllers=()):
+        """
+            Description:
+            Builds an InputState, for anything that makes input without devices (replays, bots, the network)
+
+            Args:
+            mousePos: (x, y) of the cursor
+            mouseButtons: (left, middle, right) pressed flags
+            keys: iterable of pygame key constants that are held down
+            controllers: iterable of ControllerStates, or (axes, buttons) pairs that go through ControllerState.fromAxes
+
+            Returns:
+            InputState
+        """
+        controllerStates = []
+        for controller in controllers:
+            if not isinstance(controller, ControllerState):
+                controller = ControllerState.fromAxes(*controller)
+            controllerStates.append(controller)
+
+        return cls((int(mousePos[0]), int(mousePos[1])), tuple(bool(pressed) for pressed in mouseButtons[:3]),
+                   frozenset(key for key in keys if key in GAME_KEYS), tuple(controllerStates))
+
+    def isHeld(self, *keys):
+        """
+            Description:
+            Returns True if any of the keys is held down
+        """
+        for key in keys:
+            if key in self.keys:
+                return True
+        return False
+
+class ControllerManager():
+    """
+        Description:
+        Keeps track of the connected controllers from pygame's JOYDEVICEADDED and JOYDEVICEREMOVED events.
+        Every controller gets a slot, slot 0 is the first controller player and so on. A slot stays reserved when
+        its controller is unplugged, so plugging it back in (or any other controller) picks the same player back up
+    """
+    def __init__(self, maxSlots=MAX_CONTROLLERS):
+        self.slots = [None] * maxSlots
+
+        # guid of the controller that was last in each slot, so a controller that reconnects gets its old slot back
+        self.slotGuids = [None] * maxSlots
+
+        # joystick instance id -> slot
+        self.instanceSlots = {}
+
+    def scan(self):
+        """
+            Description:
+            Picks up every controller that's already plugged in. pygame also sends JOYDEVICEADDED for these, the duplicates are ignored
+        """
+        for deviceIndex in range(pygame.joystick.get_count()):
+            self.connect(pygame.joystick.Joystick(deviceIndex))
+
+    def connect(self, joystick):
+        """
+            Description:
+            Puts a newly connected controller in a slot
+
+            Args:
+            joystick: the pygame Joystick
+
+            Returns:
+            the slot it went in, or None if it's already connected or every slot is taken
+        """
+        instanceId = joystick.get_instance_id()
+        if instanceId in self.instanceSlots:
+            return None
+
+        guid = joystick.get_guid()
+        emptySlots = [slot for slot in range(len(self.slots)) if self.slots[slot] is None]
+        if not emptySlots:
+            return None
+
+        # the slot this controller had before if it's free, otherwise the first free one
+        slot = emptySlots[0]
+        for emptySlot in emptySlots:
+            if self.slotGuids[emptySlot] == guid:
+                slot = emptySlot
+                break
+
+        self.slots[slot] = joystick
+        self.slotGuids[slot] = guid
+        self.instanceSlots[instanceId] = slot
+        return slot
+
+    def disconnect(self, instanceId):
+        """
+            Description:
+            Frees the slot of a controller that was unplugged, the slot stays reserved for it
+
+            Returns:
+            the slot it was in, or None if it didn't have one
+        """
+        slot = self.instanceSlots.pop(instanceId, None)
+        if slot is not None:
+            self.slots[slot] = None
+        return slot
+
+    def handleEvent(self, event):
+        """
+            Description:
+            Connects or disconnects a controller, call with every event
+
+            Returns:
+            the slot that changed, or None if nothing did
+        """
+        if event.type == pygame.JOYDEVICEADDED:
+            return self.connect(pygame.joystick.Joystick(event.device_index))
+        if event.type == pygame.JOYDEVICEREMOVED:
+            return self.disconnect(event.instance_id)
+        return None
+
+    def getSlot(self, instanceId):
+        """
+            Description:
+            Returns the slot of the controller with this instance id (every joystick event has one), or None
+        """
+        return self.instanceSlots.get(instanceId)
+
+    def isConnected(self, slot):
+        """
+            Description:
+            Returns True if the slot has a controller in it
+        """
+        return self.slots[slot] is not None
+
+    def compact(self):
+        """
+            Description:
+            Moves the connected controllers down into the first slots, done when a match starts so controller player i is slot i
+        """
+        connected = [slot for slot in range(len(self.slots)) if self.slots[slot] is not None]
+        self.slots = [self.slots[slot] for slot in connected] + [None] * (len(self.slots) - len(connected))
+        self.slotGuids = [self.slotGuids[slot] for slot in connected] + [None] * (len(self.slotGuids) - len(connected))
+        self.instanceSlots = dict((self.slots[slot].get_instance_id(), slot) for slot in range(len(connected)))
+
+    def getJoysticks(self):
+        """
+            Description:
+            Returns the joystick in every slot, None for empty ones
+        """
+        return list(self.slots)
+
+# the mouse and keyboard the mouse player reads, swapped out by headless mode
+mouseKeyboard = PygameMouseKeyboard()
+
+def setMouseKeyboard(source):
+    """
+        Description:
+        Replaces where mouse and keyboard input comes from
+
+        Args:
+        source: PygameMouseKeyboard, ScriptedMouseKeyboard or anything with the same methods
+    """
+    global mouseKeyboard
+    mouseKeyboard = source
+
+def sampleInput(joysticks):
+    """
+        Description:
+        Reads the mouse, keyboard and every joystick once, call once per tick
+
+        Args:
+        joysticks: the controller players' joysticks in order, pygame Joysticks or VirtualJoysticks. None for an unplugged controller
+
+        Returns:
+        InputState
+    """
+    pressedKeys = mouseKeyboard.getPressedKeys()
+    keys = [key for key in GAME_KEYS if pressedKeys[key]]
+    controllerStates = [ControllerState.fromJoystick(joystick) if joystick is not None else NO_CONTROLLER for joystick in joysticks]
+    return InputState.create(mouseKeyboard.getMousePos(), mouseKeyboard.getMouseButtons(), keys, controllerStates)
+
+# the real controllers, fed by the event loop
+controllers = ControllerManager()
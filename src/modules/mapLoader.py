@@ -0,0 +1,219 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Loads maps from json map files. Each file is compiled once (checked, defaults filled in,
+    static collision merged into as few boxes as possible and spatial grid cells worked out) and the result is cached next to the maps keyed by the file's hash,
+    so starting the game only recompiles maps that actually changed
+"""
+
+# I - Import & Initialize
+import hashlib
+import json
+import os
+import pickle
+import pygame
+from . import mapManager
+
+# bumped whenever the compiled layout changes, so old caches get recompiled
+CACHE_VERSION = 2
+
+# where compiled maps are kept
+CACHE_FOLDER = os.path.join("src", "maps", ".cache")
+
+# must match MapSpriteGroup's cell size, the grid cells are worked out at compile time
+GRID_CELL_SIZE = 64
+
+COLLISION_TYPES = ("solid", "damage", "bounce")
+
+# every piece field and what it is when the map file leaves it out
+PIECE_DEFAULTS = {
+    "color": (0, 0, 0),
+    "alpha": 255,
+    "collisionType": "solid",
+    "latchable": False,
+    "physics": False,
+    "gravity": 0,
+    "decorative": False,
+}
+
+class MapFormatError(ValueError):
+    """
+        Description:
+        Raised when a map file is missing something or has a bad value
+    """
+    pass
+
+class LoadedMap():
+    """
+        Description:
+        A map ready to play on
+
+        Attributes:
+        name: the map's name
+        size: (width, height) the map was made for
+        mapSprites: MapSpriteGroup of every map piece, in the file's draw order
+        physicsObjects: the pieces affected by gravity
+        spawnPoints: list of (x, y), mouse player first then each joystick
+        collisionBoxes: the merged mapManager.CollisionBoxes standing in for the static pieces
+    """
+    def __init__(self, name, size, mapSprites, physicsObjects, spawnPoints, collisionBoxes):
+        self.name = name
+        self.size = size
+        self.mapSprites = mapSprites
+        self.physicsObjects = physicsObjects
+        self.spawnPoints = spawnPoints
+        self.collisionBoxes = collisionBoxes
+
+def compilePiece(piece, index):
+    """
+        Description:
+        Checks one piece from a map file and fills in its defaults
+
+        Args:
+        piece: the piece's dictionary from the file
+        index: its position in the file, for error messages
+
+        Returns:
+        the piece as a dictionary with every field
+    """
+    if "rect" not in piece or len(piece["rect"]) != 4:
+        raise MapFormatError("piece " + str(index) + " needs a rect of [x, y, width, height]")
+
+    compiled = dict(PIECE_DEFAULTS)
+    for field in PIECE_DEFAULTS:
+        if field in piece:
+            compiled[field] = piece[field]
+
+    compiled["rect"] = tuple(int(value) for value in piece["rect"])
+    compiled["color"] = tuple(int(value) for value in compiled["color"])
+    if compiled["collisionType"] not in COLLISION_TYPES:
+        raise MapFormatError("piece " + str(index) + " has unknown collisionType " + str(compiled["collisionType"]))
+
+    # static solid and bounce pieces get merged, everything else is collided with as itself.
+    # damage pieces stay separate since each one blows up on its own
+    compiled["merged"] = not compiled["physics"] and not compiled["decorative"] and compiled["collisionType"] != "damage"
+
+    # the grid cells it covers, physics pieces move so theirs are only where they start
+    if compiled["decorative"] or compiled["merged"]:
+        compiled["cells"] = None
+    else:
+        compiled["cells"] = getCells(compiled["rect"])
+    return compiled
+
+def getCells(rect):
+    """
+        Description:
+        Returns the grid cells a rect covers in a MapSpriteGroup
+    """
+    return mapManager.SpatialHash(GRID_CELL_SIZE).cellsForRect(pygame.Rect(rect))
+
+def compileMap(mapData):
+    """
+        Description:
+        Turns a map file's contents into everything loadMap needs, so none of it has to be worked out at startup
+
+        Args:
+        mapData: the parsed map file
+
+        Returns:
+        dictionary with the name, size, spawn points, compiled pieces and merged collision boxes
+    """
+    if not mapData.get("pieces"):
+        raise MapFormatError("map has no pieces")
+
+    pieces = [compilePiece(piece, index) for index, piece in enumerate(mapData["pieces"])]
+
+    # decorative pieces have no collision so they're left out completely
+    geometry = mapManager.compileCollisionGeometry([(piece["rect"], piece["collisionType"], piece["latchable"]) for piece in pieces if piece["merged"]])
+    collisionBoxes = [{"rect": rect, "collisionType": collisionType, "latchable": latchable, "cells": getCells(rect)}
+                      for rect, collisionType, latchable in geometry]
+
+    return {
+        "version": CACHE_VERSION,
+        "name": mapData.get("name", "unnamed"),
+        "size": tuple(mapData.get("size", (1280, 720))),
+        "spawnPoints": [tuple(point) for point in mapData.get("spawnPoints", [])],
+        "pieces": pieces,
+        "collisionBoxes": collisionBoxes,
+    }
+
+def getCachePath(mapPath, fileHash):
+    """
+        Description:
+        Returns where the compiled version of a map file with this hash is cached
+    """
+    mapName = os.path.splitext(os.path.basename(mapPath))[0]
+    return os.path.join(CACHE_FOLDER, mapName + "-" + fileHash + ".bin")
+
+def loadCompiledMap(mapPath):
+    """
+        Description:
+        Returns a map file compiled, straight from the cache when the file hasn't changed since it was compiled
+
+        Args:
+        mapPath: the map's json file
+
+        Returns:
+        the compiled map from compileMap
+    """
+    with open(mapPath, "rb") as mapFile:
+        fileBytes = mapFile.read()
+
+    fileHash = hashlib.sha1(fileBytes + str(CACHE_VERSION).encode()).hexdigest()
+    cachePath = getCachePath(mapPath, fileHash)
+
+    if os.path.exists(cachePath):
+        try:
+            with open(cachePath, "rb") as cacheFile:
+                compiled = pickle.load(cacheFile)
+            if compiled.get("version") == CACHE_VERSION:
+                return compiled
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            # a broken cache just gets recompiled
+            pass
+
+    compiled = compileMap(json.loads(fileBytes.decode("utf-8")))
+
+    # a read only install still works, it just compiles every time
+    try:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        with open(cachePath, "wb") as cacheFile:
+            pickle.dump(compiled, cacheFile, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+    return compiled
+
+def loadMap(screen, mapPath):
+    """
+        Description:
+        Loads a map file and builds its sprites
+
+        Args:
+        screen: display surface
+        mapPath: the map's json file
+
+        Returns:
+        LoadedMap
+    """
+    compiled = loadCompiledMap(mapPath)
+
+    mapSprites = mapManager.MapSpriteGroup(cellSize=GRID_CELL_SIZE)
+    physicsObjects = pygame.sprite.Group()
+
+    # the merged static collision goes in the grid first, then the pieces that collide as themselves
+    collisionBoxes = []
+    for box in compiled["collisionBoxes"]:
+        collisionBox = mapManager.CollisionBox(box["rect"], box["collisionType"], box["latchable"])
+        mapSprites.addCollisionBox(collisionBox, box["cells"])
+        collisionBoxes.append(collisionBox)
+
+    for piece in compiled["pieces"]:
+        x, y, width, height = piece["rect"]
+        sprite = mapManager.StaticMapObject(screen, x, y, width, height, piece["color"], piece["alpha"], piece["collisionType"],
+                                            piece["latchable"], piece["physics"], piece["gravity"], piece["decorative"])
+        mapSprites.addIndexed(sprite, piece["cells"])
+        if piece["physics"]:
+            physicsObjects.add(sprite)
+
+    return LoadedMap(compiled["name"], compiled["size"], mapSprites, physicsObjects, compiled["spawnPoints"], collisionBoxes)
@@ -5,8 +5,363 @@
 """
 
 # I - Import & Initialize
+import heapq
 import pygame
 
+class SpatialHash():
+    """
+        Description:
+        Uniform grid that buckets sprites by the cells their rect covers.
+        Used to find the map pieces near a rect without walking the whole map
+    """
+    def __init__(self, cellSize=64):
+        self.cellSize = cellSize
+
+        # (cellX, cellY) -> list of sprites touching that cell
+        self.cells = {}
+
+        # sprite -> the cells it was last inserted into, so moving a sprite only touches its own cells
+        self.spriteCells = {}
+
+        # insertion order, so queries come back in the same order as iterating the sprite group
+        self.order = {}
+        self.nextOrder = 0
+
+    def cellsForRect(self, rect):
+        """
+            Description:
+            Returns the cells a rect overlaps
+
+            Args:
+            rect: pygame.Rect
+
+            Returns:
+            list of (cellX, cellY) tuples
+        """
+        size = self.cellSize
+        right = max(rect.left, rect.right - 1)
+        bottom = max(rect.top, rect.bottom - 1)
+        return [(cellX, cellY)
+                for cellX in range(rect.left // size, right // size + 1)
+                for cellY in range(rect.top // size, bottom // size + 1)]
+
+    def insert(self, sprite, cells=None):
+        """
+            Description:
+            Adds a sprite to every cell its rect covers
+
+            Args:
+            sprite: the sprite
+            cells: the cells it covers if they're already known (a compiled map), None works them out
+        """
+        if sprite not in self.order:
+            self.order[sprite] = self.nextOrder
+            self.nextOrder += 1
+
+        spriteCells = self.cellsForRect(sprite.rect) if cells is None else list(cells)
+        for cell in spriteCells:
+            self.cells.setdefault(cell, []).append(sprite)
+        self.spriteCells[sprite] = spriteCells
+
+    def remove(self, sprite):
+        """
+            Description:
+            Removes a sprite from the grid
+        """
+        spriteCells = self.spriteCells.pop(sprite, None)
+        if spriteCells is None:
+            return
+
+        for cell in spriteCells:
+            bucket = self.cells[cell]
+            bucket.remove(sprite)
+            if not bucket:
+                del self.cells[cell]
+        del self.order[sprite]
+
+    def move(self, sprite):
+        """
+            Description:
+            Re-buckets a sprite after its rect changed. Only does work if it crossed into different cells
+        """
+        if sprite not in self.spriteCells:
+            return
+
+        spriteCells = self.cellsForRect(sprite.rect)
+        if spriteCells == self.spriteCells[sprite]:
+            return
+
+        order = self.order[sprite]
+        self.remove(sprite)
+        self.order[sprite] = order
+        for cell in spriteCells:
+            self.cells.setdefault(cell, []).append(sprite)
+        self.spriteCells[sprite] = spriteCells
+
+    def query(self, rect):
+        """
+            Description:
+            Finds every sprite sharing a cell with the rect. These are the only sprites that can collide with it
+
+            Args:
+            rect: pygame.Rect to search around
+
+            Returns:
+            list of sprites, in insertion order
+        """
+        return self.queryCells(self.cellsForRect(rect))
+
+    def queryCells(self, cells):
+        """
+            Description:
+            Finds every sprite in any of the given cells
+
+            Args:
+            cells: iterable of (cellX, cellY) tuples
+
+            Returns:
+            list of sprites, in insertion order
+        """
+        found = set()
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+
+        return sorted(found, key=self.order.__getitem__)
+
+class MapSpriteGroup(pygame.sprite.Group):
+    """
+        Description:
+        Sprite group for the map that keeps a SpatialHash of everything that can be collided with.
+        Collision code asks it for the sprites near a rect instead of looping over every map piece.
+        Decorative pieces are members (they still get drawn) but never go in the grid, so collision loops never see them.
+        version goes up whenever a piece is added or removed, so anything built from the map knows when to rebuild
+    """
+    def __init__(self, *sprites, cellSize=64):
+        # the grid has to exist before the parent __init__ starts adding sprites
+        self.grid = SpatialHash(cellSize)
+        self.version = 0
+        pygame.sprite.Group.__init__(self, *sprites)
+
+    def add_internal(self, sprite, *args):
+        pygame.sprite.Group.add_internal(self, sprite, *args)
+        if sprite.hasCollision and not sprite.decorative:
+            self.grid.insert(sprite)
+        self.version += 1
+
+    def remove_internal(self, sprite):
+        pygame.sprite.Group.remove_internal(self, sprite)
+        self.grid.remove(sprite)
+        self.version += 1
+
+        # anything sleeping on top of it has nothing to stand on anymore
+        self.wakeAbove(sprite.rect)
+
+    def addIndexed(self, sprite, cells):
+        """
+            Description:
+            Adds a sprite using grid cells worked out ahead of time, see mapLoader
+
+            Args:
+            sprite: the map piece
+            cells: the (cellX, cellY) cells its rect covers, None if a CollisionBox already covers its collision
+        """
+        pygame.sprite.Group.add_internal(self, sprite)
+        sprite.add_internal(self)
+        if cells is not None:
+            self.grid.insert(sprite, cells)
+        self.version += 1
+
+    def addCollisionBox(self, box, cells):
+        """
+            Description:
+            Puts a merged CollisionBox in the grid. It isn't a member of the group since there's nothing to draw
+
+            Args:
+            box: the CollisionBox
+            cells: the (cellX, cellY) cells its rect covers
+        """
+        self.grid.insert(box, cells)
+
+    def moveSprite(self, sprite):
+        """
+            Description:
+            Call after a member's rect moves so the grid stays accurate
+        """
+        self.grid.move(sprite)
+
+    def wakeAbove(self, rect):
+        """
+            Description:
+            Wakes the sleeping physics objects resting on top of a rect, call when whatever is in that rect moves or goes away
+
+            Args:
+            rect: where the supporting piece was
+        """
+        above = pygame.Rect(rect.left, rect.top - 1, rect.width, 1)
+        for sprite in self.grid.query(above):
+            if sprite.affectedByGravity and sprite.sleeping and sprite.rect.colliderect(above):
+                sprite.wake()
+
+    def spritesNear(self, rect):
+        """
+            Description:
+            Returns the map sprites that could be touching the rect
+        """
+        return self.grid.query(rect)
+
+    def spritesInCells(self, cells):
+        """
+            Description:
+            Returns the map sprites in any of the given grid cells. Used by batched queries like the bullet pool
+        """
+        return self.grid.queryCells(cells)
+
+def mergeRects(rects):
+    """
+        Description:
+        Merges rects into as few non-overlapping rects as it can that cover exactly the same area.
+        The rect edges split the area into a grid of cells, then each free filled cell grows right as far as it can
+        and then down while the row below covers the same span
+
+        Args:
+        rects: list of (x, y, width, height)
+
+        Returns:
+        list of (x, y, width, height)
+    """
+    if not rects:
+        return []
+
+    xs = sorted(set([x for x, y, width, height in rects] + [x + width for x, y, width, height in rects]))
+    ys = sorted(set([y for x, y, width, height in rects] + [y + height for x, y, width, height in rects]))
+    columnOf = dict((x, index) for index, x in enumerate(xs))
+    rowOf = dict((y, index) for index, y in enumerate(ys))
+
+    # filled[row][column] is True where any rect covers that cell, taken once a merged rect uses it
+    filled = [[False] * (len(xs) - 1) for row in range(len(ys) - 1)]
+    for x, y, width, height in rects:
+        for row in range(rowOf[y], rowOf[y + height]):
+            for column in range(columnOf[x], columnOf[x + width]):
+                filled[row][column] = True
+
+    merged = []
+    for row in range(len(ys) - 1):
+        for column in range(len(xs) - 1):
+            if not filled[row][column]:
+                continue
+
+            endColumn = column
+            while endColumn + 1 < len(xs) - 1 and filled[row][endColumn + 1]:
+                endColumn += 1
+
+            # only grow down into rows that are filled across exactly the same span, growing into part of a wider row
+            # would cut it in two (a pedestal on the floor would split the floor)
+            endRow = row
+            while endRow + 1 < len(ys) - 1:
+                below = filled[endRow + 1]
+                if not all(below[column:endColumn + 1]):
+                    break
+                if column > 0 and below[column - 1]:
+                    break
+                if endColumn + 2 < len(xs) and below[endColumn + 1]:
+                    break
+                endRow += 1
+
+            for takenRow in range(row, endRow + 1):
+                for takenColumn in range(column, endColumn + 1):
+                    filled[takenRow][takenColumn] = False
+
+            merged.append((xs[column], ys[row], xs[endColumn + 1] - xs[column], ys[endRow + 1] - ys[row]))
+
+    return merged
+
+def compileCollisionGeometry(pieces):
+    """
+        Description:
+        Works out the collision boxes for a map's static pieces. Touching or overlapping pieces are merged,
+        but only with pieces of the same collisionType and latchable so the merged boxes behave exactly like the pieces did
+
+        Args:
+        pieces: list of (rect, collisionType, latchable) for the static, non decorative pieces
+
+        Returns:
+        list of (rect, collisionType, latchable), one per merged box
+    """
+    # keep the order the kinds first show up in, so the result doesn't depend on dictionary ordering
+    kinds = []
+    rectsByKind = {}
+    for rect, collisionType, latchable in pieces:
+        kind = (collisionType, latchable)
+        if kind not in rectsByKind:
+            kinds.append(kind)
+            rectsByKind[kind] = []
+        rectsByKind[kind].append(tuple(rect))
+
+    boxes = []
+    for collisionType, latchable in kinds:
+        for rect in mergeRects(rectsByKind[(collisionType, latchable)]):
+            boxes.append((rect, collisionType, latchable))
+    return boxes
+
+class CollisionBox():
+    """
+        Description:
+        A merged piece of static map collision, see compileCollisionGeometry.
+        It has the same collision attributes as a StaticMapObject so collision code treats both the same, but is never drawn
+    """
+    affectedByGravity = False
+    hasCollision = True
+    decorative = False
+    blownUp = False
+
+    def __init__(self, rect, collisionType="solid", latchable=False):
+        self.rect = pygame.Rect(rect)
+        self.collisionType = collisionType
+        self.latchable = latchable
+
+class StaticMapLayer():
+    """
+        Description:
+        The background with every map piece that never moves (not affected by gravity) drawn onto it, so they cost one blit
+        instead of one alpha blended blit each. Rebuilt when the map changes, like a damage block blowing up
+
+        Attributes:
+        surface: the baked background
+        version: the MapSpriteGroup version it was baked from
+    """
+    def __init__(self, background, mapSprites):
+        self.background = background
+        self.mapSprites = mapSprites
+        self.surface = None
+        self.version = None
+        self.rebuild()
+
+    def rebuild(self):
+        """
+            Description:
+            Bakes the static map pieces onto a copy of the background, in the map's draw order
+        """
+        self.surface = self.background.copy()
+        for sprite in self.mapSprites:
+            if not sprite.affectedByGravity:
+                self.surface.blit(sprite.image, sprite.rect)
+        self.version = self.mapSprites.version
+
+    def refresh(self):
+        """
+            Description:
+            Rebuilds the layer if the map changed since it was baked
+
+            Returns:
+            True if it was rebuilt
+        """
+        if self.mapSprites.version == self.version:
+            return False
+        self.rebuild()
+        return True
+
 class MapObject(pygame.sprite.Sprite):
     """
         Description:
@@ -28,13 +383,18 @@ class MapObject(pygame.sprite.Sprite):
         self.canBeDestroyed = False
         self.objectHealth = 0
         self.latchable = False
+        self.decorative = False
+        self.sleeping = False
        
 class StaticMapObject(MapObject):
     """
         Description:
         StaticMapObject class, originally
-        for static map components but also supports physics objects
+        for static map components but also supports physics objects.
+        A physics object that sits still for SLEEP_TICKS ticks falls asleep and skips gravity until something
+        pushes it or whatever it rests on moves away
     """
+    SLEEP_TICKS = 30
 
     def __init__(self, screen, x, y, width, height, color=(0, 0, 0), alpha=255, collisionType="solid", latchable=False, affectedByGravity=False, gravity=0, decorative=False):
         MapObject.__init__(self, screen)
@@ -60,12 +420,18 @@ class StaticMapObject(MapObject):
         self.decorative = decorative
         self.blownUp = False
 
+        # ticks in a row it hasn't moved, see runtimeGravity
+        self.restingTicks = 0
+
     def runtimeGravity(self, mapSprites):
         """
             Description:
-            Simulates gravity for the object by increasing its vertical velocity
+            Simulates gravity for the object by increasing its vertical velocity.
+            Does nothing while asleep, and puts the object to sleep once it has been resting long enough
         """
-        if self.affectedByGravity:
+        if self.affectedByGravity and not self.sleeping:
+            previousRect = self.rect.copy()
+
             # simulate gravity by increasing vertical velocity
             self.verticalVelocity += self.gravity  
             if self.verticalVelocity > 12:
@@ -74,6 +440,22 @@ class StaticMapObject(MapObject):
             # move object vertically
             self.moveVertical(self.verticalVelocity, mapSprites)
 
+            # landed back where it was, so it's resting on something
+            if self.rect == previousRect and self.verticalVelocity == 0:
+                self.restingTicks += 1
+                if self.restingTicks >= self.SLEEP_TICKS:
+                    self.sleeping = True
+            else:
+                self.restingTicks = 0
+
+    def wake(self):
+        """
+            Description:
+            Wakes the object up so gravity runs on it again
+        """
+        self.sleeping = False
+        self.restingTicks = 0
+
     def moveVertical(self, y, mapSprites):
         """
             Description:
@@ -81,80 +463,123 @@ class StaticMapObject(MapObject):
 
             args:
                 y: int, the amount to move vertically
-                mapSprites: list, the list of sprites to check for collisions
+                mapSprites: MapSpriteGroup, the map sprites to check for collisions
         """
 
+        # being moved means it needs gravity again
+        if self.sleeping:
+            self.wake()
+
         # move vertically and check for collisions
+        previousRect = self.rect.copy()
         self.rect.top += y
-        for sprite in mapSprites:
+        for sprite in mapSprites.spritesNear(self.rect):
             if sprite != self and pygame.sprite.collide_rect(self, sprite):
                 if y > 0:  # falling down
-                    if sprite.decorative:
-                        continue
-
                     self.rect.bottom = sprite.rect.top
                     self.verticalVelocity = 0  
                 elif y < 0:  # moving up
-                    if sprite.decorative:
-                        continue
-
                     self.rect.top = sprite.rect.bottom
                     self.verticalVelocity = 0 
 
-        # update the center position to ensure it is accurate
+        # update the center position to ensure it is accurate, and let the grid know we moved
         self.y = self.rect.center[1]
+        mapSprites.moveSprite(self)
 
-    def moveHorizontal(self, x, mapSprites, movedSprites=None):
+        # anything resting on it has to fall or move with it
+        if self.rect != previousRect:
+            mapSprites.wakeAbove(previousRect)
+
+    def moveHorizontal(self, x, mapSprites):
         """
             Description:
-            Moves the object horizontally and checks for collisions
+            Moves the object horizontally, pushing every physics object in its way along with it.
+            The whole row of blocks it could reach is found first (walking the grid, no recursion). A block with a gap
+            in front of it only pushes the next one once the gap is closed, and the row stops at the first non physics piece
             
             args:
                 x: int, the amount to move horizontally
-                mapSprites: list, the list of sprites to check for collisions
-                movedSprites: list, the list of sprites that have already been moved. this was added because physics objects can move other physics objects
+                mapSprites: MapSpriteGroup, the map sprites to check for collisions
+
+            return:
+                int, how far the object actually moved
             """
         # no movement so dont run it
         if x == 0: 
-            return
+            return 0
 
-        if movedSprites is None:
-            # initialize the list of already moved sprites aka other physics objects
-            movedSprites = [] 
+        direction = 1 if x > 0 else -1
+        reach = abs(x)
+        distance = reach
 
-        # prevent infinite recursion by skipping already processed sprites
-        if self in movedSprites:
-            return  
+        # find every block that gets pushed, closest first, each one is only looked at once.
+        # slack is how far this object has to move before a block starts moving, the gaps between it and the block added up
+        slack = {self: 0}
 
-        movedSprites.append(self) 
-        self.rect.left += x 
+        # counts every push onto the queue, so two entries never tie and heapq never has to compare the blocks themselves
+        pushes = 0
+        queue = [(0, pushes, self)]
+        row = []
+        visited = set()
+        riders = []
+        while queue:
+            # ties go to whichever entry was pushed first
+            blockSlack, pushed, block = heapq.heappop(queue)
+            if block in visited:
+                continue
+            visited.add(block)
+            row.append(block)
 
-        for sprite in mapSprites:
-            # if the sprite is not itself and there is a collision
-            if sprite != self and pygame.sprite.collide_rect(self, sprite):
-                if sprite.decorative:  
-                    # decorative objects shouldnt have collision
+            # the most this block could move, and what it would sweep through doing it.
+            # the same grid query finds whatever sleeps on top of it, woken below if it moves
+            movedRect = block.rect.move(direction * (reach - blockSlack), 0)
+            sweptRect = block.rect.union(movedRect)
+            above = pygame.Rect(block.rect.left, block.rect.top - 1, block.rect.width, 1)
+            for sprite in mapSprites.spritesNear(sweptRect.union(above)):
+                if sprite in visited:
                     continue
 
-                # obj moving left
-                if x < 0:  
-                    if sprite.affectedByGravity:
-                        sprite.moveHorizontal(x, mapSprites, movedSprites)
-                    else: 
-                        self.rect.left = sprite.rect.right
-                        # stop further movement
-                        return  
-                    
-                # obj moving right
-                elif x > 0:  
-                    if sprite.affectedByGravity:
-                        sprite.moveHorizontal(x, mapSprites, movedSprites)
-                    else:  
-                        self.rect.right = sprite.rect.left
-                        return 
-
-        # update the center position to ensure it is accurate
-        self.x = self.rect.center[0]
+                if not sweptRect.colliderect(sprite.rect):
+                    if sprite.affectedByGravity and sprite.sleeping and above.colliderect(sprite.rect):
+                        riders.append((sprite, block))
+                    continue
+
+                if direction > 0:
+                    gap = max(sprite.rect.left - block.rect.right, 0)
+                else:
+                    gap = max(block.rect.left - sprite.rect.right, 0)
+
+                if sprite.affectedByGravity:
+                    # another physics object, it gets pushed too once the gap to it is closed
+                    if blockSlack + gap < slack.get(sprite, reach + 1):
+                        slack[sprite] = blockSlack + gap
+                        pushes += 1
+                        heapq.heappush(queue, (blockSlack + gap, pushes, sprite))
+                else:
+                    # a wall or platform, this block can only move up to it
+                    distance = min(distance, blockSlack + gap)
+
+        # move the row, each block by whatever is left once its gap is closed
+        for block in row:
+            if slack[block] > distance:
+                continue
+
+            # being pushed wakes it up
+            block.wake()
+            moved = distance - slack[block]
+            if moved > 0:
+                block.rect.left += direction * moved
+
+                # update the center position to ensure it is accurate, and let the grid know we moved
+                block.x = block.rect.center[0]
+                mapSprites.moveSprite(block)
+
+        # anything resting on a block that moved loses its support
+        for rider, block in riders:
+            if slack[block] < distance:
+                rider.wake()
+
+        return direction * distance
 
     def update(self):
         """
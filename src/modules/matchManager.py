@@ -0,0 +1,219 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: A match of Gundown (map, players, bullets) stepped one simulation tick at a time.
+    It does no drawing so the game window and headless mode can both run it
+"""
+
+# I - Import & Initialize
+import pygame
+from . import entities, utils, gui, weaponManager, simulationManager, profileManager, mapLoader
+
+# the map every match is played on for now
+DEFAULT_MAP = "src/maps/mapA.json"
+
+class Match():
+    """
+        Description:
+        Holds everything in a match and runs the game logic for one tick at a time
+
+        Attributes:
+        players: the player sprites, player 1 is always mouse and keyboard
+        mapSprites: MapSpriteGroup of every map piece
+        physicsObjects: the map pieces affected by gravity
+        spawnPoints: the map's spawn points, see utils.generalizedRespawn
+        allSprites: every sprite that gets drawn on its own, the map pieces that never move are baked by the renderer instead
+        bulletPool: the shared BulletPool
+        gameEnd: None while playing, the winner's color once the game is over
+        roundOver: True from the tick a round is won until finishRound is called with the card draft's results
+        scheduler: the TickScheduler with everything a tick runs
+        lastBulletReport: the bullet report of the last finished round (see BulletLifecycle.getReport), None before the first one
+    """
+    def __init__(self, screen, playerColors, joysticks, sounds, mapPath=DEFAULT_MAP, debug=False):
+        """
+            Args:
+            screen: display surface (the dummy driver's surface when headless)
+            playerColors: a color per player, mouse player first
+            joysticks: a joystick per controller player, pygame Joysticks or VirtualJoysticks. None for one that's unplugged
+            sounds: dictionary with "shot", "reload" and "shield" sounds
+            mapPath: the map file to play on
+            debug: print shields, hits and reloads as they happen
+        """
+        self.screen = screen
+        self.shotFx = sounds["shot"]
+        self.reloadFx = sounds["reload"]
+        self.shieldFx = sounds["shield"]
+
+        # Used to store the dead players, will be used to detect when 1 player is alive and call for the new ability cards
+        self.deadPlayers = []
+        self.disableRespawns = False
+        self.gameEnd = None
+        self.roundOver = False
+        self.lastBulletReport = None
+
+        # load the map, compiled maps are cached so this is quick after the first run
+        loadedMap = mapLoader.loadMap(screen, mapPath)
+        self.mapSprites = loadedMap.mapSprites
+        self.physicsObjects = loadedMap.physicsObjects
+        self.spawnPoints = loadedMap.spawnPoints
+
+        # PLAYERS:
+
+        # create the players with the colors selected
+        self.players = pygame.sprite.Group()
+
+        # create a player sprite object from our mySprites module. p1 is always mouse
+        self.players.add(entities.Player(screen, 100, 100, "mouse", playerColors[0], None))
+
+        # create a player for each game controller, each one reads the InputState's controller in the same slot
+        for i in range(len(joysticks)):
+            self.players.add(entities.Player(screen, 100, 100, "controller", playerColors[i + 1], joysticks[i], i))
+
+        # attach pistols onto all the players using attachWeapon
+        for player in self.players:
+            player.debug = debug
+            player.attachWeapon(weaponManager.BasicPistol(screen, player))
+
+        # now respawn them at the correct positions
+        utils.generalizedRespawn(self.players, self.spawnPoints)
+
+        # for every player, create a scorekeeper object. its a 3 square bar top left corner with small rects for no points and scaled squares for points
+        self.scoreKeepers = pygame.sprite.Group()
+        for player in self.players:
+            self.scoreKeepers.add(gui.ScoreKeeper(screen, player, (20, 10 + 40 * self.players.sprites().index(player))))
+
+        # add all sprites include the player, weapon and the map sprites that move to the allSprites group.
+        # the rest of the map never moves, the renderer bakes it into the background
+        self.allSprites = pygame.sprite.OrderedUpdates(self.physicsObjects, self.players, self.scoreKeepers)
+
+        # for each player, append their weapon to the allSprites group
+        for player in self.players:
+            self.allSprites.add(player.weapon)
+
+        # every bullet fired in the match lives in this pool, bullets that leave the screen get retired
+        self.bulletPool = weaponManager.bulletPool
+        self.bulletPool.clear()
+        self.bulletPool.debug = debug
+        self.bulletPool.lifecycle.bounds = screen.get_rect()
+        self.bulletPool.lifecycle.resetRound()
+
+        # game time starts at 0 for every match
+        simulationManager.clock.reset()
+
+        # everything a tick runs, each thing once per phase. the physics objects and the pool are registered as a whole,
+        # so blocks that blow up or bullets that retire drop out on their own
+        self.scheduler = simulationManager.TickScheduler(simulationManager.TICK_PHASES)
+        self.scheduler.register("round", self, self.checkRound)
+        for player in self.players:
+            self.scheduler.register("physics", player, lambda inputState, player=player: player.runTimeGravityManager(self.mapSprites))
+            self.scheduler.register("input", player, lambda inputState, player=player: self.movePlayer(player, inputState))
+        self.scheduler.register("physics", self.physicsObjects, lambda inputState: self.runPhysicsObjects())
+        self.scheduler.register("collision", self.bulletPool, lambda inputState: self.bulletPool.collisionDetection(self.mapSprites, self.players))
+        self.scheduler.register("bullets", self.bulletPool, lambda inputState: self.bulletPool.update())
+
+    def endRound(self):
+        """
+            Description:
+            Gives the last one standing their point and marks the round as over. If that was their third point the game is over too
+        """
+        self.roundOver = True
+        winner = utils.awardRound(self.deadPlayers, self.players)
+
+        # no card draft after the winning point
+        if winner is not None and winner.score == 3:
+            self.disableRespawns = True
+            self.gameEnd = winner.colorScheme
+
+    def finishRound(self, changedWeapons):
+        """
+            Description:
+            Starts the next round once the card draft is done: everyone is revived and respawned and the bullets are cleared
+
+            Args:
+            changedWeapons: the players whose weapons the draft changed, see sceneManager.applyCardSelections
+        """
+        self.lastBulletReport = utils.startNextRound(self.players, changedWeapons, self.allSprites, self.bulletPool, self.spawnPoints)
+        self.deadPlayers = []
+        self.roundOver = False
+
+    def bindControllers(self, joysticks):
+        """
+            Description:
+            Gives every controller player the joystick now in their slot, after controllers were plugged in or pulled out.
+            Input comes from the slot either way, this just keeps each Player's joyStick up to date
+
+            Args:
+            joysticks: the joystick in every slot, None for empty ones
+        """
+        for player in self.players:
+            if player.controlScheme == "controller" and player.controllerSlot < len(joysticks):
+                player.joyStick = joysticks[player.controllerSlot]
+
+    def tick(self, inputState):
+        """
+            Description:
+            Runs the game logic for one simulation tick, every phase in simulationManager.TICK_PHASES in order
+
+            Args:
+            inputState: this tick's inputManager.InputState, the only input the match reads
+        """
+        self.scheduler.runAll(inputState, profiler=profileManager.profiler)
+
+        # every phase has run, advance the game clock by one tick
+        simulationManager.clock.advance()
+
+    def checkRound(self, inputState):
+        """
+            Description:
+            The round phase: keeps track of who's dead and ends the round once one player is left standing
+        """
+        for player in self.players:
+            if player.isDead and player not in self.deadPlayers:
+                self.deadPlayers.append(player)
+
+             # check if all players are dead except for 1, and see if the 1 dead player has 3 score
+            if player.score == 3:
+                if player not in self.deadPlayers:
+                    self.disableRespawns = True
+
+                    # this is my super smart way of passing over the color of the player to the font
+                    self.gameEnd = player.colorScheme
+
+            # if all players are dead except for 1 the round is over, whoever runs the match does the card draft then calls finishRound
+            if len(self.deadPlayers) == (len(self.players) - 1):
+                if self.disableRespawns == False and not self.roundOver:
+                    self.endRound()
+
+    def movePlayer(self, player, inputState):
+        """
+            Description:
+            A player's step in the input phase: moves, shoots and shields with this tick's input, then updates their state
+            (death, reloading, position of the weapon and shield)
+        """
+        if player.controlScheme == "controller":
+            # if the player has a controller, run the movement
+            if player.controllerSlot != None:
+                player.runTimeJoyMovement(inputState, self.mapSprites, self.shotFx, self.reloadFx, self.shieldFx)
+        else:
+            player.runTimeMnkMovement(inputState, self.mapSprites, self.shotFx, self.reloadFx, self.shieldFx)
+
+        # if the player has a shieldBuble, draw it
+        if player.shieldBubble != None:
+            self.allSprites.add(player.shieldBubble)
+
+        if player.Health <= 0:
+            player.isDead = True
+
+        # the reload complete method checks if the reload time has passed and if so, sets the ammo back to the max
+        player.weapon.checkReloadComplete()
+
+        # moves the player's weapon and shield along with them, this is the only place they're updated
+        player.update()
+
+    def runPhysicsObjects(self):
+        """
+            Description:
+            The physics objects' step in the physics phase: every map piece affected by gravity falls, or slides if pushed
+        """
+        for physicsObject in self.physicsObjects:
+            physicsObject.runtimeGravity(self.mapSprites)
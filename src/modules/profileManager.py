@@ -0,0 +1,105 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Times the phases of a frame (input, gravity, bullet collision...) for the benchmarks.
+    The profiler is off by default and every call returns straight away, so the game can always leave it in
+"""
+
+# I - Import & Initialize
+import time
+from collections import deque
+
+class Profiler():
+    """
+        Description:
+        Lap timer for the game loop. start() begins a frame, each lap(phase) adds the time since the last lap to that phase,
+        and endFrame() closes the frame. A phase can be lapped many times in a frame (once per player for example)
+
+        Attributes:
+        enabled: False makes every method return straight away
+        frames: how many frames have been ended since the last reset
+        totals: phase -> seconds spent in it since the last reset
+        history: phase -> the per frame seconds of the last `window` frames
+    """
+    def __init__(self, enabled=False, window=120):
+        self.enabled = enabled
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """
+            Description:
+            Forgets every timing
+        """
+        self.frames = 0
+        self.totals = {}
+        self.history = {}
+        self.frameTotals = {}
+        self.lastTime = time.perf_counter()
+
+    def start(self):
+        """
+            Description:
+            Starts timing a frame, time before this isn't counted towards any phase
+        """
+        if not self.enabled:
+            return
+        self.frameTotals = {}
+        self.lastTime = time.perf_counter()
+
+    def lap(self, phase):
+        """
+            Description:
+            Adds the time since the last lap (or start) to phase
+
+            Args:
+            phase: name of the phase that just finished
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.frameTotals[phase] = self.frameTotals.get(phase, 0) + now - self.lastTime
+        self.lastTime = now
+
+    def endFrame(self):
+        """
+            Description:
+            Closes the frame, adding its phase times to the totals and the rolling history
+        """
+        if not self.enabled:
+            return
+        self.frames += 1
+        for phase in self.frameTotals:
+            self.totals[phase] = self.totals.get(phase, 0) + self.frameTotals[phase]
+            if phase not in self.history:
+                self.history[phase] = deque(maxlen=self.window)
+
+        # phases that didn't run this frame count as 0 so the rolling averages stay honest
+        for phase in self.history:
+            self.history[phase].append(self.frameTotals.get(phase, 0))
+        self.frameTotals = {}
+
+    def getAverages(self):
+        """
+            Description:
+            Average milliseconds per frame for every phase, over every frame since the last reset
+
+            Returns:
+            dictionary of phase -> ms
+        """
+        if self.frames == 0:
+            return {}
+        return dict((phase, self.totals[phase] * 1000 / self.frames) for phase in self.totals)
+
+    def getRollingAverages(self):
+        """
+            Description:
+            Average milliseconds per frame for every phase, over the last `window` frames
+
+            Returns:
+            dictionary of phase -> ms
+        """
+        return dict((phase, sum(times) * 1000 / len(times)) for phase, times in self.history.items() if times)
+
+# shared by the match, the game loop and the benchmarks
+profiler = Profiler()
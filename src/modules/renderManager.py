@@ -0,0 +1,100 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Draws the match every frame. Either redraws the whole screen and flips,
+    or (dirty rect mode) only redraws the spots that things moved away from or to and updates just those
+"""
+
+# I - Import & Initialize
+import pygame
+from . import mapManager
+
+class Renderer():
+    """
+        Description:
+        Draws the background and map, every moving sprite, the HUD, the bullets and anything on top (crosshair, text).
+        The map pieces that never move are baked into the background (mapManager.StaticMapLayer), so in dirty rect mode
+        clearing a spot is a single blit
+
+        Attributes:
+        dirtyRects: True for dirty rect mode, False redraws everything every frame
+        maxDirtyRects: with more rects than this (lots of bullets) a full redraw is cheaper, so one is done instead
+    """
+    def __init__(self, screen, background, mapSprites, dirtyRects=False, maxDirtyRects=200):
+        self.screen = screen
+        self.dirtyRects = dirtyRects
+        self.maxDirtyRects = maxDirtyRects
+
+        # the background with the map pieces that never move already on it
+        self.staticLayer = mapManager.StaticMapLayer(background, mapSprites)
+
+        # what was drawn last frame, cleared back to the map this frame
+        self.previousRects = []
+
+        # True forces the next frame to redraw everything, like after the card screen
+        self.fullRedraw = True
+
+        # the rects display.update needs to push, None means flip the whole screen
+        self.presentRects = None
+
+    def invalidate(self):
+        """
+            Description:
+            Makes the next frame redraw the whole screen, call after anything else drew over it
+        """
+        self.fullRedraw = True
+
+    def draw(self, allSprites, players, bulletPool, alpha, overlays):
+        """
+            Description:
+            Draws one frame onto the screen, call present() after
+
+            Args:
+            allSprites: every sprite to draw, in draw order. the static map pieces shouldn't be in it, they're baked
+            players: the players, for their health and ammo bars
+            bulletPool: the BulletPool
+            alpha: bullet interpolation, see FixedTimestep
+            overlays: list of (image, position) drawn last, on top of everything
+        """
+        screen = self.screen
+
+        # the map changed (a block blew up), rebake it and redraw everything
+        if self.staticLayer.refresh():
+            self.fullRedraw = True
+        background = self.staticLayer.surface
+
+        fullRedraw = self.fullRedraw or not self.dirtyRects or len(self.previousRects) > self.maxDirtyRects
+        if fullRedraw:
+            screen.blit(background, (0, 0))
+        else:
+            # put the background and the map back wherever something was drawn last frame
+            for rect in self.previousRects:
+                screen.blit(background, rect, rect)
+
+        # everything that moves, then the HUD, bullets and overlays on top
+        rects = []
+        for sprite in allSprites:
+            rects.append(screen.blit(sprite.image, sprite.rect))
+        for player in players:
+            rects.extend(player.drawHUD(screen))
+        rects.extend(bulletPool.draw(screen, alpha))
+        for image, position in overlays:
+            rects.append(screen.blit(image, position))
+
+        if fullRedraw or len(self.previousRects) + len(rects) > self.maxDirtyRects:
+            self.presentRects = None
+        else:
+            self.presentRects = self.previousRects + rects
+
+        self.previousRects = rects
+        self.fullRedraw = False
+
+    def present(self):
+        """
+            Description:
+            Shows the frame, pushing only the dirty rects when it can
+        """
+        if self.presentRects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.presentRects)
@@ -0,0 +1,261 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Records every tick's input into a compact replay file and plays it back through the real game code.
+    Replays also store state checksums, so playing one back finds the first tick where the game went differently
+"""
+
+# I - Import & Initialize
+import json
+import struct
+import zlib
+from . import inputManager, sceneManager, simulationManager
+
+# bumped whenever the file layout changes, or the simulation changes enough that old replays would play back differently
+REPLAY_VERSION = 6
+MAGIC = b"GDRP"
+
+# the keys the mouse and keyboard player uses, stored as bits in this order
+RECORDED_KEYS = inputManager.GAME_KEYS
+
+# axes and buttons recorded per controller
+RECORDED_AXES = inputManager.CONTROLLER_AXES
+RECORDED_BUTTONS = inputManager.CONTROLLER_BUTTONS
+
+# how often (in ticks) a state checksum is stored
+CHECKSUM_INTERVAL = 60
+
+def packFrame(inputState):
+    """
+        Description:
+        Packs one tick of input into bytes
+
+        Args:
+        inputState: the tick's inputManager.InputState
+
+        Returns:
+        bytes
+    """
+    buttonBits = 0
+    for i in range(3):
+        if inputState.mouseButtons[i]:
+            buttonBits |= 1 << i
+
+    keyBits = 0
+    for i in range(len(RECORDED_KEYS)):
+        if RECORDED_KEYS[i] in inputState.keys:
+            keyBits |= 1 << i
+
+    frame = struct.pack("<hhBH", inputState.mousePos[0], inputState.mousePos[1], buttonBits, keyBits)
+    for controller in inputState.controllers:
+        # axes are stored as doubles so the replay reads back exactly what the game saw
+        joyButtonBits = 0
+        for button in range(RECORDED_BUTTONS):
+            if controller.isPressed(button):
+                joyButtonBits |= 1 << button
+        frame += struct.pack("<" + "d" * RECORDED_AXES + "H", *controller.getAxes(), joyButtonBits)
+    return frame
+
+def unpackFrame(frame, numControllers):
+    """
+        Description:
+        Reverses packFrame
+
+        Returns:
+        the InputState
+    """
+    mouseX, mouseY, buttonBits, keyBits = struct.unpack_from("<hhBH", frame, 0)
+    mouseButtons = tuple(bool(buttonBits & (1 << i)) for i in range(3))
+    keys = [RECORDED_KEYS[i] for i in range(len(RECORDED_KEYS)) if keyBits & (1 << i)]
+
+    controllers = []
+    offset = struct.calcsize("<hhBH")
+    joystickFormat = "<" + "d" * RECORDED_AXES + "H"
+    for i in range(numControllers):
+        values = struct.unpack_from(joystickFormat, frame, offset)
+        offset += struct.calcsize(joystickFormat)
+        axes = values[:RECORDED_AXES]
+        buttons = [bool(values[RECORDED_AXES] & (1 << button)) for button in range(RECORDED_BUTTONS)]
+        controllers.append(inputManager.ControllerState.fromAxes(axes, buttons))
+
+    return inputManager.InputState.create((mouseX, mouseY), mouseButtons, keys, controllers)
+
+def getStateChecksum(match):
+    """
+        Description:
+        Boils the important parts of the game state down to one number, two runs that match here are in sync
+
+        Args:
+        match: the Match
+
+        Returns:
+        crc32 of the state
+    """
+    state = []
+    for player in match.players:
+        state.extend((player.rect.left, player.rect.top, int(player.Health), player.score, player.weapon.ammo))
+
+    bulletPool = match.bulletPool
+    state.append(bulletPool.count)
+    state.append(int(bulletPool.x[:bulletPool.count].sum()))
+    state.append(int(bulletPool.y[:bulletPool.count].sum()))
+    for physicsObject in match.physicsObjects:
+        state.extend(physicsObject.rect.topleft)
+
+    return zlib.crc32(json.dumps(state).encode())
+
+class ReplayRecorder():
+    """
+        Description:
+        Collects input, card drafts and state checksums while a match runs, then writes them to a replay file
+    """
+    def __init__(self, playerColors, numControllers, cardSeed):
+        self.header = {
+            "version": REPLAY_VERSION,
+            "tickRate": simulationManager.TICK_RATE,
+            "playerColors": [list(color) for color in playerColors],
+            "controllers": numControllers,
+            "cardSeed": cardSeed,
+        }
+
+        # run length encoded input: list of [frame bytes, how many ticks in a row it was held]
+        self.frames = []
+        self.drafts = []
+        self.checksums = []
+
+    def recordInput(self, inputState):
+        """
+            Description:
+            Records the InputState the next tick is about to run with
+        """
+        frame = packFrame(inputState)
+        if self.frames and self.frames[-1][0] == frame:
+            self.frames[-1][1] += 1
+        else:
+            self.frames.append([frame, 1])
+
+    def recordState(self, match):
+        """
+            Description:
+            Stores a state checksum every CHECKSUM_INTERVAL ticks, call right after each tick
+        """
+        tickCount = simulationManager.clock.tickCount
+        if tickCount % CHECKSUM_INTERVAL == 0:
+            self.checksums.append([tickCount, getStateChecksum(match)])
+
+    def recordDraft(self):
+        """
+            Description:
+            Stores the cards picked in the draft that just finished
+        """
+        self.drafts.append({"tick": simulationManager.clock.tickCount, "cards": list(sceneManager.lastCardSelections)})
+
+    def save(self, path):
+        """
+            Description:
+            Writes the replay file: magic, version, json header, then the zlib compressed input and events
+
+            Args:
+            path: file to write
+        """
+        inputData = b"".join(struct.pack("<I", repeats) + frame for frame, repeats in self.frames)
+        events = json.dumps({"drafts": self.drafts, "checksums": self.checksums}).encode()
+        header = json.dumps(self.header).encode()
+
+        with open(path, "wb") as replayFile:
+            replayFile.write(MAGIC)
+            replayFile.write(struct.pack("<BI", REPLAY_VERSION, len(header)))
+            replayFile.write(header)
+            body = zlib.compress(struct.pack("<I", len(events)) + events + inputData, 9)
+            replayFile.write(body)
+
+class Replay():
+    """
+        Description:
+        A replay file loaded back into memory
+    """
+    def __init__(self, path):
+        with open(path, "rb") as replayFile:
+            data = replayFile.read()
+
+        if data[:4] != MAGIC:
+            raise ValueError(path + " is not a Gundown replay")
+
+        version, headerLength = struct.unpack_from("<BI", data, 4)
+        if version != REPLAY_VERSION:
+            raise ValueError("replay version " + str(version) + " is not supported, expected " + str(REPLAY_VERSION))
+
+        offset = 4 + struct.calcsize("<BI")
+        self.header = json.loads(data[offset:offset + headerLength])
+        body = zlib.decompress(data[offset + headerLength:])
+
+        eventsLength = struct.unpack_from("<I", body, 0)[0]
+        events = json.loads(body[4:4 + eventsLength])
+        self.drafts = events["drafts"]
+        self.checksums = dict((tick, checksum) for tick, checksum in events["checksums"])
+
+        # expand the run length encoded frames. InputStates are immutable so repeats can share one
+        self.numControllers = self.header["controllers"]
+        frameSize = struct.calcsize("<hhBH") + self.numControllers * struct.calcsize("<" + "d" * RECORDED_AXES + "H")
+        self.frames = []
+        position = 4 + eventsLength
+        while position < len(body):
+            repeats = struct.unpack_from("<I", body, position)[0]
+            frame = unpackFrame(body[position + 4:position + 4 + frameSize], self.numControllers)
+            self.frames.extend([frame] * repeats)
+            position += 4 + frameSize
+
+        self.playerColors = [tuple(color) for color in self.header["playerColors"]]
+
+class ReplayInputScript():
+    """
+        Description:
+        Input script for HeadlessMatch that feeds back a replay's recorded input and checks the state checksums
+    """
+    def __init__(self, replay):
+        self.replay = replay
+
+        # first tick whose checksum didn't match, None while in sync
+        self.desyncTick = None
+
+    def __call__(self, headlessMatch, tickNumber):
+        """
+            Description:
+            Returns this tick's recorded InputState, the devices aren't touched
+        """
+        return self.replay.frames[tickNumber]
+
+    def afterTick(self, match):
+        """
+            Description:
+            Compares the state against the recorded checksum for this tick, if there is one
+        """
+        tickCount = simulationManager.clock.tickCount
+        expected = self.replay.checksums.get(tickCount)
+        if expected is not None and self.desyncTick is None and getStateChecksum(match) != expected:
+            self.desyncTick = tickCount
+
+class ReplayCardScreen():
+    """
+        Description:
+        Stands in for the card draft when a round ends during a replay, applying the cards that were picked in the recording
+    """
+    def __init__(self, replay):
+        self.drafts = list(replay.drafts)
+
+    def draftCards(self, players, availableCards):
+        """
+            Description:
+            Applies the next recorded draft
+
+            Args:
+            players: the player sprites
+            availableCards: every ability card
+
+            Returns:
+            changedWeapons: a list of the players whose weapons were changed
+        """
+        cardsByName = dict((card.cardName, card) for card in availableCards)
+        draft = self.drafts.pop(0)
+        playerSelections = [cardsByName[name] if name is not None else None for name in draft["cards"]]
+        return sceneManager.applyCardSelections(players, playerSelections)
@@ -1,186 +1,381 @@
 """
     Author: Nick S
     Date: January 15th, 2025
-    Description: mapManager.py is responsible for managing the map components and their interactions
+    Description: Houses the scenes of the game (start screen, match, ability card draft and game over) and the stack they live on.
+    The main loop ticks whichever scene is on top, none of them run a loop of their own or wait
 """
 
 # I - Import & Initialize
 import pygame
 import random
-from . import utils
+from . import utils, assetManager, inputManager, entities, weaponManager, abilityCards, matchManager, simulationManager, renderManager, profileManager, gui
 
 pygame.font.init()
 pygame.mixer.init()
 
-# load ThaleahFat.ttf for the title text
-font = pygame.font.Font("src/fonts/ThaleahFat.ttf", 48)
-smallFont = pygame.font.SysFont("Arial", 24)
+# ThaleahFat.ttf for the titles, Arial for everything else. the fonts are opened and the text rendered by the asset cache
+TITLE_FONT = "src/fonts/ThaleahFat.ttf"
+TITLE_SIZE = 48
+GAME_OVER_SIZE = 96
+TEXT_FONT = "Arial"
+TEXT_SIZE = 24
+
+# every ability card drawn once per player color, the card draft only blits them
+cardFaces = gui.CardFaceCache(TEXT_FONT, TEXT_SIZE, (400, 130))
+
+# deals the ability cards, seeded per match so replays deal the same cards
+cardRandom = random.Random()
+
+# the names of the cards each player picked in the last draft, None for players who didn't pick. read by replay recording
+lastCardSelections = []
+
+# the backgrounds and sounds the scenes use, listed once so a scene can load the next one's ahead of time
+MENU_BACKGROUND = "src/art/backgrounds/dark_abs_bg.gif"
+MATCH_BACKGROUND = "src/art/backgrounds/dark_background.gif"
+CROSSHAIR_IMAGE = "src/art/hud/cross/crosshair_320.png"
+BOXIE_IMAGE = "src/art/character/boxie-white/default-340.png"
+CONTROLLER_ICON = "src/art/icons/controller.gif"
+MATCH_SOUNDS = {
+    "bell": ("src/sounds/bell.ogg", 0.5),
+    "select": ("src/sounds/select_2.ogg", 0.7),
+    "shield": ("src/sounds/cast_shield.ogg", 0.5),
+    "shot": ("src/sounds/shot.ogg", 0.35),
+    "reload": ("src/sounds/reload_gun.ogg", 0.8),
+}
+
+# the colors players can pick on the start screen
+PLAYER_COLORS = [utils.Colors.RED, utils.Colors.BLUE, utils.Colors.ORANGE, utils.Colors.PURPLE, utils.Colors.GREEN]
+
+def seedCards(seed):
+    """
+        Description:
+        Seeds the random number generator that deals the ability cards
+
+        Args:
+        seed: integer seed
+    """
+    cardRandom.seed(seed)
 
-def showStartScreen(screen):
+def dealCards(players, availableCards):
     """
         Description:
-        Shows the start screen for the game, where players can select their colors.
-        When its called, its used to set a variable, causing the game to hang until the players select their colors, and the first player starts the game.
+        Deals every player 2 random ability cards
 
         Args:
-        screen: your game window
+        players: the player sprites
+        availableCards: every ability card
 
         Returns:
-        resultColors: a list of the selected colors for each player
+        a list of 2 cards per player, in player order
+    """
+    playerCards = []
+    for _ in players:
+        playerCards.append([
+            availableCards[cardRandom.randint(0, len(availableCards) - 1)],
+            availableCards[cardRandom.randint(0, len(availableCards) - 1)],
+        ])
+    return playerCards
+
+class Scene():
+    """
+        Description:
+        One screen of the game. The SceneStack hands the top scene every event, then updates and draws it once a frame
+
+        Attributes:
+        stack: the SceneStack it's on, set when it's pushed
+        maxFps: frame rate cap while it's on top
+    """
+    maxFps = 60
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.stack = None
+
+    def enter(self):
+        """
+            Description:
+            Called when the scene ends up on top, after being pushed or when the scene above it is popped
+        """
+        pass
+
+    def handleEvent(self, event):
+        """
+            Description:
+            Reacts to one pygame event
+        """
+        pass
+
+    def update(self, frameTime):
+        """
+            Description:
+            Advances the scene by one frame
+
+            Args:
+            frameTime: milliseconds since the last frame
+        """
+        pass
+
+    def draw(self):
+        """
+            Description:
+            Draws the scene and puts it on the display
+        """
+        pass
+
+class SceneStack():
+    """
+        Description:
+        The scenes that are running, the top one is the one being played. Scenes push, pop and replace each other through it
+
+        Attributes:
+        clock: the main loop's pygame Clock, for scenes that show the fps
+    """
+    def __init__(self, clock=None):
+        self.scenes = []
+        self.clock = clock
+
+    def push(self, scene):
+        """
+            Description:
+            Puts a scene on top of the current one, which waits underneath until it's popped
+        """
+        scene.stack = self
+        self.scenes.append(scene)
+        scene.enter()
+
+    def pop(self):
+        """
+            Description:
+            Takes the top scene off, the one underneath carries on
+
+            Returns:
+            the scene that was popped
+        """
+        scene = self.scenes.pop()
+        if self.scenes:
+            self.scenes[-1].enter()
+        return scene
+
+    def replace(self, scene):
+        """
+            Description:
+            Swaps the top scene for another one
+        """
+        self.scenes.pop()
+        self.push(scene)
+
+    def clear(self):
+        """
+            Description:
+            Takes every scene off, which ends the main loop
+        """
+        self.scenes = []
+
+    def top(self):
+        """
+            Description:
+            Returns the scene on top, or None if there are none
+        """
+        if self.scenes:
+            return self.scenes[-1]
+        return None
+
+    def isEmpty(self):
+        """
+            Description:
+            Returns True once there are no scenes left
+        """
+        return not self.scenes
+
+    def handleEvent(self, event):
+        """
+            Description:
+            Gives an event to the top scene
+        """
+        if self.scenes:
+            self.scenes[-1].handleEvent(event)
+
+    def update(self, frameTime):
+        """
+            Description:
+            Updates the top scene
+        """
+        if self.scenes:
+            self.scenes[-1].update(frameTime)
+
+    def draw(self):
+        """
+            Description:
+            Draws the top scene
+        """
+        if self.scenes:
+            self.scenes[-1].draw()
+
+class StartScene(Scene):
     """
-    
-    # E - Entities
-    titleText = font.render("Welcome to Gundown!", True, (255, 255, 255))
-    subtitleText = smallFont.render("Press SPACE to start", True, (255, 255, 255))
-    errorText = smallFont.render("At least two players must select colors!", True, (255, 100, 100))
-    footerText = smallFont.render("Change colors by clicking (A), or using Mouse Left Click.", True, (255, 255, 255))
-    
-    # load the background image
-    screenWidth, screenHeight = screen.get_size()
-    bg = pygame.image.load("src/art/backgrounds/dark_abs_bg.gif")
-    bg = pygame.transform.scale(bg, (screenWidth, screenHeight))
-
-    colors = [utils.Colors.RED, utils.Colors.BLUE, utils.Colors.ORANGE, utils.Colors.PURPLE, utils.Colors.GREEN]
-
-    # box used to draw the players preview
-    boxWidth = 150
-    boxHeight = 150
-    boxSpacing = 50
-    boxes = [
-        pygame.Rect((screenWidth - (3 * boxWidth + 2 * boxSpacing)) // 2, screenHeight // 3, boxWidth, boxHeight),
-        pygame.Rect((screenWidth - (3 * boxWidth + 2 * boxSpacing)) // 2 + (boxWidth + boxSpacing), screenHeight // 3, boxWidth, boxHeight),
-        pygame.Rect((screenWidth - (3 * boxWidth + 2 * boxSpacing)) // 2 + 2 * (boxWidth + boxSpacing), screenHeight // 3, boxWidth, boxHeight),
-    ]
-
-    # the selected player colors. 
-    playerColorSelected = [0, 0, 0]
-
-    # General Note:
-    # All boxie images are colorized, and when the player sees them they scroll through the index of these boxies images
-    # The playerColorSelected index is the index of the colors array, and the boxieImages index is the index of the boxie images
-
-    # are ticked whenever a player connects or disconnects
-    playerActive = [True, False, False]
-
-    boxieImages = []
-    for color in colors:
-        image = pygame.image.load("src/art/character/boxie-white/default-340.png").convert_alpha()
-        image = pygame.transform.scale(image, (boxWidth, boxHeight))
-        image.fill(color, special_flags=pygame.BLEND_RGB_MULT)
-        boxieImages.append(image)
-
-    mouseIcon = pygame.image.load("src/art/icons/mouse.gif").convert_alpha()
-    mouseIcon = pygame.transform.scale(mouseIcon, (64, 64))
-    
-    controllerIcon = pygame.image.load("src/art/icons/controller.gif").convert_alpha()
-    controllerIcon = pygame.transform.scale(controllerIcon, (32, 32))
-
-    # initialize joysticks currently active, they may change
-    joysticks = []
-
-    for i in range(pygame.joystick.get_count()):
-        joystick = pygame.joystick.Joystick(i)
-        joystick.init()
-        joysticks.append(joystick)
-        if i + 1 < len(playerActive):
-            playerActive[i + 1] = True
-
-    # A - Action (broken into ALTER steps)
- 
-    # A - Assign values to key variables
-    clock = pygame.time.Clock()
-    keepGoing = True
-    showError = False
-
-    # L - Loop
-    while keepGoing:
-        # T - Timer to set frame rate
-        clock.tick(60) 
-
-        # E - Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                keepGoing = False
-
-            # game start event
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    # check if at least 2 players are in the game
-                    activePlayers = sum(playerActive)
-                    if activePlayers > 1:
-                        # will start the game
-                        keepGoing = False
-                    else:
-                        # display a text error telling you to find friends
-                        showError = True
-                
-                # escape key to quit the game
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        keepGoing = False
-
-            # change the color of  player 1
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if playerActive[0]:  # mouse always controls Player 1
-                    playerColorSelected[0] = (playerColorSelected[0] + 1) % len(colors)
-
-        currentJoystickCount = pygame.joystick.get_count()
-
-        # if joystick count changed from the og one
-        if currentJoystickCount != len(joysticks):  
-            joysticks = []
-            playerActive = [True, False, False]
-
-            # reinitialize joysticks
-            for i in range(currentJoystickCount):
-                joystick = pygame.joystick.Joystick(i)
-                joystick.init()
-                joysticks.append(joystick)
-                if i + 1 < len(playerActive):
-                    playerActive[i + 1] = True
-
-        # color changing script
-        for i in range(len(joysticks)):
-            if playerActive[i + 1]: 
-                # pull the specific joystick to not change other user colors
-                joystick = joysticks[i]
-                
-                # if they click the A button, change the color
-                if joystick.get_button(0):
-                    # change the color index that is selected
-                    playerColorSelected[i + 1] = (playerColorSelected[i + 1] + 1) % len(colors)
-                    # pause for a bit to prevent rapid color changes
-                    pygame.time.wait(200)
-
-        screen.blit(bg, (0, 0))
-        screen.blit(titleText, (screenWidth // 2 - titleText.get_width() // 2, screenHeight // 8))
+        Description:
+        The start screen, where players connect and select their colors. The first player starts the game with space.
+        The match's assets load in the background while everyone picks
+    """
+    def __init__(self, screen, startMatch):
+        """
+            Args:
+            screen: your game window
+            startMatch: called with a list of the selected colors for each player, returns the scene that replaces this one
+        """
+        Scene.__init__(self, screen)
+        self.startMatch = startMatch
+
+        # E - Entities
+        assets = assetManager.assets
+        self.titleText = assets.getText("Welcome to Gundown!", TITLE_FONT, TITLE_SIZE, (255, 255, 255))
+        self.subtitleText = assets.getText("Press SPACE to start", TEXT_FONT, TEXT_SIZE, (255, 255, 255))
+        self.errorText = assets.getText("At least two players must select colors!", TEXT_FONT, TEXT_SIZE, (255, 100, 100))
+        self.footerText = assets.getText("Change colors by clicking (A), or using Mouse Left Click.", TEXT_FONT, TEXT_SIZE, (255, 255, 255))
+
+        # load the background image
+        screenWidth, screenHeight = screen.get_size()
+        self.bg = assetManager.assets.getImage(MENU_BACKGROUND, (screenWidth, screenHeight), alpha=False)
+
+        # box used to draw the players preview
+        self.boxWidth = 150
+        self.boxHeight = 150
+        boxSpacing = 50
+        self.boxes = [
+            pygame.Rect((screenWidth - (3 * self.boxWidth + 2 * boxSpacing)) // 2, screenHeight // 3, self.boxWidth, self.boxHeight),
+            pygame.Rect((screenWidth - (3 * self.boxWidth + 2 * boxSpacing)) // 2 + (self.boxWidth + boxSpacing), screenHeight // 3, self.boxWidth, self.boxHeight),
+            pygame.Rect((screenWidth - (3 * self.boxWidth + 2 * boxSpacing)) // 2 + 2 * (self.boxWidth + boxSpacing), screenHeight // 3, self.boxWidth, self.boxHeight),
+        ]
+
+        # the selected player colors.
+        self.playerColorSelected = [0, 0, 0]
+
+        # General Note:
+        # All boxie images are colorized, and when the player sees them they scroll through the index of these boxies images
+        # The playerColorSelected index is the index of the colors array, and the boxieImages index is the index of the boxie images
+
+        # are ticked whenever a player connects or disconnects, the mouse player is always there
+        self.controllers = inputManager.controllers
+        self.controllers.scan()
+        self.refreshActivePlayers()
+
+        # tinted once by the asset cache, coming back to the start screen reuses them
+        self.boxieImages = []
+        for color in PLAYER_COLORS:
+            self.boxieImages.append(assets.getImage(BOXIE_IMAGE, (self.boxWidth, self.boxHeight), color))
+
+        self.mouseIcon = assets.getImage("src/art/icons/mouse.gif", (64, 64))
+
+        # faded out for disconnected players, along with a grey box in place of their boxie
+        self.controllerIcon = assets.getImage(CONTROLLER_ICON, (32, 32))
+        self.disconnectedIcon = assets.getImage(CONTROLLER_ICON, (32, 32), opacity=40)
+        self.greyImage = pygame.Surface((self.boxWidth, self.boxHeight))
+        self.greyImage.fill((100, 100, 100, 200))
+        self.greyImage.set_alpha(80)
+
+        self.showError = False
+
+        # everything the match and the card draft need, loaded a bit every frame while players pick
+        MatchScene.preload(screen)
+        CardDraftScene.preload(screen)
+
+    def refreshActivePlayers(self):
+        """
+            Description:
+            Lights up a box for every connected controller
+        """
+        self.playerActive = [True] + [self.controllers.isConnected(slot) for slot in range(len(self.boxes) - 1)]
+
+    def enter(self):
+        """
+            Description:
+            Shows the mouse so p1 can pick a color
+        """
+        pygame.mouse.set_visible(True)
+
+    def handleEvent(self, event):
+        """
+            Description:
+            Color changes, controllers coming and going, and starting the game
+        """
+        # a controller was plugged in or pulled out, its box lights up or greys out but keeps its color
+        if event.type == pygame.JOYDEVICEADDED or event.type == pygame.JOYDEVICEREMOVED:
+            self.refreshActivePlayers()
+
+        # change the color of a controller player when they press A, once per press
+        if event.type == pygame.JOYBUTTONDOWN and event.button == 0:
+            slot = self.controllers.getSlot(event.instance_id)
+            if slot is not None and slot + 1 < len(self.playerActive):
+                self.playerColorSelected[slot + 1] = (self.playerColorSelected[slot + 1] + 1) % len(PLAYER_COLORS)
+
+        # game start event
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                # check if at least 2 players are in the game
+                activePlayers = sum(self.playerActive)
+                if activePlayers > 1:
+                    # will start the game
+                    self.stack.replace(self.startMatch(self.getSelectedColors()))
+                else:
+                    # display a text error telling you to find friends
+                    self.showError = True
+
+        # change the color of  player 1
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.playerActive[0]:  # mouse always controls Player 1
+                self.playerColorSelected[0] = (self.playerColorSelected[0] + 1) % len(PLAYER_COLORS)
+
+    def getSelectedColors(self):
+        """
+            Description:
+            Returns a list of the selected colors for each player. The connected controllers move down to the first slots
+            so controller player i is slot i
+        """
+        self.controllers.compact()
+        resultColors = []
+
+        # for each player that is active, append the color to the resultColors list
+        for i in range(len(self.playerActive)):
+            if self.playerActive[i]:
+                # remeber that the playerColorSelected index is the index of the colors array too :D
+                resultColors.append(PLAYER_COLORS[self.playerColorSelected[i]])
+
+        return resultColors
+
+    def draw(self):
+        """
+            Description:
+            Draws the title, the player boxes and their colors
+        """
+        screen = self.screen
+        screenWidth, screenHeight = screen.get_size()
+        screen.blit(self.bg, (0, 0))
+        screen.blit(self.titleText, (screenWidth // 2 - self.titleText.get_width() // 2, screenHeight // 8))
 
         # add up the number of active players based on the playerActive list
-        activePlayers = sum(playerActive)
+        activePlayers = sum(self.playerActive)
 
         # either show the "start game with enter text" or if there is the error show that one
         if activePlayers > 1:
-            screen.blit(subtitleText, (screenWidth // 2 - subtitleText.get_width() // 2, screenHeight // 2 + 100))
-        elif showError:
-            screen.blit(errorText, (screenWidth // 2 - errorText.get_width() // 2, screenHeight // 2 + 140))
-        
+            screen.blit(self.subtitleText, (screenWidth // 2 - self.subtitleText.get_width() // 2, screenHeight // 2 + 100))
+        elif self.showError:
+            screen.blit(self.errorText, (screenWidth // 2 - self.errorText.get_width() // 2, screenHeight // 2 + 140))
+
         # blit the footer text
-        screen.blit(footerText, (screenWidth // 2 - footerText.get_width() // 2, screenHeight - 50))
-        screen.blit(mouseIcon, (boxes[0].centerx - mouseIcon.get_width() // 2 - 15, boxes[0].bottom + 5))
-        
+        boxes = self.boxes
+        screen.blit(self.footerText, (screenWidth // 2 - self.footerText.get_width() // 2, screenHeight - 50))
+        screen.blit(self.mouseIcon, (boxes[0].centerx - self.mouseIcon.get_width() // 2 - 15, boxes[0].bottom + 5))
+
         # draw the boxies
         for i in range(len(boxes)):
             # grey out the boxes space for non connected players
-            if playerActive[i]:
+            if self.playerActive[i]:
                 # using the index of the color, draw the boxie image from the top left of the image/rect
-                screen.blit(boxieImages[playerColorSelected[i]], boxes[i].topleft)
-                controllerIcon.set_alpha(255)
+                screen.blit(self.boxieImages[self.playerColorSelected[i]], boxes[i].topleft)
+                controllerIcon = self.controllerIcon
             else:
-                greyImage = pygame.Surface((boxWidth, boxHeight))
-                greyImage.fill((100, 100, 100, 200))
-                greyImage.set_alpha(80)
-                controllerIcon.set_alpha(40)
-                screen.blit(greyImage, boxes[i].topleft)
+                screen.blit(self.greyImage, boxes[i].topleft)
+                controllerIcon = self.disconnectedIcon
 
             # mnk get lost lmao
             if i == 0:
@@ -193,182 +388,426 @@ def showStartScreen(screen):
 
         pygame.display.flip()
 
-    # outside of the loop
-    resultColors = []
-
-    # for each player that is active, append the color to the resultColors list
-    for i in range(len(playerActive)):
-        if playerActive[i]:
-            # remeber that the playerColorSelected index is the index of the colors array too :D
-            resultColors.append(colors[playerColorSelected[i]])
-
-    return resultColors
-
-def showAbilityCardScreen(screen, players, availableCards, selectFx):
+class CardDraftScene(Scene):
     """
         Description:
-        Shows the ability card screen for the game, where players can select their ability cards.
-        When its called, its used to set a variable, causing the game to hang until the players select their ability cards.
-        
-        Args:
-        screen: your game window
-        players: the player sprites
-        availableCards: the available ability cards, it will use the set from abiliyCards.py
-        selectFx: the sound effect for selecting a card
+        The ability card screen shown between rounds, where every player picks one of two cards.
+        The match waits underneath and gets the picks through onDone
+    """
+    # how long the screen stays up after the last pick, so the pick can be seen
+    FINISH_DELAY = 460
 
-        Returns:
-        changedWeapons: a list of the players whose weapons were changed, so that i can properally refresh and add to all sprites or else it aint show up
+    # (text, font, size, color) of the heading, so the text can be rendered ahead of time
+    TITLE = ("New Ability Cards!", TITLE_FONT, TITLE_SIZE, (255, 255, 255))
+    INSTRUCTIONS = ("Click on an ability card, or select using (A) or (B)", TEXT_FONT, TEXT_SIZE, (255, 255, 255))
+
+    def __init__(self, screen, players, availableCards, selectFx, onDone):
+        """
+            Args:
+            screen: your game window
+            players: the player sprites
+            availableCards: the available ability cards, it will use the set from abiliyCards.py
+            selectFx: the sound effect for selecting a card
+            onDone: called with the players whose weapons were changed once the cards are applied
         """
+        Scene.__init__(self, screen)
+        self.players = players
+        self.selectFx = selectFx
+        self.onDone = onDone
 
-    titleText = font.render("New Ability Cards!", True, (255, 255, 255))
-    instructionText = smallFont.render("Click on an ability card, or select using (A) or (B)", True, (255, 255, 255))
+        self.titleText = assetManager.assets.getText(*CardDraftScene.TITLE)
+        self.instructionText = assetManager.assets.getText(*CardDraftScene.INSTRUCTIONS)
 
-    screenWidth, screenHeight = screen.get_size()
+        screenWidth, screenHeight = screen.get_size()
 
-    # same bg as the start screen
-    bg = pygame.image.load("src/art/backgrounds/dark_abs_bg.gif")
-    bg = pygame.transform.scale(bg, (screenWidth, screenHeight))
+        # same bg as the start screen
+        self.bg = assetManager.assets.getImage(MENU_BACKGROUND, (screenWidth, screenHeight), alpha=False)
 
-    selectFx.play()
+        # controller button icons shown on the cards
+        self.aButtonImage = assetManager.assets.getImage("src/art/icons/AButtonIddle.png", (32, 32))
+        self.bButtonImage = assetManager.assets.getImage("src/art/icons/BButtonIddle.png", (32, 32))
 
-    cardWidth, cardHeight = 400, 150
-    cardSpacing = 50
-    playerCards = []
+        selectFx.play()
 
-    # player selections will be filled with the selected cards, playerSelectionsConfirmed ticks off keepGoing when players have all selected their cards
-    playerSelections = [None] * len(players)
-    playerSelectionsConfirmed = 0
+        self.cardWidth, self.cardHeight = 400, 150
+        self.cardSpacing = 50
 
-    # Assign random cards to each player and initialize their selections
-    for _ in players:
-        playerCards.append([
-            availableCards[random.randint(0, len(availableCards) - 1)],
-            availableCards[random.randint(0, len(availableCards) - 1)],
-        ])
+        # player selections will be filled with the selected cards, playerSelectionsConfirmed says when everyone has picked
+        self.playerSelections = [None] * len(players)
+        self.playerSelectionsConfirmed = 0
+
+        # Assign random cards to each player and initialize their selections
+        self.playerCards = dealCards(players, availableCards)
+
+        # counts down once everyone has picked, None until then
+        self.finishTimer = None
+        self.changedWeapons = []
 
-    # A - Action (broken into ALTER steps)
- 
-    # A - Assign values to key variables
-    clock = pygame.time.Clock()
-    keepGoing = True
-    
-    # L - Loop
-    while keepGoing:
-
-        # T - Timer to set frame rate
-        clock.tick(60)
-    
-        # E - Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                keepGoing = False
-
-            # escape key to quit the game
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    keepGoing = False
-
-
-            # if the player is mouse, they can select the card by clicking on it
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # pull as tuple
-                cursorX, cursorY = pygame.mouse.get_pos()
-                
-                # check if the cursor is in the card
-                if len(playerCards[0]) > 1:
-                    for j in range(2):
-                        # calc the X position for the cards based on the number of cards
-                        cardX = screenWidth // 2 - (2 * cardWidth + cardSpacing) // 2 + j * (cardWidth + cardSpacing)
-                        
-                        # see if the cursor is in X of the card
-                        if cardX <= cursorX <= cardX + cardWidth:
-                            playerY = 200  # fixed Y position for Player 1
-                            
-                            # check if the cursor is within the Y bounds of the card
-                            if playerY <= cursorY <= playerY + cardHeight:
-                                # add the selected card to Player 1 and remove it from the list
-                                playerSelections[0] = playerCards[0][j]
-                                playerCards[0].pop(1 - j)
-                                playerSelectionsConfirmed += 1
-                                selectFx.play()
-
-            # if the player is controller, they can select a card by pressing the A or B button
-            for i in range(len(players)):
-                if len(playerCards[i]) > 1 and playerSelections[i] is None:
-                    if players.sprites()[i].controlScheme == "controller":
-                        joystick = players.sprites()[i].joyStick
-                        
-                        # check for A or B button press
-                        if joystick.get_button(0):
-                            selectFx.play()
-                            playerSelections[i] = playerCards[i][0]
-
-                            # same logic as mnk but i know which card to remove
-                            playerCards[i].pop(1)
-                            playerSelectionsConfirmed += 1
-
-                        elif joystick.get_button(1):
-                            selectFx.play()
-                            playerSelections[i] = playerCards[i][1]
-                            playerCards[i].pop(0)
-                            playerSelectionsConfirmed += 1
-                            
-
-        if playerSelectionsConfirmed == len(players):
-            # kill the loop if all cards that need to be selected are selected
-            keepGoing = False
-
-        screen.blit(bg, (0, 0))
-        screen.blit(titleText, (screenWidth // 2 - titleText.get_width() // 2, 50))
-        screen.blit(instructionText, (screenWidth // 2 - instructionText.get_width() // 2, 120))
+    @staticmethod
+    def preload(screen):
+        """
+            Description:
+            Queues up everything the card draft loads, along with the weapons a card can switch to
+        """
+        assets = assetManager.assets
+        assets.preload(assets.getImage, MENU_BACKGROUND, screen.get_size(), None, False)
+        assets.preload(assets.getImage, "src/art/icons/AButtonIddle.png", (32, 32))
+        assets.preload(assets.getImage, "src/art/icons/BButtonIddle.png", (32, 32))
+        assets.preload(assets.getText, *CardDraftScene.TITLE)
+        assets.preload(assets.getText, *CardDraftScene.INSTRUCTIONS)
+        for imagePath, size in weaponManager.WEAPON_IMAGES.values():
+            assets.preload(weaponManager.getRotationCache, imagePath, size)
+
+    def enter(self):
+        """
+            Description:
+            Shows and frees the mouse so p1 can select a card
+        """
+        pygame.event.set_grab(False)
+        pygame.mouse.set_visible(True)
+
+    def select(self, playerIndex, cardIndex):
+        """
+            Description:
+            Picks one of a player's two cards
+
+            Args:
+            playerIndex: the player's index in players
+            cardIndex: 0 for the first card, 1 for the second
+        """
+        self.selectFx.play()
+        self.playerSelections[playerIndex] = self.playerCards[playerIndex][cardIndex]
+
+        # remove the card that wasn't picked
+        self.playerCards[playerIndex].pop(1 - cardIndex)
+        self.playerSelectionsConfirmed += 1
+
+    def handleEvent(self, event):
+        """
+            Description:
+            Card picks from the mouse and the controllers
+        """
+        screenWidth = self.screen.get_width()
+
+        # if the player is mouse, they can select the card by clicking on it
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            # pull as tuple
+            cursorX, cursorY = event.pos
+
+            # check if the cursor is in the card
+            if len(self.playerCards[0]) > 1:
+                for j in range(2):
+                    # calc the X position for the cards based on the number of cards
+                    cardX = screenWidth // 2 - (2 * self.cardWidth + self.cardSpacing) // 2 + j * (self.cardWidth + self.cardSpacing)
+
+                    # see if the cursor is in X of the card
+                    if cardX <= cursorX <= cardX + self.cardWidth:
+                        playerY = 200  # fixed Y position for Player 1
+
+                        # check if the cursor is within the Y bounds of the card
+                        if playerY <= cursorY <= playerY + self.cardHeight:
+                            # add the selected card to Player 1 and remove it from the list
+                            self.select(0, j)
+                            break
+
+        # if the player is controller, they can select a card by pressing the A or B button, A picks the first card and B the second
+        if event.type == pygame.JOYBUTTONDOWN and event.button in (0, 1):
+            slot = inputManager.controllers.getSlot(event.instance_id)
+            for i in range(len(self.players)):
+                player = self.players.sprites()[i]
+                if slot is not None and player.controlScheme == "controller" and player.controllerSlot == slot:
+                    if len(self.playerCards[i]) > 1 and self.playerSelections[i] is None:
+                        self.select(i, event.button)
+
+    def update(self, frameTime):
+        """
+            Description:
+            Applies the cards once everyone has picked, then hands back to the match after FINISH_DELAY
+        """
+        if self.finishTimer is None:
+            if self.playerSelectionsConfirmed == len(self.players):
+                self.changedWeapons = applyCardSelections(self.players, self.playerSelections)
+                self.finishTimer = self.FINISH_DELAY
+            return
+
+        self.finishTimer -= frameTime
+        if self.finishTimer <= 0:
+            self.stack.pop()
+            self.onDone(self.changedWeapons)
+
+    def draw(self):
+        """
+            Description:
+            Draws every player's cards
+        """
+        screen = self.screen
+        screenWidth = screen.get_width()
+        cardWidth, cardHeight, cardSpacing = self.cardWidth, self.cardHeight, self.cardSpacing
+
+        screen.blit(self.bg, (0, 0))
+        screen.blit(self.titleText, (screenWidth // 2 - self.titleText.get_width() // 2, 50))
+        screen.blit(self.instructionText, (screenWidth // 2 - self.instructionText.get_width() // 2, 120))
 
         # draw the cards on the screen!
-        for playerIndex in range(len(players)):
+        for playerIndex in range(len(self.players)):
             # calculate the Y position for each player's card row
             playerY = 160 + playerIndex * (cardHeight + cardSpacing // 2)
 
-            # draw the card for each player
-            for cardIndex in range(len(playerCards[playerIndex])):
-                card = playerCards[playerIndex][cardIndex]
-                
-                # calc the X position for the cards 
+            # draw the card for each player, in the player's color scheme
+            color = self.players.sprites()[playerIndex].colorScheme
+            for cardIndex in range(len(self.playerCards[playerIndex])):
+                card = self.playerCards[playerIndex][cardIndex]
+
+                # calc the X position for the cards
                 cardX = screenWidth // 2 - (2 * cardWidth + cardSpacing) // 2 + cardIndex * (cardWidth + cardSpacing)
-                
-                # draw the card rectangle with the player's color scheme
-                pygame.draw.rect(screen, players.sprites()[playerIndex].colorScheme, (cardX, playerY, cardWidth, cardHeight - 20), 2)
-
-                # render and put it on screen
-                cardTitle = smallFont.render(card.cardName, True, (255, 255, 255))
-                cardDescription = smallFont.render(card.cardDescription, True, (200, 200, 200))
-                screen.blit(cardTitle, (cardX + 10, playerY + 10))
-                screen.blit(cardDescription, (cardX + 10, playerY + 50))
-                
+                screen.blit(cardFaces.getFace(card, color), (cardX, playerY))
+
                 # display button icons for controller players, imagine being first player
                 if playerIndex != 0:
 
-                    # display the button icons, card 1 is A, card 2 is B
-                    if cardIndex == 0:
-                        # if player has seleted a card, dont show the button
-                        if playerSelections[playerIndex] is None:
-                            aButtonImage = pygame.image.load("src/art/icons/AButtonIddle.png").convert_alpha()
-                            aButtonImage = pygame.transform.scale(aButtonImage, (32, 32))
-
-                            # put it in the top right
-                            screen.blit(aButtonImage, (cardX + cardWidth - 42, playerY + 10))
-                    elif cardIndex == 1:
-                        if playerSelections[playerIndex] is None:
-                            bButtonImage = pygame.image.load("src/art/icons/BButtonIddle.png").convert_alpha()
-                            bButtonImage = pygame.transform.scale(bButtonImage, (32, 32))
-                            
-                            # put it in the top right
-                            screen.blit(bButtonImage, (cardX + cardWidth - 42, playerY + 10))
+                    # display the button icons, card 1 is A, card 2 is B. if player has seleted a card, dont show the button
+                    if self.playerSelections[playerIndex] is None:
+                        # put it in the top right
+                        buttonImage = self.aButtonImage if cardIndex == 0 else self.bButtonImage
+                        screen.blit(buttonImage, (cardX + cardWidth - 42, playerY + 10))
 
         pygame.display.flip()
-    
-    # outside of the loop
+
+class GameOverScene(Scene):
+    """
+        Description:
+        Shown once someone has 3 points: the last frame of the match with the winner's Game Over text on top, escape quits
+    """
+    def __init__(self, screen, matchScene):
+        """
+            Args:
+            screen: your game window
+            matchScene: the finished MatchScene, drawn underneath
+        """
+        Scene.__init__(self, screen)
+        self.matchScene = matchScene
+        self.maxFps = matchScene.maxFps
+
+        # the winner's color is passed over to the font
+        self.gameOverText = assetManager.assets.getText("Game Over!", TITLE_FONT, GAME_OVER_SIZE, matchScene.match.gameEnd)
+
+    def draw(self):
+        """
+            Description:
+            Draws the match with the text on top
+        """
+        self.matchScene.draw([(self.gameOverText, (560, 10))])
+
+class MatchScene(Scene):
+    """
+        Description:
+        A match being played. The simulation ticks at a fixed rate and drawing interpolates between ticks.
+        When a round is won the card draft goes on top, when the game is won the game over screen does
+    """
+    def __init__(self, screen, playerColors, recorder=None, maxFps=240, dirtyRects=True, profilerKey=pygame.K_F3, debug=False):
+        """
+            Args:
+            screen: your game window
+            playerColors: the selected colors, mouse player first then each controller player
+            recorder: optional ReplayRecorder, the card seed it was made with has to be passed to seedCards
+            maxFps: rendering frame rate cap, the game itself always simulates at simulationManager.TICK_RATE
+            dirtyRects: only redraw and push the parts of the screen that changed each frame
+            profilerKey: key that shows the frame profiler overlay
+            debug: print round ends, shields, hits and reloads
+        """
+        Scene.__init__(self, screen)
+        self.recorder = recorder
+        self.maxFps = maxFps
+        self.profilerKey = profilerKey
+        self.debug = debug
+
+        # make background space.gif in art. converted to the display format so the full screen blit every frame is cheap
+        assets = assetManager.assets
+        background = assets.getImage(MATCH_BACKGROUND, alpha=False)
+
+        # load sounds effects
+        self.sounds = dict((name, assets.getSound(path, volume)) for name, (path, volume) in MATCH_SOUNDS.items())
+
+        # add transparency to the crosshair & scale down
+        self.crosshair = assets.getImage(CROSSHAIR_IMAGE, (32, 32)).copy()
+        self.crosshair.set_colorkey((0, 0, 0))
+
+        # the simulation ticks at a fixed rate, rendering interpolates the players, physics blocks and bullets between ticks
+        self.timestep = simulationManager.FixedTimestep()
+        self.interpolator = simulationManager.Interpolator()
+
+        # the match laps the profiler after each of its phases, this scene laps the rest
+        self.profiler = profileManager.profiler
+        self.profilerOverlay = gui.ProfilerOverlay(screen, self.profiler)
+
+        # the map, players and bullets. p1 is always mouse, then a player for every controller that joined on the start screen.
+        # controllers keep their slot if they're unplugged, so plugging one back in picks its player back up
+        self.controllers = inputManager.controllers
+        self.numControllers = len(playerColors) - 1
+        self.match = matchManager.Match(screen, playerColors, self.controllers.getJoysticks()[:self.numControllers], self.sounds, debug=debug)
+
+        self.renderer = renderManager.Renderer(screen, background, self.match.mapSprites, dirtyRects)
+
+        for player in self.match.players:
+            self.interpolator.track(player)
+        for physicsObject in self.match.physicsObjects:
+            self.interpolator.track(physicsObject)
+
+        # everything a drawn frame runs, once per phase. the match's tick already moved the players and their weapons,
+        # so all that's left is bringing the HUD up to date and drawing
+        self.frameScheduler = simulationManager.TickScheduler(simulationManager.FRAME_PHASES)
+        self.frameScheduler.register("hud", self.match.scoreKeepers, lambda overlays: self.match.scoreKeepers.update())
+        self.frameScheduler.register("hud", self.profilerOverlay, self.updateProfilerOverlay)
+        self.frameScheduler.register("render", self.renderer, self.render)
+
+        # the card faces in everyone's color get drawn during the first round, ready for the first draft
+        for color in playerColors:
+            for card in abilityCards.AVAILABLECARDS:
+                assets.preload(cardFaces.getFace, card, color)
+
+    @staticmethod
+    def preload(screen):
+        """
+            Description:
+            Queues up everything a match loads: the map, the background, the sounds, the crosshair and every player color
+        """
+        assets = assetManager.assets
+        assets.preload(assets.getImage, MATCH_BACKGROUND, None, None, False)
+        assets.preload(assets.getImage, CROSSHAIR_IMAGE, (32, 32))
+        for path, volume in MATCH_SOUNDS.values():
+            assets.preload(assets.getSound, path, volume)
+        for color in PLAYER_COLORS:
+            assets.preload(assets.getImage, entities.PLAYER_IMAGE, entities.PLAYER_SIZE, color)
+            assets.preload(assets.getImage, entities.PLAYER_IMAGE, entities.PLAYER_SIZE, color, True, entities.DEAD_PLAYER_OPACITY)
+        assets.preload(weaponManager.getRotationCache, *weaponManager.WEAPON_IMAGES["Pistol"])
+
+    def enter(self):
+        """
+            Description:
+            Starts or carries on the round: bell, lock the mouse and don't try to catch up on the time spent in other scenes
+        """
+        pygame.mouse.set_visible(False)
+        pygame.event.set_grab(True)
+
+        # the other scene drew over everything
+        self.renderer.invalidate()
+        self.timestep.reset()
+        self.sounds["bell"].play()
+
+    def handleEvent(self, event):
+        """
+            Description:
+            Profiler toggle, redraws and controllers coming and going
+        """
+        # toggle the profiler overlay, timings start fresh every time it's shown
+        if event.type == pygame.KEYDOWN and event.key == self.profilerKey:
+            self.profiler.enabled = not self.profiler.enabled
+            self.profiler.reset()
+
+            # the overlay has to be cleared off when it's hidden
+            self.renderer.invalidate()
+
+        # the window was covered up or restored, redraw all of it
+        if event.type == pygame.WINDOWEXPOSED:
+            self.renderer.invalidate()
+
+        # a controller was plugged in or pulled out, a player whose controller comes back gets it straight back
+        if event.type == pygame.JOYDEVICEADDED or event.type == pygame.JOYDEVICEREMOVED:
+            self.match.bindControllers(self.controllers.getJoysticks())
+
+    def update(self, frameTime):
+        """
+            Description:
+            Runs as many fixed ticks as the time since the last frame covers, so a slow frame doesn't slow the game down
+        """
+        match = self.match
+        for tick in range(self.timestep.advance(frameTime)):
+            # remember where everything was so drawing can interpolate between ticks
+            self.interpolator.snapshot()
+            match.bulletPool.snapshot()
+
+            # everything the tick reads from the mouse, keyboard and controllers is sampled here once
+            inputState = inputManager.sampleInput(self.controllers.getJoysticks()[:self.numControllers])
+            if self.recorder is not None:
+                self.recorder.recordInput(inputState)
+            self.profiler.lap("snapshot and replay")
+            match.tick(inputState)
+            if self.recorder is not None:
+                self.recorder.recordState(match)
+
+            # the game is over or the round is, the rest of this frame's ticks are dropped
+            if match.gameEnd is not None:
+                self.stack.push(GameOverScene(self.screen, self))
+                break
+            if match.roundOver:
+                self.stack.push(CardDraftScene(self.screen, match.players, abilityCards.AVAILABLECARDS, self.sounds["select"], self.finishRound))
+                break
+        self.profiler.lap("snapshot and replay")
+
+    def finishRound(self, changedWeapons):
+        """
+            Description:
+            Gets everyone back in once the card draft is done
+        """
+        self.match.finishRound(changedWeapons)
+        if self.recorder is not None:
+            self.recorder.recordDraft()
+        if self.debug:
+            print("bullets this round:", self.match.lastBulletReport)
+            print("Respawning players...")
+
+    def draw(self, overlays=()):
+        """
+            Description:
+            Runs the frame's phases (simulationManager.FRAME_PHASES) and shows the frame. only what changed in dirty rect mode
+
+            Args:
+            overlays: list of (image, position) drawn on top of everything but the profiler and crosshair
+        """
+        # the hud phase adds its overlays to the ones passed in, the render phase draws them all on top in order
+        self.frameScheduler.runAll(list(overlays), profiler=self.profiler)
+        self.renderer.present()               # Flip the display, or just the parts that changed
+        self.profiler.lap("display.flip")
+
+    def updateProfilerOverlay(self, overlays):
+        """
+            Description:
+            The profiler overlay's step in the hud phase, only while it's switched on
+        """
+        if self.profiler.enabled:
+            match = self.match
+            fps = self.stack.clock.get_fps() if self.stack.clock is not None else 0
+            self.profilerOverlay.update(fps, match.bulletPool.count, len(match.allSprites))
+            overlays.append((self.profilerOverlay.image, self.profilerOverlay.rect))
+
+    def render(self, overlays):
+        """
+            Description:
+            The renderer's step in the render phase: draws the map, sprites, HUD, bullets and overlays between the last two ticks
+        """
+        match = self.match
+        overlays.append((self.crosshair, pygame.mouse.get_pos())) # draw the crosshair on top of everything
+
+        self.interpolator.apply(self.timestep.alpha) # Slide moving sprites between the last two ticks
+        self.renderer.draw(match.allSprites, match.players, match.bulletPool, self.timestep.alpha, overlays)
+        self.interpolator.restore()           # Put sprites back where the simulation has them
+
+def applyCardSelections(players, playerSelections):
+    """
+        Description:
+        Applies each player's selected ability card to them
+
+        Args:
+        players: the player sprites
+        playerSelections: the selected card for each player, in the same order as players. None skips a player
+
+        Returns:
+        changedWeapons: a list of the players whose weapons were changed
+    """
+    global lastCardSelections
+    lastCardSelections = [card.cardName if card is not None else None for card in playerSelections]
     changedWeapons = []
 
-    # apply the cards to the players
     for i in range(len(players)):
 
         # there are 3 or 2 possible player selections based on the number of players, 0 is always mnk 
@@ -379,8 +818,4 @@ def showAbilityCardScreen(screen, players, availableCards, selectFx):
             for modifier in selectedCard.modifiers:
                 modifier.setModifier(players.sprites()[i])
 
-    # slight buffer
-    pygame.time.wait(460)
-
-    # return the players whose weapons were changed, so that i can properally refresh and add to all sprites
     return changedWeapons
\ No newline at end of file
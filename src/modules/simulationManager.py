@@ -0,0 +1,251 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Fixed timestep simulation clock, the ordered phases every tick and frame runs through, and interpolation so rendering can run at its own rate
+"""
+
+# the game is tuned for 60 ticks a second (gravity +1 per tick, bullet drag 0.99 per tick, etc)
+TICK_RATE = 60
+
+# what a simulation tick runs, in order. round is the match's own rules (who's dead, who scored)
+TICK_PHASES = ("round", "physics", "input", "collision", "bullets")
+
+# what a drawn frame runs, in order
+FRAME_PHASES = ("hud", "render")
+
+class SimulationClock():
+    """
+        Description:
+        Game time in milliseconds, advanced one fixed tick at a time.
+        Gameplay timers (fire rate, reloads, cooldowns) read this instead of the wall clock,
+        so they behave the same no matter how many ticks run in a frame
+    """
+    def __init__(self, tickRate=TICK_RATE):
+        self.tickTime = 1000 / tickRate
+        self.tickCount = 0
+
+    def advance(self):
+        """
+            Description:
+            Moves the clock forward by one tick
+        """
+        self.tickCount += 1
+
+    def getTicks(self):
+        """
+            Description:
+            Returns the game time in milliseconds, like pygame.time.get_ticks()
+        """
+        return int(self.tickCount * self.tickTime)
+
+    def reset(self):
+        """
+            Description:
+            Puts the clock back to 0
+        """
+        self.tickCount = 0
+
+# the clock every gameplay module shares
+clock = SimulationClock()
+
+def getTicks():
+    """
+        Description:
+        Shortcut for the shared simulation clock's time in milliseconds
+
+        Returns:
+        game time in milliseconds
+    """
+    return clock.getTicks()
+
+class TickScheduler():
+    """
+        Description:
+        Runs the game's systems phase by phase in a fixed order. Every entity (a player, the bullet pool, a sprite group)
+        registers one step per phase it takes part in, and registering a second one is an error,
+        so nothing can be moved, collided or drawn twice in the same tick
+
+        Attributes:
+        phases: the phase names, in the order they run
+        steps: phase -> list of (entity, step) in the order they were registered
+    """
+    def __init__(self, phases):
+        self.phases = phases
+        self.steps = dict((phase, []) for phase in phases)
+
+    def register(self, phase, entity, step):
+        """
+            Description:
+            Adds an entity's step to a phase, it runs after the steps registered before it
+
+            Args:
+            phase: one of phases
+            entity: what the step updates, only one step per entity per phase
+            step: called with the arguments given to run
+        """
+        if phase not in self.steps:
+            raise ValueError("unknown phase " + str(phase) + ", expected one of " + str(self.phases))
+        if self.isRegistered(phase, entity):
+            raise ValueError(str(entity) + " already has a step in the " + phase + " phase")
+        self.steps[phase].append((entity, step))
+
+    def unregister(self, entity):
+        """
+            Description:
+            Removes an entity's steps from every phase
+        """
+        for phase in self.phases:
+            self.steps[phase] = [(other, step) for other, step in self.steps[phase] if other is not entity]
+
+    def isRegistered(self, phase, entity):
+        """
+            Description:
+            Returns True if the entity already has a step in the phase
+        """
+        for other, step in self.steps[phase]:
+            if other is entity:
+                return True
+        return False
+
+    def run(self, phase, *args):
+        """
+            Description:
+            Runs every step in one phase
+
+            Args:
+            phase: one of phases
+            args: passed on to every step
+        """
+        for entity, step in self.steps[phase]:
+            step(*args)
+
+    def runAll(self, *args, profiler=None):
+        """
+            Description:
+            Runs every phase in order
+
+            Args:
+            args: passed on to every step
+            profiler: laps the Profiler after each phase, None for no profiling
+        """
+        for phase in self.phases:
+            self.run(phase, *args)
+            if profiler is not None:
+                profiler.lap(phase)
+
+class FixedTimestep():
+    """
+        Description:
+        Accumulates real frame time and hands out whole simulation ticks.
+        alpha is how far between the last two ticks the current frame is, used for interpolation
+    """
+    def __init__(self, tickRate=TICK_RATE, maxFrameTime=250):
+        self.tickTime = 1000 / tickRate
+
+        # a frame longer than this is clamped so one long hitch doesn't make the sim spiral trying to catch up
+        self.maxFrameTime = maxFrameTime
+        self.accumulator = 0
+        self.alpha = 0
+
+    def advance(self, frameTime):
+        """
+            Description:
+            Adds a rendered frame's duration and returns how many ticks to run for it
+
+            Args:
+            frameTime: milliseconds since the last frame (what clock.tick() returns)
+
+            Returns:
+            number of simulation ticks to run
+        """
+        self.accumulator += min(frameTime, self.maxFrameTime)
+        ticks = int(self.accumulator // self.tickTime)
+        self.accumulator -= ticks * self.tickTime
+        self.alpha = self.accumulator / self.tickTime
+        return ticks
+
+    def reset(self):
+        """
+            Description:
+            Drops any leftover time, used after the game was paused (card screen)
+        """
+        self.accumulator = 0
+        self.alpha = 0
+
+class Interpolator():
+    """
+        Description:
+        Remembers where tracked sprites were at the start of the last tick and, while drawing,
+        moves them partway between that spot and where they are now
+    """
+    def __init__(self, teleportDistance=100):
+        # sprite -> topleft before the last tick
+        self.previous = {}
+
+        # sprite -> (dx, dy) it was shifted by in apply, undone by restore
+        self.offsets = {}
+
+        # bigger jumps than this (respawns) snap instead of sliding across the screen
+        self.teleportDistance = teleportDistance
+
+    def track(self, sprite):
+        """
+            Description:
+            Starts interpolating a sprite
+        """
+        self.previous[sprite] = sprite.rect.topleft
+
+    def snapshot(self):
+        """
+            Description:
+            Records every tracked sprite's position, call before each simulation tick
+        """
+        for sprite in list(self.previous):
+            # stop tracking sprites that were removed from the game, such as blown up blocks
+            if not sprite.alive():
+                del self.previous[sprite]
+                continue
+            self.previous[sprite] = sprite.rect.topleft
+
+    def apply(self, alpha):
+        """
+            Description:
+            Moves every tracked sprite to its interpolated position for drawing. Players bring their weapon and shield along
+
+            Args:
+            alpha: 0 draws at the previous tick's position, 1 at the current one
+        """
+        self.offsets = {}
+        for sprite, (previousX, previousY) in self.previous.items():
+            dx = round((previousX - sprite.rect.left) * (1 - alpha))
+            dy = round((previousY - sprite.rect.top) * (1 - alpha))
+            if dx == 0 and dy == 0:
+                continue
+            if abs(dx) > self.teleportDistance or abs(dy) > self.teleportDistance:
+                continue
+
+            self.offsets[sprite] = (dx, dy)
+            for attached in self.getAttached(sprite):
+                attached.rect.move_ip(dx, dy)
+
+    def restore(self):
+        """
+            Description:
+            Puts every sprite moved by apply back to its simulated position
+        """
+        for sprite, (dx, dy) in self.offsets.items():
+            for attached in self.getAttached(sprite):
+                attached.rect.move_ip(-dx, -dy)
+        self.offsets = {}
+
+    def getAttached(self, sprite):
+        """
+            Description:
+            Returns the sprite plus anything drawn relative to it (a player's weapon and shield bubble)
+        """
+        attached = [sprite]
+        for name in ("weapon", "shieldBubble"):
+            other = getattr(sprite, name, None)
+            if other is not None:
+                attached.append(other)
+        return attached
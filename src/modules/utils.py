@@ -6,6 +6,7 @@
 
 # I - Import & Initialize
 import pygame
+from . import simulationManager
 
 # head collision check, returns True if there is a head collision
 def collisionCheck(player, mapSprites):
@@ -15,7 +16,7 @@ def collisionCheck(player, mapSprites):
         
         Args:
         player: Player object
-        mapSprites: List of map sprites
+        mapSprites: MapSpriteGroup of map sprites
 
         Returns:
         headCollision: True if there is a head collision
@@ -23,10 +24,8 @@ def collisionCheck(player, mapSprites):
     # move the player up by 1 pixel
     player.rect.top -= 1  
     headCollision = False
-    for sprite in mapSprites:
+    for sprite in mapSprites.spritesNear(player.rect):
         if pygame.sprite.collide_rect(player, sprite):
-            if sprite.decorative:
-                continue 
             headCollision = True
             break
     # reset position after checking
@@ -35,30 +34,32 @@ def collisionCheck(player, mapSprites):
     # if there is a head collision, return True
     return headCollision
 
-def generalizedRespawn(players):
+# where players spawn when the map doesn't say, mouse player first then each joystick
+DEFAULT_SPAWN_POINTS = ((100, 100), (600, 100), (1140, 100))
+
+def generalizedRespawn(players, spawnPoints=None):
     """
         Description:
         Respawns all players at their respective spawn points
         
         Args:
         players: List of Player objects
+        spawnPoints: list of (x, y) from the map, None uses DEFAULT_SPAWN_POINTS
 
         Returns:
         None
     """
+    if not spawnPoints:
+        spawnPoints = DEFAULT_SPAWN_POINTS
 
     for player in players:
         if player.controlScheme == "mouse":
-            player.respawnPlayerAtCords(100, 100)
+            # the mouse player always gets the first spawn
+            player.respawnPlayerAtCords(*spawnPoints[0])
         else:
-            # joystick 1 spawns in the middle and joystick 2 spawns on the right
-
-            if player.joyStick.get_id() == 0:
-                # spawn in middle
-                player.respawnPlayerAtCords(600, 100)
-            else:
-                # spawn far right
-                player.respawnPlayerAtCords(1140, 100)
+            # controller slot 0 gets the next spawn and so on, extra controllers share the last one
+            spawnIndex = min(player.controllerSlot + 1, len(spawnPoints) - 1)
+            player.respawnPlayerAtCords(*spawnPoints[spawnIndex])
 
 class Colors():
     """
@@ -73,63 +74,64 @@ class Colors():
     BLUE = (110,192,255)
     PURPLE = (188,167,255)
 
-def deathHandler(deadPlayers, players, sceneManager, screen, allSprites, abilityCards, selectFx):
+def awardRound(deadPlayers, players):
     """
         Description:
-        Handles the death of players
+        Gives the point for the round to the player still standing
 
         Args:
         deadPlayers: List of dead Player objects
         players: List of Player objects
-        sceneManager: SceneManager object
-        screen: Pygame screen object
-        allSprites: List of all sprites
-        abilityCards: AbilityCards object
-        selectFx: Sound object
 
         Returns:
-        []: empty array which is what deadPlayers is set to
-
+        the Player who got the point, or None
     """
-
     for player in players:
         if player not in deadPlayers:
             player.score += 1
-            break
-    
-    # show the mouse so p1 can select a card
-    pygame.mouse.set_visible(True)
+            return player
+    return None
 
-    # show the ability card screen
-    changedWeapons = sceneManager.showAbilityCardScreen(screen, players, abilityCards.AVAILABLECARDS, selectFx)
+def startNextRound(players, changedWeapons, allSprites, bulletPool, spawnPoints=None):
+    """
+        Description:
+        Gets everyone back in after the card draft
 
+        Args:
+        players: List of Player objects
+        changedWeapons: the players whose weapons the draft changed
+        allSprites: List of all sprites
+        bulletPool: the match's BulletPool
+        spawnPoints: the map's spawn points, None uses DEFAULT_SPAWN_POINTS
+
+        Returns:
+        the finished round's bullet report, see BulletLifecycle.getReport
+
+    """
     # append the player's weapons that are in the changedWeapons list to allsprites
     for playerWhoseWeaponChanged in changedWeapons:
         allSprites.add(playerWhoseWeaponChanged.weapon)
 
     for player in players:
         player.isDead = False
-        
-        # go into their weapons and kill every bulletList sprite to prevent bullets from lasting into next round
-        for bullet in player.weapon.bulletList:
-            bullet.kill()
-
-    # Respawn players after card selection
-    generalizedRespawn(players)
 
-    pygame.mouse.set_visible(False)
+    # retire every bullet in the shared pool to prevent bullets from lasting into next round
+    bulletReport = bulletPool.endRound()
 
-    # reset dead Player count
-    return []
+    # Respawn players after card selection
+    generalizedRespawn(players, spawnPoints)
+    return bulletReport
 
-def shootBulletsAllDirections(self, bulletList, bulletSpeed, damage, ratio=10):
+def shootBulletsAllDirections(bulletPool, x, y, owner, bulletSpeed, damage, ratio=10):
     """
         Description:
         Shoots bullets in all directions, used by the physics bomb and exploading bullets ability cards
 
         Args:
-        self: Player object
-        bulletList: List of bullet sprites
+        bulletPool: BulletPool to spawn the bullets into
+        x: x coordinate the bullets start from
+        y: y coordinate the bullets start from
+        owner: Player object the bullets belong to, or None
         bulletSpeed: Speed of the bullet
         damage: Damage of the bullet
         ratio: Ratio of the bullet spread. ratio skips via this
@@ -137,6 +139,4 @@ def shootBulletsAllDirections(self, bulletList, bulletSpeed, damage, ratio=10):
         Returns:
         None
     """
-    for i in range(0, 360, ratio):
-        bullet = self.spawnBullet(i, bulletSpeed, damage)
-        bulletList.add(bullet)
\ No newline at end of file
+    bulletPool.spawnMany(x, y, range(0, 360, ratio), bulletSpeed, simulationManager.getTicks(), damage, owner, False)
\ No newline at end of file
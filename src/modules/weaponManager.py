@@ -7,8 +7,82 @@
 # I - Import & Initialize
 import pygame
 import math
-from . import entities
+import numpy
 from . import utils
+from . import simulationManager
+from . import assetManager
+
+class RotationCache():
+    """
+        Description:
+        Every rotation of a weapon image, flipped and not, rendered once up front.
+        Rotating the image each frame was one of the most expensive parts of drawing a weapon
+
+        Attributes:
+        baseImage: the scaled, unrotated image
+        angleStep: degrees between cached rotations
+        frames: frames[flipped][step], the rotated image for each step
+        hiddenImage: fully transparent image shown while the player is dead
+    """
+    def __init__(self, baseImage, angleStep=2):
+        self.baseImage = baseImage
+        self.angleStep = angleStep
+        self.steps = 360 // angleStep
+
+        # same transforms updatePositionAndRotation used to do every frame, done for every angle
+        unflippedFrames = []
+        flippedFrames = []
+        for step in range(self.steps):
+            angle = step * angleStep
+            unflippedFrames.append(pygame.transform.rotate(baseImage, -angle))
+            flippedFrames.append(pygame.transform.flip(pygame.transform.rotate(baseImage, angle), False, True))
+        self.frames = [unflippedFrames, flippedFrames]
+
+        # the frames are shared between players so their alpha can't be touched, dead players get this instead
+        self.hiddenImage = pygame.Surface(baseImage.get_size(), pygame.SRCALPHA)
+
+    def getFrame(self, angle, flipped):
+        """
+            Description:
+            Returns the cached image closest to angle
+
+            Args:
+            angle: aim angle in degrees
+            flipped: True when aiming to the left
+
+            Returns:
+            the rotated image, don't modify it
+        """
+        step = int(round(angle / self.angleStep)) % self.steps
+        return self.frames[flipped][step]
+
+# (image path, size) -> RotationCache, so everyone holding the same weapon type shares one
+rotationCaches = {}
+
+# each weapon's image and the size it's drawn at
+WEAPON_IMAGES = {
+    "Pistol": ("src/art/weapons/pistol/wo_pistol.png", (30, 30)),
+    "Assault Rifle": ("src/art/weapons/ar/wo_ar.png", (60, 30)),
+    "Sub Machine Gun": ("src/art/weapons/smg/wo_smg.png", (28, 30)),
+    "Desert Eagle": ("src/art/weapons/deagle/wo_deagle.png", (40, 36)),
+}
+
+def getRotationCache(imagePath, size):
+    """
+        Description:
+        Returns the shared RotationCache for a weapon image, loading and rendering it the first time
+
+        Args:
+        imagePath: the weapon's png
+        size: (width, height) to scale it to
+
+        Returns:
+        RotationCache
+    """
+    key = (imagePath, size)
+    if key not in rotationCaches:
+        rotationCaches[key] = RotationCache(assetManager.assets.getImage(imagePath, size))
+    return rotationCaches[key]
 
 # Base class for all weapons
 class WeaponBase(pygame.sprite.Sprite):
@@ -22,6 +96,7 @@ class WeaponBase(pygame.sprite.Sprite):
         self.player = player
         self.image = None
         self.rect = None
+        self.rotationCache = None
         self.damage = 0
         self.fireRate = 0
 
@@ -33,7 +108,9 @@ class WeaponBase(pygame.sprite.Sprite):
         self.weaponX = x
         self.weaponY = y
         self.direction = 0
-        self.bulletList = pygame.sprite.Group()
+
+        # all bullets live in the shared pool at the bottom of this file
+        self.bulletPool = bulletPool
         self.ammo = 0
         self.magazineSize = 0
         self.bulletSpeed = 0
@@ -62,7 +139,7 @@ class WeaponBase(pygame.sprite.Sprite):
             None
         """
 
-        self.lastReloadTime = pygame.time.get_ticks()
+        self.lastReloadTime = simulationManager.getTicks()
 
         # if it hasnt started reloading, then start
         if not self.isReloading:
@@ -75,21 +152,23 @@ class WeaponBase(pygame.sprite.Sprite):
             Checks if the reload is complete and updates the ammo count
         """
         if self.isReloading:
-            elapsed_time = pygame.time.get_ticks() - self.lastReloadTime
+            elapsed_time = simulationManager.getTicks() - self.lastReloadTime
             
             # if the elapsed time is greater than the reload time, then the reload is complete
             if elapsed_time >= self.reloadTime:
                 self.ammo = self.magazineSize
                 self.isReloading = False
-                print("reload completed")
+                if self.player.debug:
+                    print("reload completed")
 
-    def fire(self, shotFx):
+    def fire(self, shotFx, inputState):
         """
             Description:
             Fires a bullet from the weapon
             
             Args:
             shotFx: Sound effect for shooting
+            inputState: this tick's InputState, the bullet goes where it aims
             
             Returns:
             None
@@ -102,36 +181,21 @@ class WeaponBase(pygame.sprite.Sprite):
             return
 
         # check if the fire rate has been met
-        if pygame.time.get_ticks() - self.lastFireTime > self.fireRate:
-            self.lastFireTime = pygame.time.get_ticks()
-
-            # get control scheme
-            if self.controlScheme == "mouse":
-                mouseX, mouseY = pygame.mouse.get_pos()
-                # use the arc tan function to get the angle between the player and the mouse. virtual triangle some may say 
-                angle = math.degrees(math.atan2(mouseY - self.weaponY, mouseX - self.weaponX))
+        if simulationManager.getTicks() - self.lastFireTime > self.fireRate:
+            self.lastFireTime = simulationManager.getTicks()
+
+            angle = self.getAimAngle(inputState)
+            if angle is None:
+                # use lastJoystickAngle if the joystick is idle
+                angle = self.lastJoystickAngle
             elif self.controlScheme == "controller":
-                joystick = self.player.joyStick
-                joystick.init()
-
-                # Rjoystick horizontal (x) and vertical (y)
-                rightStickX = joystick.get_axis(2)  
-                rightStickY = joystick.get_axis(3)
-
-                # dead zone logic to prevent stick drift
-                if rightStickX > 0.2 or rightStickX < -0.2 or rightStickY > 0.2 or rightStickY < -0.2:
-                    angle = math.degrees(math.atan2(rightStickY, rightStickX))
-                    # update lastJoystickAngle when firing to prevent snapback
-                    self.player.weapon.lastJoystickAngle = angle  
-                else:
-                    # use lastJoystickAngle if the joystick is idle
-                    angle = self.player.weapon.lastJoystickAngle
-
-            bulletShotTime = pygame.time.get_ticks()
-            # create a bullet object and add it to the bullet list
-            bullet = Bullet(self.window, self.weaponX, self.weaponY, angle, self.bulletSpeed, bulletShotTime, self.damage)
+                # update lastJoystickAngle when firing to prevent snapback
+                self.lastJoystickAngle = angle
+
+            bulletShotTime = simulationManager.getTicks()
+            # add a bullet to the pool
+            self.bulletPool.spawn(self.weaponX, self.weaponY, angle, self.bulletSpeed, bulletShotTime, self.damage, self.player)
             shotFx.play()
-            self.bulletList.add(bullet)
             self.ammo -= 1
             
     def update(self):
@@ -141,15 +205,38 @@ class WeaponBase(pygame.sprite.Sprite):
         """
         self.rect.center = (self.weaponX, self.weaponY)
 
-        # update the bullets
-        self.bulletList.update()
-        self.bulletList.draw(self.window)
+    def getAimAngle(self, inputState):
+        """
+            Description:
+            Works out where the player is aiming
+
+            Args:
+            inputState: an InputState, or None before the first tick
+
+            Returns:
+            the angle in degrees, or None if there's nothing to aim with (no input yet or the aim stick is idle)
+        """
+        if inputState is None:
+            return None
+
+        if self.controlScheme == "mouse":
+            mouseX, mouseY = inputState.mousePos
+
+            # use the arc tan function to get the angle between the player and the mouse. virtual triangle some may say
+            return math.degrees(math.atan2(mouseY - self.weaponY, mouseX - self.weaponX))
+
+        # the aim stick is already zeroed inside its deadzone, see inputManager.ControllerState
+        controller = inputState.controllers[self.player.controllerSlot]
+        if not controller.isAiming():
+            return None
+        return math.degrees(math.atan2(controller.aimY, controller.aimX))
 
     def updatePositionAndRotation(self):
         """
             Description:
             Updates the weapon's position and rotation based on the player's control scheme.
-            This also flips the gun against their joycire
+            This also flips the gun against their joycire. Aims with the player's last InputState,
+            so drawing between ticks doesn't read the devices
             
             Returns:
             None
@@ -161,28 +248,12 @@ class WeaponBase(pygame.sprite.Sprite):
         # determine the current control scheme from the player
         self.controlScheme = self.player.controlScheme
 
-        # default to the last joystick angle if the joystick is idle
-        angle = self.lastJoystickAngle  
-
-        if self.controlScheme == "mouse":
-            mouseX, mouseY = pygame.mouse.get_pos()
-
-            # get the angle between the player and the mouse by calculating the arc tan using the x and y, virtually creating a triangle
-            angle = math.degrees(math.atan2(mouseY - self.weaponY, mouseX - self.weaponX))
+        angle = self.getAimAngle(self.player.inputState)
+        if angle is None:
+            # default to the last joystick angle if the joystick is idle
+            angle = self.lastJoystickAngle
         elif self.controlScheme == "controller":
-            joystick = self.player.joyStick
-            joystick.init()
-
-            # Rjoy horizontal (x) and vertical (y)
-            rStickX = joystick.get_axis(2)  
-            rStickY = joystick.get_axis(3)
-
-            # subtle deadzones for joystick, prevent drift
-            if rStickX > 0.2 or rStickX < -0.2 or rStickY > 0.2 or rStickY < -0.2:
-                
-                # get the angle between the player and the mouse by calculating the arc tan using the x and y, virtually creating a triangle
-                angle = math.degrees(math.atan2(rStickY, rStickX))
-                self.lastJoystickAngle = angle
+            self.lastJoystickAngle = angle
 
         # adjust flipping based on if the cursor or joy is on the left side of the player
         if angle > 90 or angle < -90:
@@ -190,15 +261,11 @@ class WeaponBase(pygame.sprite.Sprite):
         else:
             self.flipped = False
 
-        # rotate the weapon image based on the angle
-        if not self.flipped:
-            rotatedImage = pygame.transform.rotate(self.baseImage, -angle)
+        # pick the pre-rotated image for the angle, flipped when aiming left or else it looks dumb. if player is dead, hide the weapon
+        if self.player.isDead:
+            rotatedImage = self.rotationCache.hiddenImage
         else:
-            rotatedImage = pygame.transform.rotate(self.baseImage, angle)
-
-        # flip the image or else it looks dumb
-        if self.flipped:
-            rotatedImage = pygame.transform.flip(rotatedImage, False, True)
+            rotatedImage = self.rotationCache.getFrame(angle, self.flipped)
 
         # adjust the weapon's horizontal offset so its not in the player
         if self.flipped:
@@ -212,168 +279,602 @@ class WeaponBase(pygame.sprite.Sprite):
         self.image = rotatedImage
         rotatedRect = self.image.get_rect()
 
-        # if player is dead, hide the weapon
-        if self.player.isDead:
-            self.image.set_alpha(0)
-        else:
-            self.image.set_alpha(255)
-
         # update the rectbox to actively circle around the player's position
         self.rect = rotatedRect
         self.rect.center = (self.weaponX, self.weaponY)
 
-class Bullet(entities.Entity):
+class BulletLifecycle():
     """
         Description:
-        Bullet entity class. Bullets move in a straight line with a little bit of gravity and rotation
-        For more info on the physics, see diagrams in src/concepts. also inherits from the entity class regardless that its in weaponmanager
+        Decides when bullets in a BulletPool get retired: when they leave the arena,
+        live too long, or their owner has too many out at once. Also counts live and retired bullets per round
     """
+    def __init__(self, bounds=None, sideMargin=40, topMargin=720, maxLifetime=6000, maxPerOwner=500):
+        # the arena, bullets are retired once they are past it by the margin
+        if bounds is None:
+            bounds = pygame.Rect(0, 0, 1280, 720)
+        self.bounds = bounds
+        self.sideMargin = sideMargin
 
-    def __init__(self, screen, x, y, direction, speed, bulletShotTime, damage, bulletTimeProtection=True):
-        entities.Entity.__init__(self, screen)
-        self.window = screen
+        # bullets fired upwards are given a lot of room, gravity brings most of them back down
+        self.topMargin = topMargin
+
+        # in milliseconds
+        self.maxLifetime = maxLifetime
 
+        # same as the biggest magazine the ammo card allows
+        self.maxPerOwner = maxPerOwner
+
+        self.resetRound()
+
+    def resetRound(self):
+        """
+            Description:
+            Resets the per round counters
+        """
+        self.spawned = 0
+        self.retired = {"hit": 0, "bounds": 0, "lifetime": 0, "cap": 0, "roundEnd": 0}
+
+    def recordRetired(self, reason, amount):
+        """
+            Description:
+            Adds to the retired count for a reason
+        """
+        self.retired[reason] += int(amount)
+
+    def retireExpired(self, bulletPool, now):
+        """
+            Description:
+            Marks bullets that left the arena or outlived maxLifetime as dead
+
+            Args:
+            bulletPool: the BulletPool to check
+            now: current tick in milliseconds
+        """
+        count = bulletPool.count
+        if count == 0:
+            return
+
+        x = bulletPool.x[:count]
+        y = bulletPool.y[:count]
+        alive = bulletPool.alive[:count]
+
+        outside = ((x < self.bounds.left - self.sideMargin) | (x > self.bounds.right + self.sideMargin)
+                   | (y > self.bounds.bottom + self.sideMargin) | (y < self.bounds.top - self.topMargin))
+        outside &= alive
+        alive[outside] = False
+
+        expired = alive & (now - bulletPool.bulletCastTime[:count] > self.maxLifetime)
+        alive[expired] = False
+
+        self.recordRetired("bounds", numpy.count_nonzero(outside))
+        self.recordRetired("lifetime", numpy.count_nonzero(expired))
+
+    def enforceOwnerCap(self, bulletPool, ownerId, amount):
+        """
+            Description:
+            Makes room for amount new bullets from an owner by retiring that owner's oldest bullets
+
+            Args:
+            bulletPool: the BulletPool about to spawn
+            ownerId: owner id of the new bullets, -1 (no owner) is never capped
+            amount: how many bullets are about to be spawned
+
+            Returns:
+            the number of bullets retired
+        """
+        if ownerId < 0:
+            return 0
+
+        owned = numpy.flatnonzero(bulletPool.alive[:bulletPool.count] & (bulletPool.owner[:bulletPool.count] == ownerId))
+        extra = len(owned) + amount - self.maxPerOwner
+        if extra <= 0:
+            return 0
+
+        # rows are appended in firing order, so the first rows are the oldest bullets
+        oldest = owned[:extra]
+        bulletPool.alive[oldest] = False
+        self.recordRetired("cap", len(oldest))
+        return len(oldest)
+
+    def getReport(self, bulletPool):
+        """
+            Description:
+            Returns the live and retired counts for the current round
+
+            Returns:
+            dictionary with live, spawned and retired counts
+        """
+        return {
+            "live": int(numpy.count_nonzero(bulletPool.alive[:bulletPool.count])),
+            "spawned": self.spawned,
+            "retired": dict(self.retired),
+        }
+
+class BulletPool():
+    """
+        Description:
+        Holds every live bullet as rows of NumPy arrays (struct of arrays) instead of one sprite per bullet.
+        The whole pool is integrated, collision tested and drawn in a handful of vectorized steps.
+        Bullets move in a straight line with a little bit of gravity and drag,
+        for more info on the physics, see diagrams in src/concepts
+    """
+    # one array per field, every bullet is the same row in each of them
+    FIELDS = (
+        ("x", numpy.float64),
+        ("y", numpy.float64),
+        # where the bullet was before the last tick, used to interpolate when drawing
+        ("previousX", numpy.float64),
+        ("previousY", numpy.float64),
+        # where the bullet was before its last move, collision sweeps from here to x, y so fast bullets can't skip through things
+        ("startX", numpy.float64),
+        ("startY", numpy.float64),
+        ("xVelocity", numpy.float64),
+        ("yVelocity", numpy.float64),
+        ("damage", numpy.int64),
+        ("owner", numpy.int32),
+        # prevent player from getting hit by their own bullets
+        ("bulletCastTime", numpy.int64),
+        ("bulletTimeProtection", numpy.bool_),
+        # count bounces if hits a bounce object
+        ("bounces", numpy.int32),
+        ("alive", numpy.bool_),
+    )
+
+    def __init__(self, capacity=256):
         # Define the bullet's dimensions
         self.bulletSize = 10
-        self.image = pygame.Surface((self.bulletSize, self.bulletSize))
-        self.image.fill((255, 255, 255))
 
-        # Initialize position and direction
-        self.rect = self.image.get_rect(center=(x, y))
-        # convert direction to radians because math functions use radians
-        self.direction = math.radians(direction)  
-        
-        # horizontal velocity is calculated using the speed and the cosine of the direction using formula v = d * cos(theta)
-        self.xVelocity = speed * math.cos(self.direction)  
-
-        # vertical velocity is calculated using the speed and the sine of the direction using formula v = d * sin(theta)
-        self.yVelocity = speed * math.sin(self.direction)
-        
         # air resistance (drag force for x) & gravity force (downward force for y)
-        self.drag = 0.99  
-        self.gravity = 0.3 
-        
-        self.x = x
-        self.y = y
-        
-        # prevent player from getting hit by their own bullets
-        self.bulletCastTime = bulletShotTime 
-        self.bulletTimeProtection = bulletTimeProtection
+        self.drag = 0.99
+        self.gravity = 0.3
 
-        # count bounces if hits a bounce object
-        self.bounces = 0
-        self.damage = damage
+        # rows [0, count) are live bullets, dead rows get compacted away after collision detection
+        self.count = 0
+        self.capacity = 0
+        self.allocate(capacity)
+
+        # owner id -> player, bullets store the id so the arrays stay numeric
+        self.owners = []
+        self.ownerIds = {}
+
+        # every bullet shares one image, created on the first draw once a display exists
+        self.image = None
+
+        # retires bullets by world bounds, lifetime and per player caps
+        self.lifecycle = BulletLifecycle()
+
+        # print shield hits, set by the match
+        self.debug = False
+
+    def allocate(self, capacity):
+        """
+            Description:
+            Grows every array to the new capacity, keeping the live rows
+
+            Args:
+            capacity: number of rows to allocate
+        """
+        for name, dtype in self.FIELDS:
+            array = numpy.zeros(capacity, dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def getOwnerId(self, player):
+        """
+            Description:
+            Returns the numeric id stored in the owner array for a player, -1 for no owner
+        """
+        if player is None:
+            return -1
+        if player not in self.ownerIds:
+            self.ownerIds[player] = len(self.owners)
+            self.owners.append(player)
+        return self.ownerIds[player]
+
+    def getOwner(self, ownerId):
+        """
+            Description:
+            Returns the player that owns the id, or None
+        """
+        if ownerId < 0:
+            return None
+        return self.owners[ownerId]
+
+    def spawn(self, x, y, direction, speed, bulletShotTime, damage, owner=None, bulletTimeProtection=True):
+        """
+            Description:
+            Adds a single bullet to the pool
+
+            Args:
+            x, y: starting position (center of the bullet)
+            direction: direction in degrees
+            speed: speed of the bullet
+            bulletShotTime: tick the bullet was fired at
+            damage: damage of the bullet
+            owner: player that fired it
+            bulletTimeProtection: if False the bullet can hit a player the moment it spawns
+
+            Returns:
+            None
+        """
+        self.spawnMany(x, y, [direction], speed, bulletShotTime, damage, owner, bulletTimeProtection)
+
+    def spawnMany(self, x, y, directions, speed, bulletShotTime, damage, owner=None, bulletTimeProtection=True):
+        """
+            Description:
+            Adds a fan of bullets that all start at the same point, one per direction
+
+            Args:
+            directions: iterable of directions in degrees
+            see spawn for the rest
+            
+            Returns:
+            None
+        """
+        # convert direction to radians because math functions use radians
+        radians = numpy.radians(numpy.asarray(directions, numpy.float64))
+        amount = len(radians)
+        if amount == 0:
+            return
+
+        ownerId = self.getOwnerId(owner)
+        if self.lifecycle.enforceOwnerCap(self, ownerId, amount):
+            self.compact()
+        self.lifecycle.spawned += amount
+
+        if self.count + amount > self.capacity:
+            self.allocate(max(self.capacity * 2, self.count + amount))
+
+        rows = slice(self.count, self.count + amount)
+        self.x[rows] = x
+        self.y[rows] = y
+        self.previousX[rows] = x
+        self.previousY[rows] = y
+        self.startX[rows] = x
+        self.startY[rows] = y
+
+        # velocity is calculated using the speed and the cosine/sine of the direction using formula v = d * cos(theta)
+        self.xVelocity[rows] = speed * numpy.cos(radians)
+        self.yVelocity[rows] = speed * numpy.sin(radians)
+        self.damage[rows] = damage
+        self.owner[rows] = ownerId
+        self.bulletCastTime[rows] = bulletShotTime
+        self.bulletTimeProtection[rows] = bulletTimeProtection
+        self.bounces[rows] = 0
+        self.alive[rows] = True
+        self.count += amount
+
+    def snapshot(self):
+        """
+            Description:
+            Remembers every bullet's position, call before each simulation tick
+        """
+        self.previousX[:self.count] = self.x[:self.count]
+        self.previousY[:self.count] = self.y[:self.count]
 
     def update(self):
         """
             Description:
-            Updates the bullet's position and velocity
+            Updates every bullet's position and velocity in one step
             
             Returns:
             None
         """
+        rows = slice(0, self.count)
 
         # apply gravity and drag
-        self.yVelocity += self.gravity
-        self.xVelocity *= self.drag
+        self.yVelocity[rows] += self.gravity
+        self.xVelocity[rows] *= self.drag
 
-        # then update position
-        self.x += self.xVelocity
-        self.y += self.yVelocity
-        self.rect.center = (self.x, self.y)
-    
-    def spawnBullet(self, i, bulletSpeed, damage):
+        # then update position, remembering where it moved from
+        self.startX[rows] = self.x[rows]
+        self.startY[rows] = self.y[rows]
+        self.x[rows] += self.xVelocity[rows]
+        self.y[rows] += self.yVelocity[rows]
+
+        # retire bullets that left the arena or lived too long
+        self.lifecycle.retireExpired(self, simulationManager.getTicks())
+        self.compact()
+
+    def compact(self):
         """
             Description:
-            spawns a bullet in a specific direction. used when just creating the bullet class is not possible (see exploading bullets)
-            
-            Args:
-            i: direction of the bullet
-            bulletSpeed: speed of the bullet
-            damage: damage of the bullet
-            
+            Moves the live bullets to the front of the arrays, dropping dead rows
+        """
+        keep = numpy.flatnonzero(self.alive[:self.count])
+        if len(keep) == self.count:
+            return
+
+        for name, dtype in self.FIELDS:
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+
+    def clear(self):
+        """
+            Description:
+            Removes every bullet
+        """
+        self.count = 0
+
+    def endRound(self):
+        """
+            Description:
+            Retires every remaining bullet and starts counting a new round
+
             Returns:
-            Bullet object
+            the finished round's report, see BulletLifecycle.getReport
         """
-        return Bullet(self.window, self.rect.centerx, self.rect.centery, i, bulletSpeed, pygame.time.get_ticks(), damage, False)
+        self.lifecycle.recordRetired("roundEnd", numpy.count_nonzero(self.alive[:self.count]))
+        self.clear()
+        report = self.lifecycle.getReport(self)
+        self.lifecycle.resetRound()
+        return report
 
-    def collisionDetection(self, mapSprites, players, bulletList):
+    def getCells(self, cellSize, left, top, right, bottom):
+        """
+            Description:
+            Returns the set of grid cells touched by boxes with the given edges, one box per bullet
+        """
+        cellLeft = (left // cellSize).astype(int)
+        cellTop = (top // cellSize).astype(int)
+        cellRight = ((right - 1) // cellSize).astype(int)
+        cellBottom = ((bottom - 1) // cellSize).astype(int)
+
+        # walk every box's cells at once, boxes that span fewer cells just repeat their last one.
+        # each cell is packed into one integer so numpy can drop the repeats before they become tuples
+        keys = []
+        for stepX in range(int((cellRight - cellLeft).max()) + 1):
+            cellsX = numpy.minimum(cellLeft + stepX, cellRight).astype(numpy.int64) << 32
+            for stepY in range(int((cellBottom - cellTop).max()) + 1):
+                keys.append(cellsX + (numpy.minimum(cellTop + stepY, cellBottom) + (1 << 31)))
+        keys = numpy.unique(numpy.concatenate(keys))
+        return set(zip((keys >> 32).tolist(), ((keys & 0xFFFFFFFF) - (1 << 31)).tolist()))
+
+    def slab(self, start, delta, inverseDelta, low, high):
         """
             Description:
-            Detects collisions between the bullet and the map sprites
+            Returns when each bullet's center enters and leaves the band between low and high on one axis,
+            as fractions of its move. Bullets not moving on this axis are either always or never in the band
+        """
+        with numpy.errstate(invalid="ignore"):
+            lowTime = (low - start) * inverseDelta
+            highTime = (high - start) * inverseDelta
+        enter = numpy.minimum(lowTime, highTime)
+        exit = numpy.maximum(lowTime, highTime)
+
+        still = delta == 0
+        if still.any():
+            inside = (start > low) & (start < high)
+            enter[still] = numpy.where(inside[still], -numpy.inf, numpy.inf)
+            exit[still] = numpy.where(inside[still], numpy.inf, -numpy.inf)
+        return enter, exit
+
+    def moveToContact(self, rows, times, acrossX, rect):
+        """
+            Description:
+            Moves bullets back along their path to where they touched a rect and bounces them off the side they hit.
+            Bullets that were already inside it bounce straight back
+
+            Args:
+            rows: indices of the bullets
+            times: their entry times from sweep
+            acrossX: True for the ones that hit the left or right side
+            rect: the pygame.Rect they hit
+        """
+        half = self.bulletSize / 2
+        inside = times < 0
+        contact = numpy.maximum(times, 0)
+        startX = self.startX[rows]
+        startY = self.startY[rows]
+        x = startX + (self.x[rows] - startX) * contact
+        y = startY + (self.y[rows] - startY) * contact
+
+        # snap exactly onto the side it hit so next tick's sweep starts outside the rect
+        sideX = acrossX & ~inside
+        sideY = ~acrossX & ~inside
+        x[sideX] = numpy.where(self.xVelocity[rows][sideX] > 0, rect.left - half, rect.right + half)
+        y[sideY] = numpy.where(self.yVelocity[rows][sideY] > 0, rect.top - half, rect.bottom + half)
+
+        self.x[rows] = x
+        self.y[rows] = y
+        self.startX[rows] = x
+        self.startY[rows] = y
+        self.xVelocity[rows] = numpy.where(sideX | inside, -self.xVelocity[rows], self.xVelocity[rows])
+        self.yVelocity[rows] = numpy.where(sideY | inside, -self.yVelocity[rows], self.yVelocity[rows])
+        self.bounces[rows] += numpy.where(inside, 2, 1)
+
+    def collisionDetection(self, mapSprites, players):
+        """
+            Description:
+            Detects collisions between every bullet and the map sprites, shields and players.
+            Each bullet is swept along the whole segment it moved this tick, so a fast bullet can't pass through a thin
+            platform or a player between ticks. Every target is tested against all bullets at once, then each bullet
+            only hits whatever it reached first
             
             Args:
-            mapSprites: List of map sprites
+            mapSprites: MapSpriteGroup of map sprites
             players: List of player objects
-            bulletList: List of bullet sprites
             
             Returns:
             None
         """
+        count = self.count
+        if count == 0:
+            return
 
-        # Check if bullet collides with any map sprites
-        for sprite in mapSprites:
-            if pygame.sprite.collide_rect(self, sprite):
-                # if the bullet his a decorative sprite, ignore
-                if sprite.decorative:
-                    continue
+        now = simulationManager.getTicks()
+        half = self.bulletSize / 2
+        startX = self.startX[:count]
+        startY = self.startY[:count]
+        x = self.x[:count]
+        y = self.y[:count]
+        deltaX = x - startX
+        deltaY = y - startY
+        with numpy.errstate(divide="ignore"):
+            inverseX = 1 / deltaX
+            inverseY = 1 / deltaY
+
+        # the box each bullet swept through, anything outside it can't have been hit
+        sweptLeft = numpy.minimum(startX, x) - half
+        sweptTop = numpy.minimum(startY, y) - half
+        sweptRight = numpy.maximum(startX, x) + half
+        sweptBottom = numpy.maximum(startY, y) + half
+
+        # how long ago each bullet was fired, used to ignore your own bullets as they leave the gun
+        age = now - self.bulletCastTime[:count]
+        canHitPlayers = (age > 30) | ~self.bulletTimeProtection[:count]
+
+        # if its from your own bullets, ignore. shields don't stop bullets this young at all
+        canHitShields = age >= 40
+
+        # the first thing each bullet reaches so far: its entry time along the segment (0 = its start, 1 = where it is now,
+        # negative = it started inside), the index of the target in targets, and True if it came in through the left or right side
+        firstTime = numpy.full(count, numpy.inf)
+        firstTarget = numpy.full(count, -1, numpy.int64)
+        firstAcrossX = numpy.zeros(count, numpy.bool_)
+
+        # every target some bullet reached first at some point, with the bullets that did
+        targets = []
+
+        def sweep(kind, target, rect, canHit=None):
+            # a damage piece that's already blown up doesn't stop anything, leaving it out lets the bullet reach whatever is behind it
+            if kind == "map" and target.collisionType == "damage" and target.blownUp:
+                return
+
+            # a ray against the rect grown by half a bullet on each side (slab method), only for the bullets near it
+            near = numpy.flatnonzero((sweptLeft < rect.right) & (sweptRight > rect.left) & (sweptTop < rect.bottom) & (sweptBottom > rect.top))
+            if canHit is not None:
+                near = near[canHit[near]]
+            if len(near) == 0:
+                return
+
+            enterX, exitX = self.slab(startX[near], deltaX[near], inverseX[near], rect.left - half, rect.right + half)
+            enterY, exitY = self.slab(startY[near], deltaY[near], inverseY[near], rect.top - half, rect.bottom + half)
+            enter = numpy.maximum(enterX, enterY)
+            exit = numpy.minimum(exitX, exitY)
+
+            # only keep the bullets that reach this before anything else, ties go to whatever was tested first
+            first = (enter < exit) & (enter < 1) & (exit > 0) & (enter < firstTime[near])
+            if not first.any():
+                return
+            rows = near[first]
+            firstTime[rows] = enter[first]
+            firstTarget[rows] = len(targets)
+            firstAcrossX[rows] = (enterX > enterY)[first]
+            targets.append((kind, target, rows))
+
+        # map sprites in the grid cells the bullets swept through. decorative pieces aren't in the grid, so everything found here can be hit
+        for sprite in mapSprites.spritesInCells(self.getCells(mapSprites.grid.cellSize, sweptLeft, sweptTop, sweptRight, sweptBottom)):
+            sweep("map", sprite, sprite.rect)
 
-                if sprite.hasCollision:
-                    if sprite.collisionType == "solid":
-                        self.kill()
-                    elif sprite.collisionType == "damage":
-                        # shoot bullets in all directions
-                        if sprite.blownUp:
-                            return
-                        else:
-                            sprite.blownUp = True
-                            utils.shootBulletsAllDirections(self, bulletList, 25, 60)
-                            sprite.kill()
-                            self.kill()
-                    elif sprite.collisionType == "bounce":
-                        # reverse direction on collision
-                        if self.rect.bottom > sprite.rect.top and self.rect.top < sprite.rect.bottom:
-                            self.yVelocity = -self.yVelocity 
-                            self.bounces += 1
-                        if self.rect.right > sprite.rect.left and self.rect.left < sprite.rect.right:
-                            self.xVelocity = -self.xVelocity 
-                            self.bounces += 1
-        
-        # check if it hits the player and if so, deal damage
         for player in players:
-            if player.exploadingBullets == True:
-                if pygame.time.get_ticks() - player.exploadingBulletTime > 6000:
-                    if pygame.sprite.collide_rect(self, player):
-                        # set the time of
-                        player.exploadingBulletTime = pygame.time.get_ticks()
-
-                        # if its from your own bullets, ignore
-                        if pygame.time.get_ticks() - self.bulletCastTime < 40:
-                            return
-
-                        # shoot bullets in all directions
-                        utils.shootBulletsAllDirections(self, bulletList, 25, 4, 35)
-                        self.kill()
-                        return
-
             # check if it his the player shield bubble
             if player.shieldBubble:
-                if pygame.sprite.collide_rect(self, player.shieldBubble):
+                sweep("shield", player, player.shieldBubble.rect, canHitShields)
+
+            # bullets shouldn't collide with isDead players, unless they're there to set off exploding bullets
+            readyToExplode = player.exploadingBullets == True and now - player.exploadingBulletTime > 6000
+            if readyToExplode:
+                sweep("player", player, player.rect)
+            elif not player.isDead:
+                sweep("player", player, player.rect, canHitPlayers)
+
+        # the hits below are resolved by row number, so the pool must not be spawned into or compacted until they're done.
+        # explosions set off while resolving are collected here and spawned after
+        explosions = []
+
+        for targetIndex, (kind, target, rows) in enumerate(targets):
+            # drop the bullets that reached something else first after all
+            rows = rows[firstTarget[rows] == targetIndex]
+            if len(rows) == 0:
+                continue
+            hitTimes = firstTime[rows]
+
+            if kind == "map":
+                if target.collisionType == "solid":
+                    self.alive[rows] = False
+                elif target.collisionType == "damage":
+                    # the first bullet in sets it off and shoots bullets in all directions where it touched.
+                    # once it's blown up the rest go through
+                    if not target.blownUp:
+                        first = rows[hitTimes.argmin()]
+                        contact = max(firstTime[first], 0)
+                        target.blownUp = True
+                        explosions.append((startX[first] + (x[first] - startX[first]) * contact,
+                                           startY[first] + (y[first] - startY[first]) * contact,
+                                           self.getOwner(self.owner[first]), 25, 60))
+                        target.kill()
+                        self.alive[first] = False
+                elif target.collisionType == "bounce":
+                    # back to where it touched, then off the side it hit
+                    self.moveToContact(rows, hitTimes, firstAcrossX[rows], target.rect)
+
+            elif kind == "shield":
+                # bullets too young to hit it were never swept against it
+                shieldDamage = int(self.damage[rows].sum())
+                if self.debug:
+                    print("shield hit", target.shieldBubble.Health)
+                    print("bullet damage", shieldDamage)
+                target.shieldBubble.dealDamageToShield(shieldDamage)
+                self.alive[rows] = False
+
+            elif kind == "player":
+                if target.exploadingBullets == True and now - target.exploadingBulletTime > 6000:
+                    first = rows[hitTimes.argmin()]
+                    target.exploadingBulletTime = now
+                    rows = rows[rows != first]
+
                     # if its from your own bullets, ignore
-                    if pygame.time.get_ticks() - self.bulletCastTime < 40:
-                        return
+                    if age[first] >= 40:
+                        # shoot bullets in all directions
+                        explosions.append((x[first], y[first], self.getOwner(self.owner[first]), 25, 4, 35))
+                        self.alive[first] = False
+
+                # deal damage
+                if not target.isDead:
+                    rows = rows[canHitPlayers[rows]]
+                    target.Health -= int(self.damage[rows].sum())
+                    self.alive[rows] = False
+
+        self.lifecycle.recordRetired("hit", count - numpy.count_nonzero(self.alive[:count]))
+
+        # spawning can retire an owner's oldest bullets and compact the pool, so it waits until the hits above are counted
+        for explosion in explosions:
+            utils.shootBulletsAllDirections(self, *explosion)
+        self.compact()
+
+    def draw(self, surface, alpha=1.0):
+        """
+            Description:
+            Draws every bullet with a single blits call
+
+            Args:
+            surface: surface to draw on
+            alpha: how far between the previous and current tick to draw the bullets, see FixedTimestep
+
+            Returns:
+            list of the rects drawn to
+        """
+        if self.count == 0:
+            return []
+
+        if self.image is None:
+            self.image = pygame.Surface((self.bulletSize, self.bulletSize)).convert()
+            self.image.fill((255, 255, 255))
 
-                    print("shield hit", player.shieldBubble.Health)
-                    print("bullet damage", self.damage)
-                    player.shieldBubble.dealDamageToShield(self.damage)
-                    self.kill()
+        count = self.count
+        half = self.bulletSize // 2
+        left = self.previousX[:count] + (self.x[:count] - self.previousX[:count]) * alpha - half
+        top = self.previousY[:count] + (self.y[:count] - self.previousY[:count]) * alpha - half
+        image = self.image
+        return surface.blits([(image, position) for position in zip(left.astype(int).tolist(), top.astype(int).tolist())])
 
-            if pygame.sprite.collide_rect(self, player):
-                if pygame.time.get_ticks() - self.bulletCastTime > 30 or self.bulletTimeProtection == False:
-                    # bullets shouldn't collide with isDead players
-                    if not player.isDead:
-                        player.Health -= self.damage
-                        self.kill()
+# every weapon fires into this one pool
+bulletPool = BulletPool()
 
 class BasicPistol(WeaponBase):
     """
@@ -386,13 +887,9 @@ class BasicPistol(WeaponBase):
         self.player = player  
         self.weaponName = "Pistol"
 
-        # load the weapon image
-        self.baseImage = pygame.image.load("src/art/weapons/pistol/wo_pistol.png").convert_alpha()
-        
-        # scale it down
-        self.baseImage = pygame.transform.scale(self.baseImage, (30, 30))
-        
-        # use it as base as we will rotate it and flip it
+        # load the weapon image scaled down, along with every rotation and flip of it. shared by everyone holding this weapon
+        self.rotationCache = getRotationCache(*WEAPON_IMAGES[self.weaponName])
+        self.baseImage = self.rotationCache.baseImage
         self.image = self.baseImage
 
         # get the rect of the image to set x and y later
@@ -424,12 +921,9 @@ class AssaultRifle(WeaponBase):
         self.player = player
         self.weaponName = "Assault Rifle"
 
-        self.baseImage = pygame.image.load("src/art/weapons/ar/wo_ar.png").convert_alpha()
-        
-        # scale it down
-        self.baseImage = pygame.transform.scale(self.baseImage, (60, 30))
-        
-        # use it as base as we will rotate it and flip it
+        # load the weapon image scaled down, along with every rotation and flip of it. shared by everyone holding this weapon
+        self.rotationCache = getRotationCache(*WEAPON_IMAGES[self.weaponName])
+        self.baseImage = self.rotationCache.baseImage
         self.image = self.baseImage
 
         # get the rect of the image to set x and y later
@@ -459,12 +953,9 @@ class SMG(WeaponBase):
         self.player = player
         self.weaponName = "Sub Machine Gun"
 
-        self.baseImage = pygame.image.load("src/art/weapons/smg/wo_smg.png").convert_alpha()
-        
-        # scale it down
-        self.baseImage = pygame.transform.scale(self.baseImage, (28, 30))
-        
-        # use it as base as we will rotate it and flip it
+        # load the weapon image scaled down, along with every rotation and flip of it. shared by everyone holding this weapon
+        self.rotationCache = getRotationCache(*WEAPON_IMAGES[self.weaponName])
+        self.baseImage = self.rotationCache.baseImage
         self.image = self.baseImage
 
         # get the rect of the image to set x and y later
@@ -494,12 +985,9 @@ class DesertEagle(WeaponBase):
         self.player = player
         self.weaponName = "Desert Eagle"
 
-        self.baseImage = pygame.image.load("src/art/weapons/deagle/wo_deagle.png").convert_alpha()
-        
-        # scale it down
-        self.baseImage = pygame.transform.scale(self.baseImage, (40, 36))
-        
-        # use it as base as we will rotate it and flip it
+        # load the weapon image scaled down, along with every rotation and flip of it. shared by everyone holding this weapon
+        self.rotationCache = getRotationCache(*WEAPON_IMAGES[self.weaponName])
+        self.baseImage = self.rotationCache.baseImage
         self.image = self.baseImage
 
         # get the rect of the image to set x and y later
@@ -0,0 +1,26 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Shared setup for the tests: a hidden display so sprites can be made without a window,
+    and the repo root on the path so the game's modules import the same way main.py imports them
+"""
+
+# I - Import & Initialize
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+@pytest.fixture(scope="session")
+def screen():
+    """
+        Description:
+        The dummy display surface, made once for every test
+    """
+    pygame.init()
+    return pygame.display.set_mode((1280, 720))
@@ -0,0 +1,53 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Tests for pushing rows of physics blocks (StaticMapObject.moveHorizontal)
+"""
+
+# I - Import & Initialize
+import random
+from src.modules import mapManager
+
+def makeBlock(screen, group, x, y, width=40, height=40, physics=True):
+    """
+        Description:
+        Adds a solid block to the group, a physics block unless physics is False
+    """
+    block = mapManager.StaticMapObject(screen, x, y, width, height, (0, 0, 255), 255, "solid", False, physics, 1)
+    group.add(block)
+    return block
+
+def testGapIsClosedBeforeTheNextBlockMoves(screen):
+    group = mapManager.MapSpriteGroup(cellSize=64)
+    pusher = makeBlock(screen, group, 100, 600)
+    ahead = makeBlock(screen, group, 143, 600)
+
+    # 3px gap and a 5px push, the block ahead only moves the last 2px
+    assert pusher.moveHorizontal(5, group) == 5
+    assert (pusher.rect.left, ahead.rect.left) == (105, 145)
+
+def testWallStopsTheWholeRow(screen):
+    group = mapManager.MapSpriteGroup(cellSize=64)
+    pusher = makeBlock(screen, group, 100, 600)
+    ahead = makeBlock(screen, group, 140, 600)
+    makeBlock(screen, group, 182, 600, physics=False)
+
+    assert pusher.moveHorizontal(5, group) == 2
+    assert (pusher.rect.left, ahead.rect.left) == (102, 142)
+
+def testMixedSizeRows(screen):
+    # random rows of mixed size, vertically offset blocks. blocks found again with a lower slack used to tie
+    # in the queue and make heapq compare the blocks themselves
+    for layout in range(300):
+        rng = random.Random(layout)
+        group = mapManager.MapSpriteGroup(cellSize=64)
+        blocks = [makeBlock(screen, group, rng.randint(0, 600), rng.randint(300, 420), rng.randint(10, 80), rng.randint(10, 80))
+                  for i in range(rng.randint(2, 12))]
+        push = rng.randint(20, 200) * rng.choice((-1, 1))
+        startLeft = blocks[0].rect.left
+
+        moved = blocks[0].moveHorizontal(push, group)
+
+        # nothing in the way but other physics blocks, so the pusher always gets its whole move
+        assert moved == push
+        assert blocks[0].rect.left == startLeft + push
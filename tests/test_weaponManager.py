@@ -0,0 +1,42 @@
+"""
+    Author: Nick S
+    Date: January 15th, 2025
+    Description: Tests for the bullet pool's swept collision
+"""
+
+# I - Import & Initialize
+import numpy
+from src.modules import weaponManager, mapManager, simulationManager
+
+def testOwnerAtCapSetsOffDamageBlock(screen):
+    pool = weaponManager.BulletPool()
+    pool.lifecycle.bounds = screen.get_rect()
+    simulationManager.clock.reset()
+    owner = object()
+
+    # the owner is one short of the cap with bullets parked far away, then fires one more into a damage block
+    for i in range(pool.lifecycle.maxPerOwner - 1):
+        pool.spawn(1000, 100, 0, 0, simulationManager.getTicks(), 10, owner)
+    simulationManager.clock.advance()
+    now = simulationManager.getTicks()
+    pool.spawn(280, 120, 0, 40, now, 10, owner)
+
+    group = mapManager.MapSpriteGroup(cellSize=64)
+    block = mapManager.StaticMapObject(screen, 300, 100, 20, 40, (255, 60, 60), 225, "damage")
+    group.add(block)
+
+    pool.update()
+    pool.collisionDetection(group, [])
+
+    count = pool.count
+    fired = pool.bulletCastTime[:count] == now
+    ring = fired & ~pool.bulletTimeProtection[:count]
+
+    # the bullet that set it off is gone, and the whole ring (360 / ratio 10) made it out
+    assert block.blownUp
+    assert numpy.count_nonzero(fired & pool.bulletTimeProtection[:count]) == 0
+    assert numpy.count_nonzero(ring) == 360 // 10
+
+    # the ring made room by retiring the owner's oldest parked bullets
+    assert count == pool.lifecycle.maxPerOwner
+    assert pool.lifecycle.retired["hit"] == 1